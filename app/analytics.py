@@ -0,0 +1,257 @@
+import numpy as np
+from sqlalchemy import func, select
+import models
+from stats import RATINGS
+
+# Two-sided 95% normal quantile for the confidence intervals
+Z_95 = 1.959964
+# Rows fetched per round trip while loading ratings
+FETCH_ROWS = 50_000
+# respondent_facets columns a cross-tab can group by
+FACETS = ("stream", "class_name", "academic_year")
+
+VALUES = np.array(RATINGS, dtype=np.float64)
+
+
+class Ratings:
+    # One selection of SYLLABUS ratings as parallel arrays: question_ids[i]
+    # was rated scores[i] by a respondent whose facet value is
+    # group_names[groups[i]] (groups only when loaded for a cross-tab)
+
+    def __init__(self, question_ids, scores, groups=None, group_names=()):
+        self.question_ids = np.asarray(question_ids, dtype=np.int32)
+        self.scores = np.asarray(scores, dtype=np.int8)
+        self.groups = None if groups is None else np.asarray(groups, dtype=np.int32)
+        self.group_names = list(group_names)
+
+    def __len__(self):
+        return len(self.scores)
+
+
+# -----------------------------
+# LOADING (ONE PASS OVER THE SELECTION)
+# -----------------------------
+def ratings_query(stakeholder_id: int | None = None, session_id: int | None = None,
+                  stream: str | None = None, class_name: str | None = None,
+                  by: str | None = None):
+    FA, SPI, RF = models.FeedbackAnswer, models.StakeholderPersonalInfo, models.RespondentFacet
+
+    columns = [FA.question_id, FA.score]
+    if by:
+        if by not in FACETS:
+            raise ValueError(f"Unknown facet {by!r}")
+        columns.append(getattr(RF, by))
+
+    query = select(*columns).where(FA.score.is_not(None))
+
+    if stakeholder_id is not None or session_id is not None:
+        query = query.join(SPI, SPI.person_id == FA.person_id)
+        if stakeholder_id is not None:
+            query = query.where(SPI.stakeholder_id == stakeholder_id)
+        if session_id is not None:
+            query = query.where(SPI.session_id == session_id)
+
+    if stream or class_name or by:
+        # Respondents without a facet row still count in an unfiltered cross-tab
+        query = query.outerjoin(RF, RF.person_id == FA.person_id)
+        if stream:
+            query = query.where(RF.stream == stream)
+        if class_name:
+            query = query.where(RF.class_name == class_name)
+
+    return query
+
+
+def read_arrays(session, query, by, fetch_rows: int = FETCH_ROWS) -> Ratings:
+    # Partitions of the selection straight into typed arrays
+    # On the statement: Connection.execution_options() would change the
+    # session's connection for every later query too
+    result = session.connection().execute(query.execution_options(yield_per=fetch_rows))
+
+    question_ids, scores, groups = [], [], []
+    group_index = {}
+    for rows in result.partitions(fetch_rows):
+        columns = list(zip(*rows))
+        question_ids.append(np.array(columns[0], dtype=np.int32))
+        scores.append(np.array(columns[1], dtype=np.int8))
+        if by:
+            groups.append(np.array(
+                [group_index.setdefault(value or None, len(group_index)) for value in columns[2]],
+                dtype=np.int32
+            ))
+
+    def joined(parts, dtype):
+        return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+    # Facet values in sorted order (blank last) rather than first-seen order
+    names = sorted(group_index, key=lambda v: (v is None, v or ""))
+    codes = None
+    if by:
+        remap = np.empty(len(names), dtype=np.int32)
+        for new, name in enumerate(names):
+            remap[group_index[name]] = new
+        codes = remap[joined(groups, np.int32)]
+
+    return Ratings(joined(question_ids, np.int32), joined(scores, np.int8), codes, names)
+
+
+async def load(db, stakeholder_id=None, session_id=None, stream=None,
+               class_name=None, by=None, fetch_rows: int = FETCH_ROWS) -> Ratings:
+    # The whole read runs as one sync call on the session's connection:
+    # awaiting every partition through the async result costs more than
+    # the query itself on a large selection
+    query = ratings_query(stakeholder_id, session_id, stream, class_name, by)
+    return await db.run_sync(read_arrays, query, by, fetch_rows)
+
+
+# -----------------------------
+# VECTORIZED STATISTICS
+# -----------------------------
+def dense(question_ids):
+    # Sorted distinct question ids and each rating's index among them,
+    # through a lookup table (ids are small) instead of a sort
+    if not len(question_ids):
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64)
+    present = np.bincount(question_ids) > 0
+    questions = np.flatnonzero(present)
+    lookup = np.cumsum(present) - 1
+    return questions, lookup[question_ids]
+
+
+def histograms(cells, scores, cell_count: int):
+    # (cell_count, 5) rating counts with a single bincount
+    flat = cells.astype(np.int64) * len(RATINGS) + (scores.astype(np.int64) - 1)
+    return np.bincount(flat, minlength=cell_count * len(RATINGS)).reshape(cell_count, len(RATINGS))
+
+
+def describe(hist) -> dict:
+    # Everything below comes from the histograms, so each cell costs a few
+    # array operations regardless of how many ratings it holds
+    n = hist.sum(axis=1)
+    total = hist @ VALUES
+    squares = hist @ (VALUES ** 2)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / n
+        variance = np.clip((squares - n * mean ** 2) / (n - 1), 0, None)   # sample variance
+        std = np.sqrt(variance)
+        half_width = Z_95 * std / np.sqrt(n)
+
+        top2 = (hist[:, -2] + hist[:, -1]) / n
+        # Wilson score interval for the top-2-box share
+        z2 = Z_95 ** 2
+        center = (top2 + z2 / (2 * n)) / (1 + z2 / n)
+        spread = Z_95 * np.sqrt(top2 * (1 - top2) / n + z2 / (4 * n ** 2)) / (1 + z2 / n)
+
+    # Median of discrete 1-5 ratings: the values at the two middle positions
+    cumulative = hist.cumsum(axis=1)
+    lower = (cumulative <= ((n - 1) // 2)[:, None]).sum(axis=1) + 1
+    upper = (cumulative <= (n // 2)[:, None]).sum(axis=1) + 1
+
+    return {
+        "n": n,
+        "mean": mean,
+        "std": std,
+        "median": np.where(n > 0, (lower + upper) / 2, np.nan),
+        "mean_ci": (mean - half_width, mean + half_width),
+        "top2_box": top2,
+        "top2_box_ci": (center - spread, center + spread),
+        "histogram": hist
+    }
+
+
+def number(value, digits: int = 3):
+    # JSON-safe float: NaN (no or a single rating) becomes null
+    value = float(value)
+    return None if np.isnan(value) else round(value, digits)
+
+
+def summarize(ratings: Ratings, catalog=None) -> list[dict]:
+    # Per question: count, mean, std, median, 1-5 histogram, top-2-box and
+    # 95% confidence intervals, ordered by question id
+    questions, cells = dense(ratings.question_ids)
+    return summary_rows(questions, describe(histograms(cells, ratings.scores, len(questions))), catalog)
+
+
+def summary_rows(questions, stats, catalog=None) -> list[dict]:
+    summary = []
+    for i, qid in enumerate(np.asarray(questions).tolist()):
+        question = catalog.by_id.get(qid) if catalog else None
+        summary.append({
+            "question_id": qid,
+            "question": question.number if question else None,
+            "label": question.label if question else None,
+            "n": int(stats["n"][i]),
+            "mean": number(stats["mean"][i]),
+            "std": number(stats["std"][i]),
+            "median": number(stats["median"][i]),
+            "mean_ci": [number(stats["mean_ci"][0][i]), number(stats["mean_ci"][1][i])],
+            "histogram": stats["histogram"][i].tolist(),
+            "top2_box": number(stats["top2_box"][i]),
+            "top2_box_ci": [number(stats["top2_box_ci"][0][i]), number(stats["top2_box_ci"][1][i])]
+        })
+    return summary
+
+
+def crosstab(ratings: Ratings) -> dict:
+    # Question x facet value: count, mean and top-2-box per cell
+    questions, rows = dense(ratings.question_ids)
+    group_count = len(ratings.group_names)
+    cells = rows.astype(np.int64) * group_count + ratings.groups
+    stats = describe(histograms(cells, ratings.scores, len(questions) * group_count))
+
+    table = []
+    for i, qid in enumerate(questions.tolist()):
+        row = []
+        for g, name in enumerate(ratings.group_names):
+            cell = i * group_count + g
+            if stats["n"][cell]:
+                row.append({
+                    "group": name,
+                    "n": int(stats["n"][cell]),
+                    "mean": number(stats["mean"][cell]),
+                    "top2_box": number(stats["top2_box"][cell])
+                })
+        table.append({"question_id": qid, "cells": row})
+
+    return {"groups": ratings.group_names, "questions": table}
+
+
+# -----------------------------
+# FROM THE SUMMARY COUNTERS
+# question_stats keeps every question's 1-5 histogram per stakeholder and
+# session, which is all describe() needs: no facet filter means no row scan
+# -----------------------------
+def counters_query(stakeholder_id: int | None = None, session_id: int | None = None):
+    QS = models.QuestionStats
+    query = (
+        select(QS.question_id, *(func.sum(getattr(QS, f"rating_{r}")) for r in RATINGS))
+        .group_by(QS.question_id)
+        .having(func.sum(QS.response_count) > 0)
+        .order_by(QS.question_id)
+    )
+    if stakeholder_id is not None:
+        query = query.where(QS.stakeholder_id == stakeholder_id)
+    if session_id is not None:
+        query = query.where(QS.session_id == session_id)
+    return query
+
+
+async def summarize_counters(db, catalog=None, stakeholder_id=None, session_id=None) -> list[dict]:
+    rows = (await db.execute(counters_query(stakeholder_id, session_id))).all()
+    hist = np.array([r[1:] for r in rows], dtype=np.int64).reshape(len(rows), len(RATINGS))
+    return summary_rows([r[0] for r in rows], describe(hist), catalog)
+
+
+async def analyze(db, catalog, stakeholder_id=None, session_id=None, stream=None,
+                  class_name=None, by=None) -> dict:
+    if not (stream or class_name or by):
+        questions = await summarize_counters(db, catalog, stakeholder_id, session_id)
+        return {"ratings": sum(q["n"] for q in questions), "questions": questions}
+
+    # Facet filters and cross-tabs need the respondents' rows
+    ratings = await load(db, stakeholder_id, session_id, stream, class_name, by)
+    report = {"ratings": len(ratings), "questions": summarize(ratings, catalog)}
+    if by:
+        report["crosstab"] = {"by": by, **crosstab(ratings)}
+    return report
@@ -0,0 +1,41 @@
+from sqlalchemy import Integer, cast, func, select, update
+from database import engine
+import models
+from submissions import RATING_VALUES
+
+
+def backfill_scores(conn, chunk_size: int = 50_000, commit: bool = False) -> int:
+    # Fill feedback_answers.score for SYLLABUS answers that don't have one yet.
+    # Walks answer_id ranges so no single UPDATE locks the whole table;
+    # commit=True commits after every range (CLI), otherwise the caller does.
+    syllabus_ids = select(models.SyllabusQuestion.id).where(
+        models.SyllabusQuestion.category == "SYLLABUS"
+    )
+
+    max_id = conn.scalar(select(func.max(models.FeedbackAnswer.answer_id))) or 0
+    updated = 0
+
+    for start in range(0, max_id + 1, chunk_size):
+        result = conn.execute(
+            update(models.FeedbackAnswer)
+            .where(
+                models.FeedbackAnswer.answer_id >= start,
+                models.FeedbackAnswer.answer_id < start + chunk_size,
+                models.FeedbackAnswer.score.is_(None),
+                models.FeedbackAnswer.question_id.in_(syllabus_ids),
+                models.FeedbackAnswer.answer_text.in_(sorted(RATING_VALUES))
+            )
+            .values(score=cast(models.FeedbackAnswer.answer_text, Integer))
+            .execution_options(synchronize_session=False)
+        )
+        updated += result.rowcount
+        if commit:
+            conn.commit()
+
+    return updated
+
+
+if __name__ == "__main__":
+    with engine.connect() as conn:
+        count = backfill_scores(conn, commit=True)
+    print(f"Backfilled score on {count} answers.")
@@ -0,0 +1,90 @@
+import os
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -----------------------------
+# DASHBOARD CACHE SETTINGS (.env)
+# -----------------------------
+# DASHBOARD_CACHE_SIZE   entries kept before the least recently used is evicted
+# DASHBOARD_CACHE_TTL    seconds an entry may be served; also bounds staleness
+#                        across worker processes, which don't share versions
+CACHE_SIZE = int(os.getenv("DASHBOARD_CACHE_SIZE", "256"))
+CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "60"))
+
+MISSING = object()
+
+
+class VersionedCache:
+    # LRU + TTL cache whose entries are only valid for the data version they
+    # were computed at. Writers call bump() after committing, which makes
+    # every older entry a miss without having to find and delete it.
+    # Used from the event loop only, so there is nothing to lock.
+
+    def __init__(self, max_entries: int = CACHE_SIZE, ttl_seconds: float = CACHE_TTL,
+                 clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (version, expires_at, value)
+
+    def bump(self):
+        self.version += 1
+
+    def get(self, key):
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            version, expires_at, value = entry
+            if version == self.version and self.clock() < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        self.misses += 1
+        return MISSING
+
+    def set(self, key, value, version: int | None = None):
+        # Pass the version read *before* querying, so a write that commits
+        # while the query runs leaves this entry already stale
+        self._entries[key] = (
+            self.version if version is None else version,
+            self.clock() + self.ttl_seconds,
+            value
+        )
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+dashboard_cache = VersionedCache()
+
+
+def bump_data_version():
+    # Feedback or demographic answers changed (call after commit)
+    dashboard_cache.bump()
@@ -0,0 +1,163 @@
+import io
+import pivot
+from submissions import RATING_VALUES
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:   # optional: uv sync --extra columnar
+    pa = pq = None
+
+# Long rows per Parquet row group / Arrow record batch
+ROW_GROUP_ROWS = 100_000
+# Respondents per row group of the wide (one row per person) form
+ROW_GROUP_RESPONDENTS = 10_000
+
+# format -> (media type, file extension)
+FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", ".arrows")
+}
+
+
+def available() -> bool:
+    return pa is not None
+
+
+class _Sink(io.RawIOBase):
+    # Write target for the Parquet/Arrow writers that keeps bytes only until
+    # they are handed to the response
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.size
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+async def write_stream(schema, batches, fmt: str = "parquet"):
+    # One row group (Parquet) or record batch (Arrow IPC stream) per batch,
+    # sent on as soon as it is encoded; memory holds a single batch
+    sink = _Sink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    async for batch in batches:
+        writer.write_batch(batch)
+        data = sink.drain()
+        if data:
+            yield data
+
+    writer.close()
+    yield sink.drain()
+
+
+def dictionary(values):
+    return pa.array(values, pa.string()).dictionary_encode()
+
+
+def scores(values):
+    return pa.array([int(v) if v in RATING_VALUES else None for v in values], pa.int8())
+
+
+# -----------------------------
+# LONG FORM (one row per answer)
+# -----------------------------
+def long_schema():
+    return pa.schema([
+        ("stakeholder", pa.dictionary(pa.int32(), pa.string())),
+        ("person_id", pa.int32()),
+        ("name", pa.dictionary(pa.int32(), pa.string())),
+        ("question_id", pa.int32()),
+        ("question", pa.dictionary(pa.int32(), pa.string())),
+        ("category", pa.dictionary(pa.int32(), pa.string())),
+        ("answer", pa.string()),
+        ("score", pa.int8())
+    ])
+
+
+def long_batches(rows, catalog, group_rows: int = ROW_GROUP_ROWS):
+    # rows: all_answers_query() rows. Question labels and categories are
+    # indexes into dictionaries fixed by the catalog, not repeated strings.
+    labels = sorted({q.label for q in catalog.questions})
+    categories = sorted({q.category for q in catalog.questions})
+    label_index = {label: i for i, label in enumerate(labels)}
+    category_index = {c: i for i, c in enumerate(categories)}
+    question_index = {q.id: label_index[q.label] for q in catalog.questions}
+    question_category = {q.id: category_index[q.category] for q in catalog.questions}
+    label_dictionary = pa.array(labels, pa.string())
+    category_dictionary = pa.array(categories, pa.string())
+    schema = long_schema()
+
+    def batch(buffer):
+        stakeholders, person_ids, names, question_ids, answers, score_values = zip(*buffer)
+        return pa.record_batch([
+            dictionary(stakeholders),
+            pa.array(person_ids, pa.int32()),
+            dictionary(names),
+            pa.array(question_ids, pa.int32()),
+            pa.DictionaryArray.from_arrays(
+                pa.array([question_index.get(q) for q in question_ids], pa.int32()), label_dictionary
+            ),
+            pa.DictionaryArray.from_arrays(
+                pa.array([question_category.get(q) for q in question_ids], pa.int32()), category_dictionary
+            ),
+            pa.array(answers, pa.string()),
+            pa.array(score_values, pa.int8())
+        ], schema=schema)
+
+    async def batches():
+        buffer = []
+        async for r in rows:
+            buffer.append((r.stakeholder, r.person_id, r.name, r.question_id, r.answer_text, r.score))
+            if len(buffer) == group_rows:
+                yield batch(buffer)
+                buffer = []
+        if buffer:
+            yield batch(buffer)
+
+    return schema, batches()
+
+
+# -----------------------------
+# WIDE FORM (one row per respondent)
+# -----------------------------
+def wide_schema(layout: pivot.Layout):
+    # Demographic answers as dictionary strings, q1..qN as 1-5 integers
+    return pa.schema(
+        [("person_id", pa.int32()), ("name", pa.dictionary(pa.int32(), pa.string()))]
+        + [(d["label"], pa.dictionary(pa.int32(), pa.string())) for d in layout.demographic_headers]
+        + [(number, pa.int8()) for number in layout.question_numbers]
+    )
+
+
+def wide_batches(rows, layout: pivot.Layout, group_respondents: int = ROW_GROUP_RESPONDENTS):
+    # rows: stakeholder_answers_query() rows, pivoted a row group at a time
+    schema = wide_schema(layout)
+    demographic = len(layout.demographic_headers)
+
+    async def batches():
+        async for table in pivot.build_chunks(rows, layout, group_respondents):
+            yield pa.record_batch(
+                [pa.array(table.person_ids, pa.int32()), dictionary(table.names)]
+                + [dictionary(col) for col in table.columns[:demographic]]
+                + [scores(col) for col in table.columns[demographic:]],
+                schema=schema
+            )
+
+    return schema, batches()
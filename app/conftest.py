@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import feedback_sessions
+import models
+import question_catalog
+import submissions
+from database import sqlite_pragmas
+from seed_questions import seed_questions
+
+
+# -----------------------------
+# TEMPORARY DATABASE
+# The app's schema in a SQLite file under tmp_path. Scenarios run through
+# their own async engine with the process-wide lookup caches, catalog and
+# session directory cleared around them, so no test sees another's rows.
+# -----------------------------
+class TempDatabase:
+    def __init__(self, path):
+        self.path = path
+        self.url = f"sqlite:///{path}"
+        self.engine = create_engine(self.url)
+        models.Base.metadata.create_all(bind=self.engine)
+        self.catalog = None
+
+    def seed(self):
+        # The real question set, plus its catalog for building answers
+        with self.engine.begin() as conn:
+            seed_questions(conn)
+            self.catalog = question_catalog.QuestionCatalog(conn.execute(question_catalog._query()).all())
+        return self
+
+    def run(self, scenario, *args, pragmas: bool = False, **engine_options):
+        # Runs `await scenario(Session, *args)`, Session being an async
+        # session factory on this file; returns its result
+        async def main():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{self.path}", **engine_options)
+            if pragmas:
+                sqlite_pragmas(engine.sync_engine)
+            Session = async_sessionmaker(bind=engine, expire_on_commit=False)
+            submissions.clear_cache()
+            feedback_sessions.clear()
+            try:
+                return await scenario(Session, *args)
+            finally:
+                submissions.clear_cache()
+                feedback_sessions.clear()
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+
+@pytest.fixture
+def empty_database(tmp_path):
+    # Schema only, for tests that insert their own rows
+    database = TempDatabase(tmp_path / "app.db")
+    yield database
+    database.engine.dispose()
+
+
+@pytest.fixture
+def database(empty_database):
+    return empty_database.seed()
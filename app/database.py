@@ -1,12 +1,38 @@
+import asyncio
+import logging
 import os
+import time
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+import metrics
 
 # Load environment variables from .env
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# BACKEND (.env)
+# -----------------------------
+# DB_BACKEND              "mysql"  = the DB_* server settings below
+#                         "sqlite" = one local file, no server (single-node
+#                                    installs, tests, benchmarks)
+# SQLITE_PATH             database file for DB_BACKEND=sqlite
+# SQLITE_BUSY_TIMEOUT_MS  how long a writer waits for another writer's lock
+# SQLITE_CACHE_MB         page cache per connection
+DB_BACKEND = os.getenv("DB_BACKEND", "mysql").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "syllabus_feedback.db")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_MB = int(os.getenv("SQLITE_CACHE_MB", "64"))
+
+if DB_BACKEND not in ("mysql", "sqlite"):
+    raise ValueError(f"DB_BACKEND must be mysql or sqlite, not {DB_BACKEND!r}")
+
 # Build DATABASE_URL from env variables
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
@@ -15,7 +41,9 @@ DB_PORT = os.getenv("DB_PORT", "3306")
 DB_NAME = os.getenv("DB_NAME")
 
 # build DATABASE_URL
-if DB_PASSWORD:
+if DB_BACKEND == "sqlite":
+    URL_DATABASE = f"sqlite:///{SQLITE_PATH}"
+elif DB_PASSWORD:
     URL_DATABASE = (
         f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}"
         f"@{DB_HOST}:{DB_PORT}/{DB_NAME}"
@@ -23,12 +51,233 @@ if DB_PASSWORD:
 else:
     URL_DATABASE = "mysql+pymysql://root@127.0.0.1:3306/syllabus_feedback_final"
 
+ASYNC_DRIVERS = {"mysql": "mysql+aiomysql", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_url(url):
+    # Same database, async driver (aiomysql is built on pymysql)
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+
+
+ASYNC_URL_DATABASE = async_url(URL_DATABASE)
+
+# -----------------------------
+# CONNECTION POOL SETTINGS (.env)
+# -----------------------------
+# Sizing applies per worker process to the async (request) engine; with N
+# uvicorn workers the server sees up to N * (size + overflow) connections,
+# which must stay below MySQL's max_connections.
+#
+# DB_POOL_SIZE            connections kept open
+# DB_MAX_OVERFLOW         extra connections opened under load, closed when returned
+# DB_POOL_TIMEOUT         seconds a request waits for a free connection before failing
+# DB_POOL_RECYCLE         replace connections older than this (below MySQL wait_timeout)
+# DB_POOL_PRE_PING        "always" = ping on every checkout (one extra round trip)
+#                         "idle"   = ping only connections idle > DB_POOL_PING_IDLE
+#                         "never"  = rely on DB_POOL_RECYCLE alone
+# DB_POOL_PING_IDLE       seconds, for DB_POOL_PRE_PING=idle
+# DB_POOL_WARMUP          1 = open DB_POOL_SIZE connections at startup
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+PRE_PING = os.getenv("DB_POOL_PRE_PING", "idle").lower()
+PING_IDLE_SECONDS = float(os.getenv("DB_POOL_PING_IDLE", "30"))
+POOL_WARMUP = os.getenv("DB_POOL_WARMUP", "1").lower() in ("1", "true", "yes")
+
+if PRE_PING not in ("always", "idle", "never"):
+    raise ValueError(f"DB_POOL_PRE_PING must be always, idle or never, not {PRE_PING!r}")
+
+# -----------------------------
+# METRICS HOOKS
+# Statement count/time per request and pool checkout waits, see metrics.py
+# -----------------------------
+class _TimedCheckout:
+    # The pool has no "before checkout" event, so time the wait here
+    metrics_label = "sync"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            metrics.POOL_TIMEOUTS.inc(self.metrics_label)
+            raise
+        finally:
+            metrics.POOL_WAIT_SECONDS.observe(time.perf_counter() - start, self.metrics_label)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting under our label
+        pool = super().recreate()
+        pool.metrics_label = self.metrics_label
+        return pool
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument(sync_engine, label: str):
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        metrics.query_finished(label, time.perf_counter() - context._metrics_start)
+
+    sync_engine.pool.metrics_label = label
+    metrics.watch_engine(label, sync_engine)
+
+
+def ping_when_idle(sync_engine, idle_seconds: float = PING_IDLE_SECONDS):
+    # DB_POOL_PRE_PING=idle: a connection returned moments ago is still
+    # alive, so only ping those that sat in the pool long enough for the
+    # server (or a firewall) to have dropped them
+    @event.listens_for(sync_engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception:
+            # The pool discards this connection and checks out another
+            raise exc.DisconnectionError()
+
+
+def sqlite_pragmas(sync_engine):
+    # WAL lets the dashboard read while a submission writes; NORMAL sync is
+    # still crash-safe in WAL mode (a power cut may lose the last commits)
+    @event.listens_for(sync_engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_MB * 1024}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
+def pool_options(sized: bool, url=URL_DATABASE) -> dict:
+    options = {
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": PRE_PING == "always"
+    }
+    if make_url(url).get_backend_name() == "sqlite":
+        # A file never drops idle connections
+        options.update(pool_recycle=-1, pool_pre_ping=False)
+    if sized:
+        options.update(
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT
+        )
+    return options
+
+
+def configure(sync_engine, label: str):
+    # Metrics plus the per-backend connection setup, for every engine
+    instrument(sync_engine, label)
+    if sync_engine.dialect.name == "sqlite":
+        sqlite_pragmas(sync_engine)
+    elif PRE_PING == "idle":
+        ping_when_idle(sync_engine)
+
+
+def make_async_engine(url, label: str, **kwargs):
+    async_engine = create_async_engine(
+        async_url(url),
+        poolclass=TimedAsyncQueuePool,
+        **pool_options(sized=True, url=url),
+        **kwargs
+    )
+    configure(async_engine.sync_engine, label)
+    return async_engine
+
+
+# -----------------------------
+# SYNC ENGINE
+# Used by create_all and the CLI scripts (create_admin, seed_questions, ...)
+# -----------------------------
 engine = create_engine(
     URL_DATABASE,
-    pool_pre_ping=True,
-    pool_recycle=3600
+    poolclass=TimedQueuePool,
+    **pool_options(sized=False)
 )
+configure(engine, "sync")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
\ No newline at end of file
+# -----------------------------
+# ASYNC ENGINE
+# Used by every request handler so a slow query never blocks the event loop
+# -----------------------------
+async_engine = make_async_engine(URL_DATABASE, "async")
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+Base = declarative_base()
+
+
+# -----------------------------
+# POOL WARM-UP AND REPORTING
+# -----------------------------
+async def warm_up(count: int = POOL_SIZE) -> int:
+    # Open the pool's connections together at startup so the first requests
+    # after a deploy don't each pay for a TCP + auth handshake
+    connections = await asyncio.gather(*(async_engine.connect() for _ in range(count)))
+    for conn in connections:
+        await conn.close()
+    logger.info("Opened %d pooled database connections", count)
+    return count
+
+
+def pool_report() -> dict:
+    # Current state plus checkout waits since startup, for sizing the pool:
+    # waits near DB_POOL_TIMEOUT or any timeouts mean too few connections
+    # for this worker's load
+    pool = async_engine.pool
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    waits = metrics.POOL_WAIT_SECONDS
+    checkouts = waits.count("async")
+
+    return {
+        "settings": {
+            "pool_size": POOL_SIZE,
+            "max_overflow": MAX_OVERFLOW,
+            "pool_timeout": POOL_TIMEOUT,
+            "pool_recycle": POOL_RECYCLE,
+            "pre_ping": PRE_PING,
+            "ping_idle_seconds": PING_IDLE_SECONDS
+        },
+        "pool": {
+            "in_use": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0)
+        },
+        "checkout_wait": {
+            "checkouts": checkouts,
+            "mean_ms": round(waits.sum("async") / checkouts * 1000, 3) if checkouts else 0.0,
+            "p95_ms_at_most": round(waits.quantile(0.95, "async") * 1000, 3),
+            "max_ms": round(waits.max("async") * 1000, 3),
+            "timeouts": metrics.POOL_TIMEOUTS.value("async")
+        },
+        "workers": workers,
+        "max_server_connections": workers * (POOL_SIZE + MAX_OVERFLOW)
+    }
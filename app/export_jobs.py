@@ -0,0 +1,421 @@
+import asyncio
+import concurrent.futures
+import csv
+import functools
+import gzip
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+import socket
+import time
+import uuid
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.pool import NullPool
+import database
+import exports
+import models
+import pivot
+import replica
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# EXPORT JOB SETTINGS (.env)
+# -----------------------------
+# EXPORT_DIR              finished files and job records; every app worker must
+#                         see the same directory
+# EXPORT_WORKERS          processes running export jobs, per app worker
+# EXPORT_MAX_PENDING      queued + running jobs per app worker before new
+#                         submissions are refused
+# EXPORT_RETENTION_HOURS  files and job records older than this are deleted
+# EXPORT_GZIP             gzip the files unless the request says otherwise
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+WORKERS = int(os.getenv("EXPORT_WORKERS", "2"))
+MAX_PENDING = int(os.getenv("EXPORT_MAX_PENDING", "8"))
+RETENTION_HOURS = float(os.getenv("EXPORT_RETENTION_HOURS", "24"))
+GZIP = os.getenv("EXPORT_GZIP", "0").lower() in ("1", "true", "yes")
+
+# Respondents written between progress updates of the job record
+PROGRESS_EVERY = 1000
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+JOB_ID = re.compile(r"[0-9a-f]{32}")
+
+
+class ExportBusyError(Exception):
+    pass
+
+
+# -----------------------------
+# JOB RECORDS
+# One JSON file per job next to its artifact, so any worker process can
+# answer status and download requests for jobs another one started
+# -----------------------------
+def record_path(directory: str, job_id: str) -> str:
+    return os.path.join(directory, f"{job_id}.json")
+
+
+def read_record(directory: str, job_id: str) -> dict | None:
+    if not JOB_ID.fullmatch(job_id):
+        return None
+    try:
+        with open(record_path(directory, job_id), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_record(directory: str, job: dict):
+    # Readers never see a half-written record
+    path = record_path(directory, job["id"])
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(job, f)
+    os.replace(tmp, path)
+
+
+def safe_name(text: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", text).strip("_") or "export"
+
+
+# -----------------------------
+# WORKER PROCESS
+# -----------------------------
+def run_job(directory: str, job_id: str, urls: list[str], catalog):
+    # Runs in a pool process: stream the rows with a plain sync connection of
+    # its own and write them to <id>.part, renamed into place when complete
+    job = read_record(directory, job_id)
+    job.update(status=RUNNING, started_at=time.time(), worker_pid=os.getpid())
+    write_record(directory, job)
+
+    path = os.path.join(directory, job["file"])
+    part = path + ".part"
+    try:
+        engine, conn = connect(urls)
+        try:
+            write_export(conn, job, part, catalog, functools.partial(write_record, directory))
+        finally:
+            conn.close()
+            engine.dispose()
+        os.replace(part, path)
+        job.update(status=DONE, size=os.path.getsize(path))
+    except Exception as e:
+        logger.exception("Export job %s failed", job_id)
+        if os.path.exists(part):
+            os.remove(part)
+        job.update(status=FAILED, error=repr(e)[:300])
+
+    job["finished_at"] = time.time()
+    write_record(directory, job)
+
+
+def connect(urls: list[str]):
+    # The read replica first when the submitting worker was using it,
+    # the primary if that fails
+    error = None
+    for url in urls:
+        engine = create_engine(url, poolclass=NullPool)
+        try:
+            return engine, engine.connect()
+        except Exception as e:
+            error = e
+            engine.dispose()
+    raise error
+
+
+def stream(conn, statement):
+    return conn.execution_options(
+        stream_results=True, yield_per=exports.FETCH_ROWS
+    ).execute(statement)
+
+
+def write_export(conn, job: dict, part: str, catalog, save):
+    done = job["respondents"] = 0
+
+    def advance(people: int):
+        # Save progress now and then, not on every row
+        nonlocal done
+        job["respondents"] += people
+        if job["respondents"] - done >= PROGRESS_EVERY:
+            done = job["respondents"]
+            save(job)
+
+    if job["compress"]:
+        out = gzip.open(part, "wt", compresslevel=6, newline="", encoding="utf-8")
+    else:
+        out = open(part, "w", newline="", encoding="utf-8")
+
+    with out:
+        writer = csv.writer(out)
+
+        if job["kind"] == "all":
+            writer.writerow(exports.ALL_HEADER)
+            labels = {q.id: q.label for q in catalog.questions}
+            last = None
+            for r in stream(conn, exports.all_answers_query(session_id=job.get("session_id"))):
+                if r.person_id != last:
+                    last = r.person_id
+                    advance(1)
+                writer.writerow([r.stakeholder, r.person_id, r.name, labels.get(r.question_id, ""), r.answer_text])
+        else:
+            layout = catalog.layout(job["stakeholder_type"])
+            writer.writerow(layout.csv_header)
+            rows = stream(conn, exports.stakeholder_answers_query(
+                job["stakeholder_id"], job["stream"], session_id=job.get("session_id")
+            ))
+            for table in pivot.chunks(rows, layout):
+                writer.writerows(table.rows())
+                advance(len(table))
+
+
+# -----------------------------
+# QUERIES RUN BY THE SUBMITTING WORKER
+# -----------------------------
+async def data_fingerprint(db) -> str:
+    # Changes whenever a respondent or an answer is added (max ids) or
+    # edited (change counter, even within the same second); index lookups
+    fingerprint = (await db.execute(select(
+        select(func.max(models.FeedbackAnswer.answer_id)).scalar_subquery(),
+        select(func.max(models.StakeholderPersonalInfo.person_id)).scalar_subquery(),
+        select(func.max(models.StakeholderPersonalInfo.updated_at)).scalar_subquery(),
+        select(func.max(models.ChangeCounter.changes)).scalar_subquery()
+    ))).one()
+    return ":".join(str(v or 0) for v in fingerprint)
+
+
+async def expected_respondents(db, stakeholder_id: int | None, stream: str | None,
+                               session_id: int | None = None) -> int:
+    # From the maintained counters, for the progress figure only
+    if stream:
+        query = select(func.count()).select_from(models.RespondentFacet).where(
+            models.RespondentFacet.stakeholder_id == stakeholder_id,
+            models.RespondentFacet.stream == stream
+        )
+        if session_id is not None:
+            query = query.join(
+                models.StakeholderPersonalInfo,
+                models.StakeholderPersonalInfo.person_id == models.RespondentFacet.person_id
+            ).where(models.StakeholderPersonalInfo.session_id == session_id)
+    else:
+        query = select(func.sum(models.RespondentCount.respondents))
+        if stakeholder_id is not None:
+            query = query.where(models.RespondentCount.stakeholder_id == stakeholder_id)
+        if session_id is not None:
+            query = query.where(models.RespondentCount.session_id == session_id)
+    return int(await db.scalar(query) or 0)
+
+
+def owner_alive(job: dict) -> bool:
+    # Whether the app worker that queued the job is still around to run it
+    if job.get("host") != socket.gethostname():
+        return True
+    try:
+        os.kill(job["owner_pid"], 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class ExportJobs:
+    def __init__(self, directory: str = EXPORT_DIR, workers: int = WORKERS,
+                 max_pending: int = MAX_PENDING, retention_hours: float = RETENTION_HOURS):
+        self.directory = directory
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retention_hours = retention_hours
+        self.executor = None
+        self.pending = set()
+
+    def _pool(self):
+        # Spawned, not forked: the app worker has an event loop, threads and
+        # pooled connections that a child must not inherit
+        if self.executor is None:
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self.executor
+
+    async def submit(self, db, catalog, kind: str, stakeholder=None,
+                     stream: str | None = None, compress: bool = GZIP,
+                     session=None) -> tuple[dict, bool]:
+        # Returns (job, created). An existing job is handed back instead when
+        # one for the same export and the same data is done or under way.
+        self.purge()
+
+        stakeholder_id = stakeholder.stakeholder_id if stakeholder else None
+        session_id = session.id if session else None
+        fingerprint = await data_fingerprint(db)
+        key = hashlib.sha1(json.dumps(
+            [kind, stakeholder_id, stream, session_id, compress, catalog.version, fingerprint]
+        ).encode("utf-8")).hexdigest()[:16]
+
+        existing = self.find(key)
+        if existing is not None:
+            return existing, False
+
+        if len(self.pending) >= self.max_pending:
+            raise ExportBusyError()
+
+        if stakeholder is None:
+            filename = "all_stakeholders_responses.csv"
+        elif stream:
+            filename = f"{stakeholder.stakeholder_type}_{safe_name(stream)}_responses.csv"
+        else:
+            filename = f"{stakeholder.stakeholder_type}_responses.csv"
+        if session is not None:
+            filename = f"{safe_name(session.name)}_{filename}"
+        suffix = ".csv.gz" if compress else ".csv"
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "key": key,
+            "kind": kind,
+            "stakeholder_id": stakeholder_id,
+            "stakeholder_type": stakeholder.stakeholder_type if stakeholder else None,
+            "stream": stream,
+            "session_id": session_id,
+            "compress": compress,
+            "catalog_version": catalog.version,
+            "fingerprint": fingerprint,
+            "status": QUEUED,
+            "respondents": 0,
+            "total": await expected_respondents(db, stakeholder_id, stream, session_id),
+            "file": job_id + suffix,
+            "filename": filename + (".gz" if compress else ""),
+            "size": None,
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "host": socket.gethostname(),
+            "owner_pid": os.getpid()
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        write_record(self.directory, job)
+
+        urls = [database.URL_DATABASE]
+        if replica.router.url and replica.router.primary_reason() is None:
+            urls.insert(0, replica.router.url)
+
+        future = self._pool().submit(run_job, self.directory, job_id, urls, catalog)
+        self.pending.add(job_id)
+        future.add_done_callback(functools.partial(self._done, asyncio.get_running_loop(), job_id))
+        return job, True
+
+    def _done(self, loop, job_id: str, future):
+        # Called from the executor's thread; the job bookkeeping belongs to
+        # the event loop
+        try:
+            loop.call_soon_threadsafe(self._finished, job_id, future)
+        except RuntimeError:
+            # Loop already closed at shutdown; nothing else touches the jobs
+            self._finished(job_id, future)
+
+    def _finished(self, job_id: str, future):
+        # A worker that died or a job cancelled at shutdown never wrote its
+        # final record; do it here
+        self.pending.discard(job_id)
+        if future.cancelled():
+            error = "cancelled at shutdown"
+        elif future.exception() is not None:
+            error = repr(future.exception())[:300]
+        else:
+            return
+        job = read_record(self.directory, job_id)
+        if job is not None and job["status"] in (QUEUED, RUNNING):
+            job.update(status=FAILED, error=error, finished_at=time.time())
+            write_record(self.directory, job)
+
+    def get(self, job_id: str) -> dict | None:
+        job = read_record(self.directory, job_id)
+        if job is not None and job["status"] in (QUEUED, RUNNING) and not owner_alive(job):
+            job.update(status=FAILED, error="interrupted: the server process running it stopped")
+        return job
+
+    def all(self) -> list[dict]:
+        jobs = []
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    job = self.get(name[:-len(".json")])
+                    if job is not None:
+                        jobs.append(job)
+        return sorted(jobs, key=lambda j: j["created_at"], reverse=True)
+
+    def find(self, key: str) -> dict | None:
+        for job in self.all():
+            if job["key"] != key:
+                continue
+            if job["status"] in (QUEUED, RUNNING):
+                return job
+            if job["status"] == DONE and os.path.exists(self.artifact(job)):
+                return job
+        return None
+
+    def artifact(self, job: dict) -> str:
+        return os.path.join(self.directory, job["file"])
+
+    def purge(self) -> int:
+        # Drop files and records past retention (by last modification)
+        if not os.path.isdir(self.directory):
+            return 0
+        cutoff = time.time() - self.retention_hours * 3600
+        removed = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass   # another worker got there first
+        return removed
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.purge()
+
+    def stop(self):
+        # Queued jobs are cancelled; running ones finish in the background
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+def view(job: dict) -> dict:
+    # What the admin API shows of a job
+    total = job["total"]
+    return {
+        "id": job["id"],
+        "kind": job["kind"],
+        "stakeholder_id": job["stakeholder_id"],
+        "stakeholder_type": job["stakeholder_type"],
+        "stream": job["stream"],
+        "session_id": job.get("session_id"),
+        "compress": job["compress"],
+        "status": job["status"],
+        "respondents": job["respondents"],
+        "total": total,
+        "progress": 1.0 if job["status"] == DONE else (
+            round(min(job["respondents"] / total, 1.0), 3) if total else None
+        ),
+        "filename": job["filename"],
+        "size": job["size"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"]
+    }
+
+
+jobs = ExportJobs()
@@ -0,0 +1,163 @@
+import csv
+import io
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+import models
+import pivot
+import replica
+
+# Rows fetched per round trip from the server-side cursor
+FETCH_ROWS = 2000
+# Bytes of CSV buffered before a chunk is handed to the response
+CHUNK_BYTES = 64 * 1024
+# Changes younger than this are left for the next delta export, so a
+# transaction still committing when the watermark is taken isn't skipped
+DELTA_SETTLE_SECONDS = 5
+
+
+async def csv_stream(header, rows, chunk_bytes: int = CHUNK_BYTES):
+    # Encode rows from an async iterable into CSV chunks as they arrive,
+    # so memory stays flat and the first byte goes out immediately
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+
+    async for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+# -----------------------------
+# DELTA EXPORTS
+# A watermark is the last settled stakeholder_personal_info.updated_at
+# (set on submit and on every edit); a delta holds the respondents changed
+# after the caller's watermark, each with all of their answers
+# -----------------------------
+async def settled_watermark(db) -> datetime | None:
+    now = await db.scalar(select(func.now()))
+    return await db.scalar(
+        select(func.max(models.StakeholderPersonalInfo.updated_at))
+        .where(models.StakeholderPersonalInfo.updated_at <= now - timedelta(seconds=DELTA_SETTLE_SECONDS))
+    )
+
+
+async def stream_changes(make_query, since: datetime | None = None, fetch_rows: int = FETCH_ROWS):
+    # Yields the new watermark first, then the rows of make_query(since,
+    # watermark), or every row without since. Unbuffered (server-side) cursor
+    # in its own session, since the response body is produced after the
+    # endpoint returns; on the read replica when configured. The watermark and
+    # the rows come from that one session, so they describe the same database.
+    async with replica.read_session() as db:
+        watermark = await settled_watermark(db)
+        if since is not None and (watermark is None or watermark <= since):
+            yield since   # nothing settled since the last delta
+            return
+
+        yield watermark
+        query = make_query(since, watermark if since is not None else None)
+        result = await db.stream(query.execution_options(yield_per=fetch_rows))
+        async for row in result:
+            yield row
+
+
+def changed_between(query, since: datetime | None, until: datetime | None,
+                    session_id: int | None = None):
+    # Delta window plus the optional session scope, both on the respondent row
+    SPI = models.StakeholderPersonalInfo
+    if session_id is not None:
+        query = query.where(SPI.session_id == session_id)
+    if since is not None:
+        query = query.where(SPI.updated_at > since)
+    if until is not None:
+        query = query.where(SPI.updated_at <= until)
+    return query
+
+
+# -----------------------------
+# ALL STAKEHOLDERS (LONG FORMAT)
+# -----------------------------
+ALL_HEADER = ["Stakeholder", "Person ID", "Name", "Question", "Answer"]
+
+
+def all_answers_query(since: datetime | None = None, until: datetime | None = None,
+                      session_id: int | None = None):
+    query = (
+        select(
+            models.Stakeholder.stakeholder_type.label("stakeholder"),
+            models.StakeholderPersonalInfo.person_id,
+            models.StakeholderPersonalInfo.name,
+            models.FeedbackAnswer.question_id,
+            models.FeedbackAnswer.answer_text,
+            models.FeedbackAnswer.score
+        )
+        .select_from(models.Stakeholder)   # ✅ EXPLICIT ROOT
+        .join(
+            models.StakeholderPersonalInfo,
+            models.Stakeholder.stakeholder_id == models.StakeholderPersonalInfo.stakeholder_id
+        )
+        .join(
+            models.FeedbackAnswer,
+            models.StakeholderPersonalInfo.person_id == models.FeedbackAnswer.person_id
+        )
+        .order_by(
+            models.Stakeholder.stakeholder_type,
+            models.StakeholderPersonalInfo.person_id,
+            models.FeedbackAnswer.question_id
+        )
+    )
+    return changed_between(query, since, until, session_id)
+
+
+async def all_answers_rows(rows, catalog):
+    # Question labels come from the catalog instead of a join per row
+    labels = {q.id: q.label for q in catalog.questions}
+
+    async for r in rows:
+        yield [r.stakeholder, r.person_id, r.name, labels.get(r.question_id, ""), r.answer_text]
+
+
+# -----------------------------
+# ONE STAKEHOLDER (ONE ROW PER PERSON)
+# -----------------------------
+def stakeholder_answers_query(stakeholder_id: int, stream: str | None = None,
+                              since: datetime | None = None, until: datetime | None = None,
+                              session_id: int | None = None):
+    query = (
+        select(
+            models.StakeholderPersonalInfo.person_id,
+            models.StakeholderPersonalInfo.name,
+            models.FeedbackAnswer.question_id,
+            models.FeedbackAnswer.answer_text
+        )
+        .join(models.FeedbackAnswer)
+        .where(models.StakeholderPersonalInfo.stakeholder_id == stakeholder_id)
+        .order_by(
+            models.StakeholderPersonalInfo.person_id,
+            models.FeedbackAnswer.question_id
+        )
+    )
+
+    if stream:
+        # Only respondents whose stream facet matches are ever read
+        query = query.join(
+            models.RespondentFacet,
+            models.RespondentFacet.person_id == models.StakeholderPersonalInfo.person_id
+        ).where(
+            models.RespondentFacet.stakeholder_id == stakeholder_id,
+            models.RespondentFacet.stream == stream
+        )
+
+    return changed_between(query, since, until, session_id)
+
+
+async def pivot_rows(rows, layout):
+    # Pivot a chunk of respondents at a time; rows are ordered by person_id
+    async for table in pivot.build_chunks(rows, layout):
+        for row in table.rows():
+            yield row
@@ -0,0 +1,124 @@
+from sqlalchemy import delete, func, insert, select, update
+from database import engine
+import models
+from pivot import clean_label, label_key
+
+FACETS = ("stream", "class_name", "academic_year")
+STREAM_WORDS = ("course", "program", "stream")
+
+
+def facet_for(text: str) -> str | None:
+    # Which facet column a DEMOGRAPHIC question feeds, by its normalized label
+    key = label_key(clean_label(text))
+    if any(word in key for word in STREAM_WORDS):
+        return "stream"
+    if key == "class":
+        return "class_name"
+    if "year" in key:
+        return "academic_year"
+    return None
+
+
+def question_facets(questions) -> dict[int, str]:
+    # questions: iterable of (id, category, text) -> {question_id: facet}
+    return {
+        qid: facet
+        for qid, category, text in questions
+        if category == "DEMOGRAPHIC" and (facet := facet_for(text)) is not None
+    }
+
+
+def facet_values(answers, facets_by_qid) -> dict[str, str]:
+    # First answered question (lowest id) wins, as the old row scan did
+    values = {}
+    for question_id, answer_text in sorted(answers):
+        facet = facets_by_qid.get(question_id)
+        if facet is not None and facet not in values:
+            values[facet] = answer_text
+    return values
+
+
+# -----------------------------
+# INCREMENTAL UPDATES
+# New respondents are written from the submitted answers (no reads); edits
+# recompute the touched people from their stored answers. Both run inside
+# the caller's transaction.
+# -----------------------------
+async def record_submissions(db, people, facets_by_qid):
+    # people: iterable of (person_id, stakeholder_id, answers)
+    rows = []
+    for person_id, stakeholder_id, answers in people:
+        values = facet_values(answers, facets_by_qid)
+        rows.append({
+            "person_id": person_id,
+            "stakeholder_id": stakeholder_id,
+            **{f: values.get(f) for f in FACETS}
+        })
+
+    if rows:
+        await db.execute(insert(models.RespondentFacet.__table__), rows)
+
+
+def _rebuild_statements(facets_by_qid, person_ids=None):
+    # Set-based refill: one row per person, then each facet column from the
+    # person's lowest-id answered question for that facet
+    RF, SPI, FA = models.RespondentFacet, models.StakeholderPersonalInfo, models.FeedbackAnswer
+
+    people = select(SPI.person_id, SPI.stakeholder_id)
+    clear = delete(RF)
+    if person_ids is not None:
+        people = people.where(SPI.person_id.in_(person_ids))
+        clear = clear.where(RF.person_id.in_(person_ids))
+
+    statements = [clear, insert(RF).from_select(["person_id", "stakeholder_id"], people)]
+
+    for facet in FACETS:
+        qids = sorted(q for q, f in facets_by_qid.items() if f == facet)
+        if not qids:
+            continue
+        first_answer = (
+            select(FA.answer_text)
+            .where(FA.person_id == RF.person_id, FA.question_id.in_(qids))
+            .order_by(FA.question_id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        stmt = update(RF).values({facet: first_answer})
+        if person_ids is not None:
+            stmt = stmt.where(RF.person_id.in_(person_ids))
+        statements.append(stmt.execution_options(synchronize_session=False))
+
+    return statements
+
+
+async def refresh(db, person_ids, facets_by_qid):
+    person_ids = sorted(set(person_ids))
+    if not person_ids:
+        return
+    for stmt in _rebuild_statements(facets_by_qid, person_ids):
+        await db.execute(stmt)
+
+
+# -----------------------------
+# FULL REBUILD (migration / consistency repair)
+# -----------------------------
+def load_question_facets(conn) -> dict[int, str]:
+    return question_facets(conn.execute(
+        select(
+            models.SyllabusQuestion.id,
+            models.SyllabusQuestion.category,
+            models.SyllabusQuestion.text
+        )
+    ).tuples())
+
+
+def rebuild(conn):
+    for stmt in _rebuild_statements(load_question_facets(conn)):
+        conn.execute(stmt)
+
+
+if __name__ == "__main__":
+    with engine.begin() as conn:
+        rebuild(conn)
+        rows = conn.scalar(select(func.count()).select_from(models.RespondentFacet))
+    print(f"Rebuilt respondent_facets ({rows} rows).")
@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import NamedTuple
+from dotenv import load_dotenv
+from sqlalchemy import delete, func, insert, select, update
+from database import AsyncSessionLocal
+import models
+import cache
+import form_pages
+import replica
+import submissions
+import trends
+from submissions import SessionClosedError  # also raised when a write hits a closed session
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# FEEDBACK SESSION SETTINGS (.env)
+# -----------------------------
+# FEEDBACK_SESSION_REFRESH_SECONDS  re-read sessions this often, so sessions
+#                                   opened, closed or activated through another
+#                                   worker are picked up (0 = off)
+REFRESH_SECONDS = float(os.getenv("FEEDBACK_SESSION_REFRESH_SECONDS", "30"))
+
+
+class SessionExistsError(Exception):
+    pass
+
+
+class FeedbackSession(NamedTuple):
+    id: int
+    name: str
+    created_at: datetime | None
+    closed_at: datetime | None
+
+    @property
+    def is_open(self) -> bool:
+        return self.closed_at is None
+
+
+class SessionDirectory:
+    # Snapshot of feedback_session and form_sessions, replaced wholesale on
+    # reload like the question catalog
+
+    def __init__(self, sessions, active):
+        # sessions: (session_id, session_name, created_at, closed_at) rows
+        # active: (form_name, session_id) rows
+        self.sessions = sorted(
+            (FeedbackSession(*row) for row in sessions),
+            key=lambda s: (s.created_at or datetime.min, s.id)
+        )
+        self.by_id = {s.id: s for s in self.sessions}
+        self.active = dict(active)
+
+    def for_form(self, form_name: str) -> FeedbackSession | None:
+        # The form's chosen session while it is open, else the newest open one
+        session = self.by_id.get(self.active.get(form_name))
+        if session is not None and session.is_open:
+            return session
+        open_sessions = [s for s in self.sessions if s.is_open]
+        return open_sessions[-1] if open_sessions else None
+
+    def accepting(self, form_name: str) -> bool:
+        # A database without sessions gets the default one on first submit
+        return not self.sessions or self.for_form(form_name) is not None
+
+
+# -----------------------------
+# PROCESS-WIDE DIRECTORY
+# -----------------------------
+_directory: SessionDirectory | None = None
+_lock = asyncio.Lock()
+_refresh_task: asyncio.Task | None = None
+
+
+async def load(db=None) -> SessionDirectory:
+    global _directory
+
+    async with _lock:
+        if db is None:
+            async with AsyncSessionLocal() as own_db:
+                sessions, active = await _read(own_db)
+        else:
+            sessions, active = await _read(db)
+        _directory = SessionDirectory(sessions, active)
+
+    return _directory
+
+
+async def _read(db):
+    FS = models.FeedbackSession
+    sessions = (await db.execute(
+        select(FS.session_id, FS.session_name, FS.created_at, FS.closed_at)
+    )).tuples().all()
+    active = (await db.execute(
+        select(models.FormSession.form_name, models.FormSession.session_id)
+    )).tuples().all()
+    return sessions, active
+
+
+async def current(db=None) -> SessionDirectory:
+    directory = _directory
+    if directory is None:
+        directory = await load(db)
+    return directory
+
+
+def clear():
+    # Call after the tables are reset (reset_db.py, tests)
+    global _directory
+    _directory = None
+
+
+async def session_for_form(db, form_name: str) -> int:
+    # session_id a submission of this form is filed under
+    directory = await current(db)
+    session = directory.for_form(form_name)
+    if session is not None:
+        return session.id
+
+    if not directory.sessions:
+        session_id = await submissions.get_session_id(db)
+        await load(db)
+        return session_id
+
+    raise SessionClosedError(form_name)
+
+
+# -----------------------------
+# ADMIN ACTIONS
+# Each one commits, reloads this worker's directory and drops cached
+# dashboard views; other workers follow within REFRESH_SECONDS
+# -----------------------------
+async def _changed(db) -> SessionDirectory:
+    await db.commit()
+    cache.bump_data_version()
+    replica.router.mark_written()
+    return await load(db)
+
+
+async def _get_session(db, session_id: int):
+    session = await db.get(models.FeedbackSession, session_id)
+    if session is None:
+        raise LookupError(session_id)
+    return session
+
+
+async def create(db, name: str) -> int:
+    exists = await db.scalar(
+        select(models.FeedbackSession.session_id)
+        .where(models.FeedbackSession.session_name == name)
+        .limit(1)
+    )
+    if exists is not None:
+        raise SessionExistsError(name)
+
+    result = await db.execute(insert(models.FeedbackSession).values(session_name=name))
+    session_id = result.inserted_primary_key[0]
+    await _changed(db)
+    return session_id
+
+
+async def activate(db, session_id: int, form_names=None):
+    # Route the given forms (default: every form) to an open session
+    session = await _get_session(db, session_id)
+    if session.closed_at is not None:
+        raise SessionClosedError(session.session_name)
+
+    form_names = sorted(form_names or form_pages.FORM_STAKEHOLDERS)
+    await db.execute(delete(models.FormSession).where(models.FormSession.form_name.in_(form_names)))
+    await db.execute(
+        insert(models.FormSession.__table__),
+        [{"form_name": f, "session_id": session_id} for f in form_names]
+    )
+    await _changed(db)
+
+
+async def close(db, session_id: int):
+    # Stop accepting feedback and freeze the session's results for trends.
+    # The UPDATE must be the transaction's first statement: it waits for the
+    # shared locks of submissions still filing into the session (and for the
+    # write lock on SQLite) before anything is read, so the snapshot's plain
+    # reads start after those commits. A plain read first would fix InnoDB's
+    # read view early and leave them out of the snapshot.
+    FS = models.FeedbackSession
+    result = await db.execute(
+        update(FS)
+        .where(FS.session_id == session_id)
+        .values(closed_at=func.coalesce(FS.closed_at, func.now()))
+    )
+    if result.rowcount == 0:
+        raise LookupError(session_id)
+    await db.execute(delete(models.FormSession).where(models.FormSession.session_id == session_id))
+    await db.run_sync(lambda s: trends.take_snapshot(s.connection(), session_id))
+    await _changed(db)
+
+
+async def reopen(db, session_id: int):
+    await _get_session(db, session_id)
+    await db.execute(
+        update(models.FeedbackSession)
+        .where(models.FeedbackSession.session_id == session_id)
+        .values(closed_at=None)
+    )
+    # Results may change again; trends read the live counters meanwhile
+    await db.execute(delete(models.SessionSnapshot).where(models.SessionSnapshot.session_id == session_id))
+    await _changed(db)
+
+
+async def overview(db) -> list[dict]:
+    # Every session with its respondents and the forms feeding it
+    directory = await load(db)
+    respondents = dict((await db.execute(
+        select(models.RespondentCount.session_id, func.sum(models.RespondentCount.respondents))
+        .group_by(models.RespondentCount.session_id)
+    )).tuples().all())
+
+    return [
+        {
+            "session_id": s.id,
+            "name": s.name,
+            "open": s.is_open,
+            "created_at": s.created_at.isoformat() if s.created_at else None,
+            "closed_at": s.closed_at.isoformat() if s.closed_at else None,
+            "respondents": int(respondents.get(s.id) or 0),
+            "forms": sorted(
+                f for f in form_pages.FORM_STAKEHOLDERS
+                if (active := directory.for_form(f)) is not None and active.id == s.id
+            )
+        }
+        for s in directory.sessions
+    ]
+
+
+async def _refresh_loop(seconds: float):
+    while True:
+        await asyncio.sleep(seconds)
+        try:
+            await load()
+        except Exception:
+            logger.exception("Feedback session refresh failed")
+
+
+async def start(refresh_seconds: float = REFRESH_SECONDS):
+    global _refresh_task
+    await load()
+    if refresh_seconds > 0:
+        _refresh_task = asyncio.create_task(_refresh_loop(refresh_seconds))
+
+
+async def stop():
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
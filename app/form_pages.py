@@ -0,0 +1,91 @@
+import hashlib
+import os
+from typing import NamedTuple
+from dotenv import load_dotenv
+from fastapi.responses import Response
+
+load_dotenv()
+
+# -----------------------------
+# FEEDBACK FORM PAGE SETTINGS (.env)
+# -----------------------------
+# FORM_PRERENDER      1 = render each form once per question-catalog version
+#                     0 = render on every request (while editing templates)
+PRERENDER = os.getenv("FORM_PRERENDER", "1").lower() in ("1", "true", "yes")
+
+# Map form names to stakeholder_type values
+FORM_STAKEHOLDERS = {
+    "studentfeedback": "STUDENT",
+    "parentfeedback": "PARENT",
+    "alumnifeedback": "ALUMNI",
+    "internalfaculty": "TEACHER",
+    "externalfaculty": "OUTSIDE_TEACHER",
+    "industryrep": "EMPLOYER"
+}
+
+
+class RenderedForm(NamedTuple):
+    body: bytes
+    etag: str
+
+
+_pages: dict[str, RenderedForm] = {}
+_catalog_version: str | None = None
+
+
+def render(templates, form_name: str, catalog) -> RenderedForm:
+    stakeholder = FORM_STAKEHOLDERS[form_name]
+    html = templates.get_template(f"feedbackForms/{form_name}.html").render(
+        questions=catalog.for_stakeholder(stakeholder),
+        form_name=form_name
+    )
+    body = html.encode("utf-8")
+    # Strong validator: same bytes <=> same ETag, on every worker
+    return RenderedForm(body, '"' + hashlib.sha1(body).hexdigest() + '"')
+
+
+def get_page(templates, form_name: str, catalog) -> RenderedForm:
+    global _catalog_version
+
+    if not PRERENDER:
+        return render(templates, form_name, catalog)
+
+    if catalog.version != _catalog_version:
+        _pages.clear()
+        _catalog_version = catalog.version
+
+    page = _pages.get(form_name)
+    if page is None:
+        page = _pages[form_name] = render(templates, form_name, catalog)
+    return page
+
+
+def clear():
+    global _catalog_version
+    _pages.clear()
+    _catalog_version = None
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match uses weak comparison: W/"x" matches "x"
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def page_response(request, page: RenderedForm) -> Response:
+    # Revalidated on every visit, so a form whose session has closed gets its
+    # 409 right away instead of sitting in a cache; an unchanged page still
+    # costs only a 304
+    headers = {
+        "ETag": page.etag,
+        "Cache-Control": "no-cache"
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), page.etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(page.body, media_type="text/html", headers=headers)
@@ -0,0 +1,324 @@
+"""
+Synthetic feedback for capacity testing.
+
+Generates respondents for every stakeholder type against the real question
+set (seeded from setup_database.sql if the table is empty): ratings drawn
+from a configurable distribution, demographic values taken from the same
+options the forms offer, and free-text suggestions. Rows are written with
+multi-row INSERTs in --batch sized chunks (or MySQL's LOAD DATA LOCAL
+INFILE with --method load-data), then the dashboard summary and facet
+tables are rebuilt once at the end.
+
+Person ids are assigned here, so run it against an idle database.
+
+Usage:
+
+    uv run python app/generate_data.py --respondents 200000
+    uv run python app/generate_data.py --respondents 1000000 --ratings positive PARENT=1,1,2,4,6
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import csv
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, func, insert, select, text
+
+import facets
+import migrate
+import models
+import stats
+from database import engine, URL_DATABASE
+from seed_questions import seed_questions
+from submissions import DEFAULT_SESSION_NAME
+
+STAKEHOLDER_TYPES = ["STUDENT", "PARENT", "ALUMNI", "TEACHER", "OUTSIDE_TEACHER", "EMPLOYER"]
+
+# Weights for ratings 1..5
+DISTRIBUTIONS = {
+    "uniform": (1, 1, 1, 1, 1),
+    "positive": (0.05, 0.10, 0.20, 0.35, 0.30),
+    "negative": (0.30, 0.35, 0.20, 0.10, 0.05),
+    "neutral": (0.05, 0.20, 0.50, 0.20, 0.05),
+    "polarized": (0.30, 0.10, 0.10, 0.20, 0.30),
+}
+
+# -----------------------------
+# FORM OPTIONS (same lists as templates/feedbackForms/*.html)
+# -----------------------------
+COURSES = [
+    "BCom", "B.Com (Accounting & Finance)", "B.Com (Banking & Insurance)",
+    "B.Com (Financial Market)", "BSc IT", "BSc CS", "BMS", "BAMMC", "BSc DS",
+    "MCom", "MA Economics", "MSc IT", "MSc CS", "OTHER"
+]
+ACADEMIC_YEARS = ["2023–24", "2024–25", "2025–26", "2026–27"]
+CLASSES = ["FY", "SY", "TY", "PG-1", "PG-2"]
+
+FIRST_NAMES = [
+    "Aarav", "Aditi", "Ananya", "Arjun", "Diya", "Ishaan", "Kavya", "Meera", "Neha",
+    "Nikhil", "Pooja", "Priya", "Rahul", "Riya", "Rohan", "Sahil", "Sneha", "Tanvi",
+    "Varun", "Vikram"
+]
+LAST_NAMES = [
+    "Desai", "Gupta", "Iyer", "Joshi", "Kulkarni", "Menon", "Nair", "Patel", "Pillai",
+    "Rao", "Shah", "Sharma", "Shetty", "Singh", "Verma"
+]
+ORGANIZATIONS = [
+    "Tata Consultancy Services", "Infosys", "HDFC Bank", "Deloitte", "Accenture",
+    "Reliance Industries", "Kotak Mahindra Bank", "L&T Infotech", "KPMG", "Wipro"
+]
+COLLEGES = [
+    "Ruia College", "KC College", "Mithibai College", "NM College", "Jai Hind College",
+    "St. Xavier's College"
+]
+DESIGNATIONS = ["HR Manager", "Team Lead", "Director", "Senior Analyst", "Recruiter", "Partner"]
+SUBJECTS = [
+    "Financial Accounting", "Data Structures", "Business Economics", "Marketing",
+    "Database Systems", "Statistics", "Corporate Law", "Python Programming"
+]
+SUGGESTIONS = [
+    "More practical sessions and industry visits would help.",
+    "Include more case studies from current industry practice.",
+    "Add electives on data analytics and AI.",
+    "Assessment should focus more on projects than rote learning.",
+    "Internships should be part of the curriculum.",
+    "Guest lectures by alumni would be valuable.",
+    "Reduce overlap between semesters.",
+    "More flexibility in choosing subjects under NEP.",
+    "Soft skills and communication training should be added.",
+    "Overall satisfied with the syllabus.",
+]
+
+
+def demographic_value(question_text: str, rng, person: dict) -> str:
+    # Mirrors the option branches of the form templates; free-text fields
+    # get plausible values for the person being generated
+    t = question_text.lower()
+
+    if "course" in t or "program" in t or "stream" in t:
+        return rng.choice(COURSES)
+    if "academic year" in t:
+        return rng.choice(ACADEMIC_YEARS)
+    if "class" in t or "fy" in t or "sy" in t or "ty" in t:
+        return rng.choice(CLASSES)
+    if "email" in t:
+        return f"{person['first'].lower()}.{person['last'].lower()}{person['id'] % 1000}@example.edu"
+    if "roll" in t or "prn" in t:
+        return f"PRN{person['id']:08d}"
+    if "ward" in t:
+        return f"{rng.choice(FIRST_NAMES)} {person['last']}"
+    if "designation" in t:
+        return rng.choice(DESIGNATIONS)
+    if "college" in t:
+        return rng.choice(COLLEGES)
+    if "institution" in t or "organization" in t:
+        return rng.choice(ORGANIZATIONS)
+    if "subject" in t:
+        return rng.choice(SUBJECTS)
+    if "semester" in t or "years" in t:
+        return f"Semester {rng.randint(1, 6)}"
+    if "name" in t:
+        return f"{person['first']} {person['last']}"
+    return "N/A"
+
+
+def parse_ratings(specs) -> dict:
+    # ["positive", "PARENT=1,1,2,4,6"] -> {None: weights, "PARENT": weights}
+    ratings = {None: DISTRIBUTIONS["positive"]}
+    for spec in specs:
+        stakeholder_type, _, value = spec.rpartition("=")
+        if value in DISTRIBUTIONS:
+            weights = DISTRIBUTIONS[value]
+        else:
+            try:
+                weights = tuple(float(w) for w in value.split(","))
+            except ValueError:
+                weights = ()
+            if len(weights) != 5 or min(weights) < 0 or not sum(weights):
+                raise SystemExit(
+                    f"--ratings {spec!r}: use one of {', '.join(DISTRIBUTIONS)} "
+                    "or five weights like 1,1,2,4,6"
+                )
+        ratings[stakeholder_type or None] = weights
+    return ratings
+
+
+# -----------------------------
+# LOOKUP ROWS
+# -----------------------------
+def get_or_create(conn, model, column, value, pk):
+    found = conn.scalar(select(pk).where(column == value).limit(1))
+    if found is not None:
+        return found
+    return conn.execute(insert(model).values({column.key: value})).inserted_primary_key[0]
+
+
+def prepare(conn, session_name, types):
+    seed_questions(conn)
+
+    questions = {}
+    for q in conn.execute(
+        select(
+            models.SyllabusQuestion.id,
+            models.SyllabusQuestion.stakeholder_type,
+            models.SyllabusQuestion.category,
+            models.SyllabusQuestion.text
+        ).order_by(models.SyllabusQuestion.id)
+    ):
+        questions.setdefault(q.stakeholder_type, []).append(q)
+
+    missing = [t for t in types if t not in questions]
+    if missing:
+        raise SystemExit(f"No questions for {', '.join(missing)}")
+
+    session_id = get_or_create(
+        conn, models.FeedbackSession, models.FeedbackSession.session_name,
+        session_name, models.FeedbackSession.session_id
+    )
+    stakeholder_ids = {
+        t: get_or_create(
+            conn, models.Stakeholder, models.Stakeholder.stakeholder_type,
+            t, models.Stakeholder.stakeholder_id
+        )
+        for t in types
+    }
+    next_person = (conn.scalar(select(func.max(models.StakeholderPersonalInfo.person_id))) or 0) + 1
+    return questions, session_id, stakeholder_ids, next_person
+
+
+# -----------------------------
+# GENERATION
+# -----------------------------
+def generate(count, types, questions, session_id, stakeholder_ids, first_person,
+             ratings, suggestion_rate, rng, batch):
+    # Yields (people, answers) chunks of about `batch` answer rows
+    people, answers = [], []
+
+    for person_id in range(first_person, first_person + count):
+        stakeholder_type = types[person_id % len(types)]
+        weights = ratings.get(stakeholder_type, ratings[None])
+        person = {"id": person_id, "first": rng.choice(FIRST_NAMES), "last": rng.choice(LAST_NAMES)}
+
+        people.append({
+            "person_id": person_id,
+            "session_id": session_id,
+            "stakeholder_id": stakeholder_ids[stakeholder_type],
+            "name": "N/A",
+            "association_name": None
+        })
+
+        for q in questions[stakeholder_type]:
+            score = None
+            if q.category == "SYLLABUS":
+                score = rng.choices((1, 2, 3, 4, 5), weights)[0]
+                value = str(score)
+            elif q.category == "DEMOGRAPHIC":
+                value = demographic_value(q.text, rng, person)
+            elif rng.random() < suggestion_rate:
+                value = rng.choice(SUGGESTIONS)
+            else:
+                continue  # optional field left empty
+            answers.append({
+                "person_id": person_id,
+                "question_id": q.id,
+                "answer_text": value,
+                "score": score
+            })
+
+        if len(answers) >= batch:
+            yield people, answers
+            people, answers = [], []
+
+    if people:
+        yield people, answers
+
+
+def insert_chunk(conn, people, answers):
+    # executemany: the MySQL driver sends these as multi-row INSERTs
+    conn.execute(insert(models.StakeholderPersonalInfo.__table__), people)
+    if answers:
+        conn.execute(insert(models.FeedbackAnswer.__table__), answers)
+
+
+def load_data_chunk(conn, people, answers):
+    # MySQL bulk-load path: answers go through a CSV file and LOAD DATA
+    conn.execute(insert(models.StakeholderPersonalInfo.__table__), people)
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", encoding="utf-8", delete=False) as f:
+        writer = csv.writer(f, lineterminator="\n")
+        for a in answers:
+            writer.writerow((a["person_id"], a["question_id"], a["answer_text"], a["score"] or ""))
+        path = f.name
+    try:
+        conn.execute(text(
+            "LOAD DATA LOCAL INFILE :path INTO TABLE feedback_answers "
+            "CHARACTER SET utf8mb4 FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+            "LINES TERMINATED BY '\\n' (person_id, question_id, answer_text, @score) "
+            "SET score = NULLIF(@score, '')"
+        ), {"path": path})
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic feedback respondents")
+    parser.add_argument("--respondents", type=int, default=10_000)
+    parser.add_argument("--types", nargs="+", choices=STAKEHOLDER_TYPES, default=STAKEHOLDER_TYPES,
+                        help="Stakeholder types to generate, round-robin")
+    parser.add_argument("--ratings", nargs="+", default=["positive"],
+                        help=f"{'/'.join(DISTRIBUTIONS)} or weights for 1..5, optionally TYPE=...")
+    parser.add_argument("--suggestion-rate", type=float, default=0.4,
+                        help="Share of respondents who fill in each suggestion box")
+    parser.add_argument("--session", default=DEFAULT_SESSION_NAME)
+    parser.add_argument("--batch", type=int, default=20_000, help="Answer rows per INSERT/commit")
+    parser.add_argument("--method", choices=["insert", "load-data"], default="insert")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    ratings = parse_ratings(args.ratings)
+    rng = random.Random(args.seed)
+
+    target = engine
+    write_chunk = insert_chunk
+    if args.method == "load-data":
+        if engine.dialect.name != "mysql":
+            raise SystemExit("--method load-data needs MySQL")
+        # local_infile must also be enabled on the server
+        target = create_engine(URL_DATABASE, connect_args={"local_infile": True})
+        write_chunk = load_data_chunk
+
+    migrate.setup(engine)
+
+    with engine.begin() as conn:
+        questions, session_id, stakeholder_ids, first_person = prepare(conn, args.session, args.types)
+
+    start = time.perf_counter()
+    people_total = answers_total = 0
+    chunks = generate(
+        args.respondents, args.types, questions, session_id, stakeholder_ids,
+        first_person, ratings, args.suggestion_rate, rng, args.batch
+    )
+    for people, answers in chunks:
+        with target.begin() as conn:
+            write_chunk(conn, people, answers)
+        people_total += len(people)
+        answers_total += len(answers)
+        elapsed = time.perf_counter() - start
+        print(f"\r{people_total:>10} respondents {answers_total:>12} answers "
+              f"{answers_total / elapsed:>10.0f} rows/s", end="", flush=True)
+    print()
+
+    # Summary tables once at the end instead of per chunk
+    with engine.begin() as conn:
+        stats.rebuild(conn)
+        facets.rebuild(conn)
+
+    print(f"Done in {time.perf_counter() - start:.1f}s "
+          f"({people_total} respondents, {answers_total} answers).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import os
+import time
+from dotenv import load_dotenv
+from database import AsyncSessionLocal
+import submissions
+import cache
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# WRITE-BEHIND SETTINGS (.env)
+# -----------------------------
+# FEEDBACK_WRITE_BEHIND   1 = queue submissions and write them in batches
+# INGEST_BATCH_SIZE       flush after this many submissions ...
+# INGEST_FLUSH_MS         ... or after this many ms, whichever comes first
+# INGEST_QUEUE_SIZE       submissions held in memory before backpressure
+# INGEST_DURABILITY       "flush"   = respond after the batch is committed
+#                         "enqueue" = respond as soon as it is queued
+# INGEST_ENQUEUE_TIMEOUT_MS  how long a request waits for room in a full queue
+WRITE_BEHIND = os.getenv("FEEDBACK_WRITE_BEHIND", "0").lower() in ("1", "true", "yes")
+BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "50"))
+FLUSH_MS = int(os.getenv("INGEST_FLUSH_MS", "200"))
+QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "1000"))
+DURABILITY = os.getenv("INGEST_DURABILITY", "flush").lower()
+ENQUEUE_TIMEOUT_MS = int(os.getenv("INGEST_ENQUEUE_TIMEOUT_MS", "2000"))
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class IngestQueue:
+    def __init__(
+        self,
+        write_batch=None,
+        batch_size: int = BATCH_SIZE,
+        flush_ms: int = FLUSH_MS,
+        queue_size: int = QUEUE_SIZE,
+        durability: str = DURABILITY,
+        enqueue_timeout_ms: int = ENQUEUE_TIMEOUT_MS
+    ):
+        if durability not in ("flush", "enqueue"):
+            raise ValueError(f"Unknown INGEST_DURABILITY: {durability}")
+
+        self.write_batch = write_batch or write_to_database
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self.durability = durability
+        self.enqueue_timeout = enqueue_timeout_ms / 1000
+
+        self._queue = asyncio.Queue(maxsize=queue_size)
+        self._task = None
+        self._closing = False
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def submit(self, stakeholder_type: str, answers, session_id: int | None = None):
+        if self._closing:
+            raise QueueFullError("Ingest queue is shutting down")
+
+        future = asyncio.get_running_loop().create_future()
+
+        # Backpressure: wait a bounded time for room, then give up
+        try:
+            await asyncio.wait_for(
+                self._queue.put(((stakeholder_type, answers, session_id), future)),
+                timeout=self.enqueue_timeout
+            )
+        except asyncio.TimeoutError:
+            raise QueueFullError("Ingest queue is full")
+
+        if self.durability == "flush":
+            await future
+
+    async def stop(self):
+        # Stop accepting, write whatever is still queued, then exit
+        self._closing = True
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        # Requests that were blocked on a full queue may have landed late
+        await self._drain()
+
+    async def _run(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            stop_after = False
+
+            # Collect until the batch is full or the flush interval runs out
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stop_after = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+            if stop_after:
+                await self._drain()
+                return
+
+    async def _drain(self):
+        batch = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                batch.append(item)
+            if len(batch) >= self.batch_size:
+                await self._flush(batch)
+                batch = []
+        if batch:
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        items = [item for item, _ in batch]
+
+        try:
+            await self.write_batch(items)
+            failures = [None] * len(batch)
+        except Exception:
+            logger.exception("Batch of %d submissions failed, retrying one by one", len(batch))
+            failures = []
+            # One bad submission must not sink the rest of the batch
+            for item in items:
+                try:
+                    await self.write_batch([item])
+                    failures.append(None)
+                except Exception as exc:
+                    logger.exception("Dropping submission for %s", item[0])
+                    failures.append(exc)
+
+        for (_, future), exc in zip(batch, failures):
+            if future.done():
+                continue
+            if exc is None:
+                future.set_result(None)
+            elif self.durability == "flush":
+                future.set_exception(exc)
+            else:
+                # Nobody is waiting on this future in enqueue mode
+                future.set_result(None)
+
+
+async def write_to_database(items):
+    # items: list of (stakeholder_type, answers, session_id); one transaction
+    # per batch. A session_id of None means the default session.
+    async with AsyncSessionLocal() as db:
+        batch = [
+            (
+                session_id if session_id is not None else await submissions.get_session_id(db),
+                await submissions.get_stakeholder_id(db, stakeholder_type),
+                answers
+            )
+            for stakeholder_type, answers, session_id in items
+        ]
+        await submissions.add_submissions(db, batch)
+        await db.commit()
+    cache.bump_data_version()
+
+
+# Set by start_ingest() when FEEDBACK_WRITE_BEHIND is enabled
+ingest_queue: IngestQueue | None = None
+
+
+def start_ingest():
+    global ingest_queue
+    if WRITE_BEHIND:
+        ingest_queue = IngestQueue()
+        ingest_queue.start()
+
+
+async def stop_ingest():
+    global ingest_queue
+    if ingest_queue is not None:
+        await ingest_queue.stop()
+        ingest_queue = None
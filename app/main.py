@@ -1,31 +1,61 @@
 from fastapi import FastAPI, Depends, Request, HTTPException
 from typing import Annotated
+from contextlib import asynccontextmanager
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-import models
-from database import engine, SessionLocal
-from sqlalchemy.orm import Session
+import export_jobs
+import feedback_sessions
+import ingest
+import metrics
+import migrate
+import question_catalog
+import replica
+import database
+from database import engine, async_engine, AsyncSessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
 from routes import client, admin
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if database.POOL_WARMUP:
+        await database.warm_up()
+    # Questions are read once here and shared by every route
+    await question_catalog.start()
+    await feedback_sessions.start()
+    ingest.start_ingest()
+    export_jobs.jobs.start()
+    yield
+    # Write out queued submissions before the pool goes away
+    await ingest.stop_ingest()
+    await question_catalog.stop()
+    await feedback_sessions.stop()
+    export_jobs.jobs.stop()
+    # Close pooled async connections cleanly on shutdown
+    await async_engine.dispose()
+    await replica.router.dispose()
+
 app = FastAPI(
+    lifespan=lifespan,
     docs_url=None,
     redoc_url=None,      
     openapi_url=None
 )
+# Per-route latency and query counts, served on /admin/metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Include Routers
 app.include_router(client.router)
 app.include_router(admin.router)
 
-models.Base.metadata.create_all(bind=engine)
+# Create missing tables and bring existing databases up to the current
+# schema version; serialized between workers starting together
+migrate.setup(engine)
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 
 # Mount static files for images and JS
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
@@ -0,0 +1,278 @@
+import threading
+import time
+from contextvars import ContextVar
+
+# -----------------------------
+# PROCESS METRICS (Prometheus text format)
+# -----------------------------
+# Kept in memory per worker process; scrape each worker (or run one) to see
+# everything. Written by the request middleware below and by the engine
+# event hooks in database.py.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 1000)
+WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._max = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+            if value > self._max.get(labels, 0):
+                self._max[labels] = value
+
+    def count(self, *labels):
+        series = self._series.get(labels)
+        return series[-1] if series else 0
+
+    def sum(self, *labels):
+        series = self._series.get(labels)
+        return series[-2] if series else 0
+
+    def max(self, *labels):
+        # Not exported; for the JSON reports
+        return self._max.get(labels, 0.0)
+
+    def quantile(self, q: float, *labels) -> float:
+        # Upper bound of the bucket holding the q-th observation
+        series = self._series.get(labels)
+        if not series:
+            return 0.0
+        target = q * series[-1]
+        for bound, n in zip(self.buckets, series):
+            if n >= target:
+                return bound
+        return self.max(*labels)
+
+    def samples(self):
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in items:
+            for bound, n in zip(self.buckets + (float("inf"),), series[:-2] + [series[-1]]):
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.label_names, labels, le)} {n}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {_number(series[-2])}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {series[-1]}"
+
+
+class Gauge:
+    # Read when scraped, from a callback returning {labels tuple: value}
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels=(), read=None):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.read = read or dict
+
+    def samples(self):
+        for labels, value in sorted(self.read().items()):
+            yield f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+
+
+REGISTRY = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------
+# METRICS
+# -----------------------------
+REQUESTS = register(Counter(
+    "http_requests_total", "HTTP requests by route and status.",
+    ("method", "route", "status")
+))
+REQUEST_SECONDS = register(Histogram(
+    "http_request_duration_seconds", "Time from request start to last body byte.",
+    ("method", "route")
+))
+REQUEST_QUERIES = register(Histogram(
+    "http_request_db_queries", "SQL statements executed per request.",
+    ("method", "route"), QUERY_COUNT_BUCKETS
+))
+REQUEST_QUERY_SECONDS = register(Histogram(
+    "http_request_db_query_seconds", "Time spent in SQL per request.",
+    ("method", "route")
+))
+QUERIES = register(Counter(
+    "db_queries_total", "SQL statements executed, including background work.",
+    ("engine",)
+))
+QUERY_SECONDS = register(Counter(
+    "db_query_seconds_total", "Time spent executing SQL statements.",
+    ("engine",)
+))
+POOL_WAIT_SECONDS = register(Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to get a connection from the pool (includes opening new ones).",
+    ("engine",), WAIT_BUCKETS
+))
+POOL_TIMEOUTS = register(Counter(
+    "db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT.",
+    ("engine",)
+))
+
+_engines = {}  # engine label -> engine (its pool is replaced on dispose)
+
+
+def _pool_state():
+    values = {}
+    for label, engine in _engines.items():
+        pool = engine.pool
+        if not hasattr(pool, "checkedout"):
+            continue  # NullPool/StaticPool keep no counts
+        values[(label, "in_use")] = pool.checkedout()
+        values[(label, "idle")] = pool.checkedin()
+        values[(label, "size")] = pool.size()
+        values[(label, "overflow")] = max(pool.overflow(), 0)
+    return values
+
+
+POOL_CONNECTIONS = register(Gauge(
+    "db_pool_connections", "Pooled connections by state.",
+    ("engine", "state"), _pool_state
+))
+
+
+def watch_engine(label: str, engine):
+    _engines[label] = engine
+
+
+# -----------------------------
+# PER-REQUEST QUERY TRACKING
+# -----------------------------
+class RequestStats:
+    __slots__ = ("queries", "query_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def query_finished(engine_label: str, seconds: float):
+    QUERIES.inc(engine_label)
+    QUERY_SECONDS.inc(engine_label, amount=seconds)
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += seconds
+
+
+def route_label(scope) -> str:
+    # Route templates (/admin/responses), never raw paths, so ids in URLs
+    # don't create a series each
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    # Plain ASGI middleware so streamed responses (exports) are timed to
+    # their last byte and their queries are counted against the route
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            method = scope["method"]
+            route = route_label(scope)
+            REQUESTS.inc(method, route, str(status))
+            REQUEST_SECONDS.observe(time.perf_counter() - start, method, route)
+            REQUEST_QUERIES.observe(stats.queries, method, route)
+            REQUEST_QUERY_SECONDS.observe(stats.query_seconds, method, route)
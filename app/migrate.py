@@ -0,0 +1,247 @@
+import sys
+import os
+import time
+import importlib
+import pkgutil
+from contextlib import contextmanager, nullcontext
+from sqlalchemy import Index, MetaData, Table, delete, func, inspect, insert, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateColumn
+from database import engine
+import models
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# -----------------------------
+# MIGRATION LOCK SETTINGS (.env)
+# -----------------------------
+# MIGRATE_LOCK_TIMEOUT_SECONDS  how long a starting worker waits for another
+#                               worker's migration to finish before failing
+LOCK_NAME = "syllabus_feedback_migrate"
+LOCK_TIMEOUT_SECONDS = int(os.getenv("MIGRATE_LOCK_TIMEOUT_SECONDS", "600"))
+
+# -----------------------------
+# MIGRATION DISCOVERY
+# app/migrations/m0001_<name>.py, m0002_<name>.py, ... each defining
+# DESCRIPTION, upgrade(conn) and downgrade(conn). Steps must be idempotent:
+# a fresh database already gets the latest schema from create_all.
+# -----------------------------
+def load_migrations():
+    migrations = []
+    for info in pkgutil.iter_modules([MIGRATIONS_DIR]):
+        if not info.name.startswith("m"):
+            continue
+        version = int(info.name[1:].split("_")[0])
+        module = importlib.import_module(f"migrations.{info.name}")
+        migrations.append((version, module))
+    return sorted(migrations, key=lambda m: m[0])
+
+
+def head_version():
+    migrations = load_migrations()
+    return migrations[-1][0] if migrations else 0
+
+
+def current_version(conn) -> int:
+    models.SchemaVersion.__table__.create(conn, checkfirst=True)
+    return conn.scalar(select(func.max(models.SchemaVersion.version))) or 0
+
+
+def stamp(conn):
+    # Record every step as applied, for a database created straight at the
+    # latest schema (create_all, reset_db.py, setup_database.sql)
+    current = current_version(conn)
+    rows = [
+        {"version": v, "description": module.DESCRIPTION}
+        for v, module in load_migrations()
+        if v > current
+    ]
+    if rows:
+        conn.execute(insert(models.SchemaVersion), rows)
+
+
+# -----------------------------
+# MIGRATION LOCK
+# Workers started together would race on the schema_version insert and
+# each rebuild the summary tables; the first one migrates, the others wait
+# and then find nothing left to do
+# -----------------------------
+@contextmanager
+def locked(bind=engine, timeout: int = LOCK_TIMEOUT_SECONDS):
+    # Yields the connection the steps must share (SQLite: the lock is the
+    # write transaction itself), or None when each step may use its own
+    with bind.connect() as conn:
+        if conn.dialect.name == "mysql":
+            got = conn.scalar(text("SELECT GET_LOCK(:name, :timeout)"), {"name": LOCK_NAME, "timeout": timeout})
+            conn.commit()
+            if got != 1:
+                raise TimeoutError(f"Timed out waiting for the {LOCK_NAME} lock")
+            try:
+                yield None
+            finally:
+                conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": LOCK_NAME})
+                conn.commit()
+        elif conn.dialect.name == "sqlite":
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    conn.exec_driver_sql("BEGIN IMMEDIATE")
+                    break
+                except OperationalError:
+                    # busy_timeout ran out while another worker migrates
+                    conn.rollback()
+                    if time.monotonic() > deadline:
+                        raise
+            yield conn
+            conn.commit()
+        else:
+            yield None
+
+
+def _step(bind, conn):
+    # One transaction per step unless the lock already holds one
+    return nullcontext(conn) if conn is not None else bind.begin()
+
+
+def setup(bind=engine):
+    # Startup path: create missing tables, stamp a brand-new database at
+    # head (create_all already built the latest schema), migrate the rest
+    with locked(bind) as lock_conn:
+        with _step(bind, lock_conn) as conn:
+            fresh = not inspect(conn).has_table(models.Stakeholder.__tablename__)
+            models.Base.metadata.create_all(bind=conn)
+            if fresh:
+                stamp(conn)
+        return _upgrade(bind, lock_conn)
+
+
+def upgrade(bind=engine, target: int | None = None):
+    with locked(bind) as lock_conn:
+        return _upgrade(bind, lock_conn, target)
+
+
+def _upgrade(bind, lock_conn, target: int | None = None):
+    applied = []
+    for version, module in load_migrations():
+        if target is not None and version > target:
+            break
+        # One transaction per step (MySQL commits DDL implicitly anyway)
+        with _step(bind, lock_conn) as conn:
+            if version <= current_version(conn):
+                continue
+            module.upgrade(conn)
+            conn.execute(
+                insert(models.SchemaVersion).values(
+                    version=version,
+                    description=module.DESCRIPTION
+                )
+            )
+        applied.append(version)
+    return applied
+
+
+def downgrade(bind=engine, target: int = 0):
+    with locked(bind) as lock_conn:
+        return _downgrade(bind, lock_conn, target)
+
+
+def _downgrade(bind, lock_conn, target: int):
+    reverted = []
+    for version, module in reversed(load_migrations()):
+        if version <= target:
+            break
+        with _step(bind, lock_conn) as conn:
+            if version > current_version(conn):
+                continue
+            module.downgrade(conn)
+            conn.execute(
+                delete(models.SchemaVersion)
+                .where(models.SchemaVersion.version == version)
+            )
+        reverted.append(version)
+    return reverted
+
+
+# -----------------------------
+# HELPERS FOR MIGRATION STEPS
+# -----------------------------
+def reflect(conn, table_name):
+    return Table(table_name, MetaData(), autoload_with=conn)
+
+
+def has_index(conn, table_name, name) -> bool:
+    return any(ix["name"] == name for ix in inspect(conn).get_indexes(table_name))
+
+
+def create_index(conn, name, table_name, *columns, unique=False):
+    if has_index(conn, table_name, name):
+        return
+    table = reflect(conn, table_name)
+    Index(name, *(table.c[c] for c in columns), unique=unique).create(conn)
+
+
+def drop_index(conn, name, table_name):
+    insp = inspect(conn)
+    indexes = insp.get_indexes(table_name)
+    target = next((ix for ix in indexes if ix["name"] == name), None)
+    if target is None:
+        return
+
+    # MySQL reuses a composite index to back a foreign key on its leading
+    # column and refuses to drop it; give the key its own index first
+    lead = target["column_names"][0]
+    fk_columns = {
+        column
+        for fk in insp.get_foreign_keys(table_name)
+        for column in fk["constrained_columns"]
+    }
+    covered = any(
+        ix["name"] != name and ix["column_names"][:1] == [lead]
+        for ix in indexes
+    )
+    if conn.dialect.name == "mysql" and lead in fk_columns and not covered:
+        create_index(conn, f"ix_{table_name}_{lead}", table_name, lead)
+
+    table = reflect(conn, table_name)
+    Index(name, *(table.c[c] for c in target["column_names"])).drop(conn)
+
+
+def has_column(conn, table_name, name) -> bool:
+    return any(c["name"] == name for c in inspect(conn).get_columns(table_name))
+
+
+def add_column(conn, table_name, column):
+    if has_column(conn, table_name, column.name):
+        return
+    ddl = CreateColumn(column).compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {ddl}"))
+
+
+def drop_column(conn, table_name, name):
+    if not has_column(conn, table_name, name):
+        return
+    conn.execute(text(f"ALTER TABLE {table_name} DROP COLUMN {name}"))
+
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else "upgrade"
+    target = int(argv[2]) if len(argv) > 2 else None
+
+    if command == "upgrade":
+        applied = upgrade(engine, target)
+        print(f"Applied: {applied or 'nothing, already up to date'}")
+    elif command == "downgrade":
+        reverted = downgrade(engine, target or 0)
+        print(f"Reverted: {reverted or 'nothing'}")
+    elif command != "current":
+        print("Usage: python app/migrate.py [upgrade [version] | downgrade [version] | current]")
+        return 1
+
+    with engine.connect() as conn:
+        print(f"Schema version: {current_version(conn)} (head {head_version()})")
+        conn.commit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
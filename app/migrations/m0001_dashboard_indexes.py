@@ -0,0 +1,20 @@
+from migrate import create_index, drop_index
+
+DESCRIPTION = "Composite indexes for dashboard and export access patterns"
+
+INDEXES = [
+    ("ix_stakeholder_personal_info_stakeholder_session", "stakeholder_personal_info", ("stakeholder_id", "session_id")),
+    ("ix_syllabus_question_type_category", "syllabus_question", ("stakeholder_type", "category")),
+    ("ix_feedback_answers_person_question", "feedback_answers", ("person_id", "question_id")),
+    ("ix_feedback_answers_question_person", "feedback_answers", ("question_id", "person_id")),
+]
+
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, *columns)
+
+
+def downgrade(conn):
+    for name, table, _ in reversed(INDEXES):
+        drop_index(conn, name, table)
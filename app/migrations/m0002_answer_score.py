@@ -0,0 +1,16 @@
+from sqlalchemy import Column, SmallInteger
+from migrate import add_column, create_index, drop_column, drop_index
+from backfill_scores import backfill_scores
+
+DESCRIPTION = "Numeric score column on feedback_answers for SYLLABUS ratings"
+
+
+def upgrade(conn):
+    add_column(conn, "feedback_answers", Column("score", SmallInteger, nullable=True))
+    create_index(conn, "ix_feedback_answers_question_score", "feedback_answers", "question_id", "score")
+    backfill_scores(conn)
+
+
+def downgrade(conn):
+    drop_index(conn, "ix_feedback_answers_question_score", "feedback_answers")
+    drop_column(conn, "feedback_answers", "score")
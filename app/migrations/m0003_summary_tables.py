@@ -0,0 +1,17 @@
+import models
+import stats
+
+DESCRIPTION = "question_stats and respondent_counts summary tables for the dashboard"
+
+TABLES = [models.QuestionStats.__table__, models.RespondentCount.__table__]
+
+
+def upgrade(conn):
+    for table in TABLES:
+        table.create(conn, checkfirst=True)
+    stats.rebuild(conn)
+
+
+def downgrade(conn):
+    for table in reversed(TABLES):
+        table.drop(conn, checkfirst=True)
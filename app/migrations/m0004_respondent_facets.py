@@ -0,0 +1,17 @@
+import models
+import facets
+
+DESCRIPTION = "respondent_facets table for indexed stream filtering"
+
+TABLES = [models.RespondentFacet.__table__]
+
+
+def upgrade(conn):
+    for table in TABLES:
+        table.create(conn, checkfirst=True)
+    facets.rebuild(conn)
+
+
+def downgrade(conn):
+    for table in reversed(TABLES):
+        table.drop(conn, checkfirst=True)
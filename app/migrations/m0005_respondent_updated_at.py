@@ -0,0 +1,24 @@
+from sqlalchemy import TIMESTAMP, Column, func, text
+from migrate import add_column, create_index, drop_column, drop_index
+
+DESCRIPTION = "updated_at on stakeholder_personal_info for delta exports"
+
+
+def upgrade(conn):
+    if conn.dialect.name == "sqlite":
+        # SQLite can't add a column with a CURRENT_TIMESTAMP default; the
+        # model's insert-time default fills it from here on
+        add_column(conn, "stakeholder_personal_info", Column("updated_at", TIMESTAMP, nullable=True))
+    else:
+        add_column(conn, "stakeholder_personal_info",
+                   Column("updated_at", TIMESTAMP, nullable=True, server_default=func.now()))
+    # Everyone already there counts as changed at upgrade time
+    conn.execute(text(
+        "UPDATE stakeholder_personal_info SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL"
+    ))
+    create_index(conn, "ix_stakeholder_personal_info_updated", "stakeholder_personal_info", "updated_at")
+
+
+def downgrade(conn):
+    drop_index(conn, "ix_stakeholder_personal_info_updated", "stakeholder_personal_info")
+    drop_column(conn, "stakeholder_personal_info", "updated_at")
@@ -0,0 +1,23 @@
+from sqlalchemy import TIMESTAMP, Column
+import models
+from migrate import add_column, create_index, drop_column, drop_index
+
+DESCRIPTION = "open/closed feedback sessions, per-form active session and session snapshots"
+
+TABLES = [models.FormSession.__table__, models.SessionSnapshot.__table__]
+
+
+def upgrade(conn):
+    # Existing sessions stay open
+    add_column(conn, "feedback_session", Column("closed_at", TIMESTAMP, nullable=True))
+    create_index(conn, "ix_stakeholder_personal_info_session",
+                 "stakeholder_personal_info", "session_id", "person_id")
+    for table in TABLES:
+        table.create(conn, checkfirst=True)
+
+
+def downgrade(conn):
+    for table in reversed(TABLES):
+        table.drop(conn, checkfirst=True)
+    drop_index(conn, "ix_stakeholder_personal_info_session", "stakeholder_personal_info")
+    drop_column(conn, "feedback_session", "closed_at")
@@ -0,0 +1,11 @@
+import models
+
+DESCRIPTION = "change_counter of edits to stored answers for export fingerprints"
+
+
+def upgrade(conn):
+    models.ChangeCounter.__table__.create(conn, checkfirst=True)
+
+
+def downgrade(conn):
+    models.ChangeCounter.__table__.drop(conn, checkfirst=True)
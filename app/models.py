@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, TIMESTAMP, func, Text, ForeignKey, Enum
+from sqlalchemy import BigInteger, Boolean, Column, Float, Integer, SmallInteger, String, TIMESTAMP, func, Text, ForeignKey, Enum, Index
 from database import Base
 
 # 1. Table: stakeholders 
@@ -13,6 +13,8 @@ class FeedbackSession(Base):
     session_id = Column(Integer, primary_key=True, autoincrement=True)
     session_name = Column(String(100), nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
+    # NULL while the session accepts feedback
+    closed_at = Column(TIMESTAMP, nullable=True)
 
 # 3. Table: stakeholder_personal_info
 class StakeholderPersonalInfo(Base):
@@ -22,6 +24,17 @@ class StakeholderPersonalInfo(Base):
     stakeholder_id = Column(Integer, ForeignKey("stakeholders.stakeholder_id"), nullable=False)
     name = Column(String(100), nullable=False)
     association_name = Column(String(100))
+    # Set on insert and whenever an answer of the person is edited (delta exports)
+    updated_at = Column(TIMESTAMP, default=func.now(), server_default=func.now())
+
+    __table_args__ = (
+        # Dashboard/export filters: WHERE stakeholder_id = ? [AND session_id = ?]
+        Index("ix_stakeholder_personal_info_stakeholder_session", "stakeholder_id", "session_id"),
+        # Session-scoped exports across stakeholders: WHERE session_id = ?
+        Index("ix_stakeholder_personal_info_session", "session_id", "person_id"),
+        # Delta exports: WHERE updated_at > ?
+        Index("ix_stakeholder_personal_info_updated", "updated_at"),
+    )
 
 # 4. Table: syllabus_question
 class SyllabusQuestion(Base):
@@ -37,6 +50,11 @@ class SyllabusQuestion(Base):
         nullable=False
     )
 
+    __table_args__ = (
+        # Question lists: WHERE stakeholder_type = ? AND category = ? ORDER BY id
+        Index("ix_syllabus_question_type_category", "stakeholder_type", "category"),
+    )
+
 # 5. Table: admin_user 
 class AdminUser(Base):
     __tablename__ = "admin_user"
@@ -50,4 +68,83 @@ class FeedbackAnswer(Base):
     answer_id = Column(Integer, primary_key=True, autoincrement=True)
     person_id = Column(Integer, ForeignKey("stakeholder_personal_info.person_id"), nullable=False)
     question_id = Column(Integer, ForeignKey("syllabus_question.id"), nullable=False)
-    answer_text = Column(String(255), nullable=False)
\ No newline at end of file
+    answer_text = Column(String(255), nullable=False)
+    # 1-5 rating for SYLLABUS questions, NULL otherwise (set at write time)
+    score = Column(SmallInteger, nullable=True)
+
+    __table_args__ = (
+        # Pivot fetch + demographic edits: person -> answers by question
+        Index("ix_feedback_answers_person_question", "person_id", "question_id"),
+        # Per-question aggregation and stream lookups: question -> people
+        Index("ix_feedback_answers_question_person", "question_id", "person_id"),
+        # Covering index for AVG/COUNT(score) grouped by question
+        Index("ix_feedback_answers_question_score", "question_id", "score"),
+    )
+
+# 7. Table: schema_version (applied migrations, see migrate.py)
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    description = Column(String(255), nullable=False)
+    applied_at = Column(TIMESTAMP, server_default=func.now())
+
+
+# 8. Table: question_stats (running rating aggregates, maintained by stats.py)
+class QuestionStats(Base):
+    __tablename__ = "question_stats"
+    stakeholder_id = Column(Integer, ForeignKey("stakeholders.stakeholder_id"), primary_key=True)
+    question_id = Column(Integer, ForeignKey("syllabus_question.id"), primary_key=True)
+    session_id = Column(Integer, ForeignKey("feedback_session.session_id"), primary_key=True)
+    response_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(BigInteger, nullable=False, default=0)
+    score_sq_sum = Column(BigInteger, nullable=False, default=0)
+    rating_1 = Column(Integer, nullable=False, default=0)
+    rating_2 = Column(Integer, nullable=False, default=0)
+    rating_3 = Column(Integer, nullable=False, default=0)
+    rating_4 = Column(Integer, nullable=False, default=0)
+    rating_5 = Column(Integer, nullable=False, default=0)
+
+# 9. Table: respondent_counts (people per stakeholder per session, maintained by stats.py)
+class RespondentCount(Base):
+    __tablename__ = "respondent_counts"
+    stakeholder_id = Column(Integer, ForeignKey("stakeholders.stakeholder_id"), primary_key=True)
+    session_id = Column(Integer, ForeignKey("feedback_session.session_id"), primary_key=True)
+    respondents = Column(Integer, nullable=False, default=0)
+
+# 10. Table: respondent_facets (demographic filter values per person, maintained by facets.py)
+class RespondentFacet(Base):
+    __tablename__ = "respondent_facets"
+    person_id = Column(Integer, ForeignKey("stakeholder_personal_info.person_id"), primary_key=True)
+    stakeholder_id = Column(Integer, ForeignKey("stakeholders.stakeholder_id"), nullable=False)
+    stream = Column(String(255), nullable=True)
+    class_name = Column(String(255), nullable=True)
+    academic_year = Column(String(255), nullable=True)
+
+    __table_args__ = (
+        # Stream filter + distinct stream options per stakeholder
+        Index("ix_respondent_facets_stakeholder_stream", "stakeholder_id", "stream", "person_id"),
+    )
+
+# 11. Table: form_sessions (the session each feedback form submits into, see feedback_sessions.py)
+class FormSession(Base):
+    __tablename__ = "form_sessions"
+    form_name = Column(String(50), primary_key=True)
+    session_id = Column(Integer, ForeignKey("feedback_session.session_id"), nullable=False)
+
+# 12. Table: session_snapshots (per-question results frozen when a session closes, see trends.py)
+class SessionSnapshot(Base):
+    __tablename__ = "session_snapshots"
+    session_id = Column(Integer, ForeignKey("feedback_session.session_id"), primary_key=True)
+    stakeholder_id = Column(Integer, ForeignKey("stakeholders.stakeholder_id"), primary_key=True)
+    question_id = Column(Integer, ForeignKey("syllabus_question.id"), primary_key=True)
+    response_count = Column(Integer, nullable=False)
+    mean_score = Column(Float, nullable=True)
+    std_score = Column(Float, nullable=True)
+    top2_box = Column(Float, nullable=True)
+
+# 13. Table: change_counter (edits of stored answers, see submissions.py; new
+# answers already show in the max ids)
+class ChangeCounter(Base):
+    __tablename__ = "change_counter"
+    counter_id = Column(Integer, primary_key=True, autoincrement=False)
+    changes = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,166 @@
+import re
+from functools import lru_cache
+
+PIVOT_CHUNK = 1000  # respondents per chunk when pivoting a streamed cursor
+
+
+@lru_cache(maxsize=4096)
+def clean_label(text: str) -> str:
+    # Remove tags like [STUDENT][DEMOGRAPHIC]
+    return re.sub(r"\[.*?\]", "", text).strip()
+
+
+def label_key(label: str) -> str:
+    # Normalize key (safe dict key)
+    return label.lower().replace(" ", "_").replace("/", "_")
+
+
+# -----------------------------
+# LAYOUT (COLUMNS OF THE WIDE TABLE)
+# -----------------------------
+class Layout:
+    def __init__(self, demographic_questions, syllabus_questions):
+        self.syllabus_questions = list(syllabus_questions)
+        self.demographic_headers = []
+
+        for q in demographic_questions:
+            label = clean_label(q.text)
+            self.demographic_headers.append({
+                "label": label,
+                "key": label_key(label),
+                "question_id": q.id
+            })
+
+        self.question_numbers = [f"q{i+1}" for i in range(len(self.syllabus_questions))]
+
+        # Demographic columns first, then q1..qN
+        self.keys = [d["key"] for d in self.demographic_headers] + self.question_numbers
+        self.question_ids = (
+            [d["question_id"] for d in self.demographic_headers]
+            + [q.id for q in self.syllabus_questions]
+        )
+        self.position = {qid: i for i, qid in enumerate(self.question_ids)}
+
+    @property
+    def csv_header(self):
+        return (
+            ["Person ID", "Name"]
+            + [d["label"] for d in self.demographic_headers]
+            + self.question_numbers
+        )
+
+
+# -----------------------------
+# PIVOT TABLE (COLUMN-ORIENTED)
+# One list per column, indexed by respondent; None = not answered
+# -----------------------------
+class PivotTable:
+    def __init__(self, layout: Layout, person_ids, names, columns):
+        self.layout = layout
+        self.person_ids = person_ids
+        self.names = names
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.person_ids)
+
+    def records(self):
+        # Row dicts for the dashboard template (unanswered keys omitted)
+        keys = ("person_id", "name", *self.layout.keys)
+        return [
+            {k: v for k, v in zip(keys, values) if v is not None}
+            for values in zip(self.person_ids, self.names, *self.columns)
+        ]
+
+    def rows(self):
+        # CSV rows in csv_header order
+        for values in zip(self.person_ids, self.names, *self.columns):
+            yield ["" if v is None else v for v in values]
+
+
+def build(answers, layout: Layout) -> PivotTable:
+    # answers: (person_id, name, question_id, answer_text) ordered by person_id
+    position = layout.position
+    person_ids, names = [], []
+    cells = [([], []) for _ in layout.keys]  # per column: (row indexes, values)
+    last = object()
+    row = -1
+
+    for person_id, name, question_id, answer_text in answers:
+        if person_id != last:
+            last = person_id
+            person_ids.append(person_id)
+            names.append(name)
+            row += 1
+
+        pos = position.get(question_id)
+        if pos is not None:
+            indexes, values = cells[pos]
+            indexes.append(row)
+            values.append(answer_text)
+
+    columns = []
+    for indexes, values in cells:
+        col = [None] * len(person_ids)
+        for i, value in zip(indexes, values):
+            col[i] = value
+        columns.append(col)
+
+    return PivotTable(layout, person_ids, names, columns)
+
+
+class Chunker:
+    # Splits rows ordered by person_id into tables of chunk_size respondents,
+    # so memory doesn't grow with the result set. Feed rows with add(); it
+    # returns a finished table whenever a chunk fills up.
+
+    def __init__(self, layout: Layout, chunk_size: int = PIVOT_CHUNK):
+        self.layout = layout
+        self.chunk_size = chunk_size
+        self.buffer = []
+        self.people = 0
+        self.last = object()
+
+    def add(self, r) -> PivotTable | None:
+        table = None
+        person_id = r[0]
+        if person_id != self.last:
+            if self.people == self.chunk_size:
+                table = build(self.buffer, self.layout)
+                self.buffer = []
+                self.people = 0
+            self.last = person_id
+            self.people += 1
+        self.buffer.append(r)
+        return table
+
+    def finish(self) -> PivotTable | None:
+        if not self.buffer:
+            return None
+        table = build(self.buffer, self.layout)
+        self.buffer = []
+        return table
+
+
+def chunks(answers, layout: Layout, chunk_size: int = PIVOT_CHUNK):
+    # build() over a plain (sync) cursor, a chunk of respondents at a time
+    chunker = Chunker(layout, chunk_size)
+    for r in answers:
+        table = chunker.add(r)
+        if table is not None:
+            yield table
+    table = chunker.finish()
+    if table is not None:
+        yield table
+
+
+async def build_chunks(answers, layout: Layout, chunk_size: int = PIVOT_CHUNK):
+    # Same as chunks() over an async cursor
+    chunker = Chunker(layout, chunk_size)
+    async for r in answers:
+        table = chunker.add(r)
+        if table is not None:
+            yield table
+    table = chunker.finish()
+    if table is not None:
+        yield table
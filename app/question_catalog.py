@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import logging
+import os
+from typing import NamedTuple
+from dotenv import load_dotenv
+from sqlalchemy import select
+from database import AsyncSessionLocal
+import models
+import cache
+import facets
+import pivot
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# QUESTION CATALOG SETTINGS (.env)
+# -----------------------------
+# QUESTION_CATALOG_REFRESH_SECONDS  re-read syllabus_question this often and
+#                                   swap the catalog in if it changed (0 = off)
+REFRESH_SECONDS = float(os.getenv("QUESTION_CATALOG_REFRESH_SECONDS", "300"))
+
+
+class Question(NamedTuple):
+    id: int
+    text: str
+    stakeholder_type: str
+    category: str
+    label: str               # text without [TAGS]
+    key: str                 # normalized label, used as a row/dict key
+    number: str | None       # q1..qN within the stakeholder's SYLLABUS questions
+    facet: str | None        # respondent_facets column fed by this question
+
+
+class QuestionCatalog:
+    # Immutable snapshot of syllabus_question with everything the routes
+    # derive from it computed once. Replaced wholesale on reload.
+
+    def __init__(self, rows):
+        # rows: (id, text, stakeholder_type, category) in any order
+        rows = sorted(rows)
+        self.version = hashlib.sha1(repr(rows).encode("utf-8")).hexdigest()[:16]
+
+        self.questions = []
+        numbers = {}
+        for qid, text, stakeholder_type, category in rows:
+            label = pivot.clean_label(text)
+            number = None
+            if category == "SYLLABUS":
+                numbers[stakeholder_type] = numbers.get(stakeholder_type, 0) + 1
+                number = f"q{numbers[stakeholder_type]}"
+            self.questions.append(Question(
+                qid, text, stakeholder_type, category,
+                label, pivot.label_key(label), number,
+                facets.facet_for(text) if category == "DEMOGRAPHIC" else None
+            ))
+
+        self.by_id = {q.id: q for q in self.questions}
+        self.categories = {q.id: q.category for q in self.questions}
+        self.facets = {q.id: q.facet for q in self.questions if q.facet}
+
+        self._by_type = {}
+        for q in self.questions:
+            self._by_type.setdefault(q.stakeholder_type, []).append(q)
+
+        self._layouts = {
+            stakeholder_type: pivot.Layout(
+                self.by_category(stakeholder_type, "DEMOGRAPHIC"),
+                self.by_category(stakeholder_type, "SYLLABUS")
+            )
+            for stakeholder_type in self._by_type
+        }
+
+    def for_stakeholder(self, stakeholder_type: str) -> list[Question]:
+        # Every question of one form, ordered by id
+        return self._by_type.get(stakeholder_type, [])
+
+    def by_category(self, stakeholder_type: str, category: str) -> list[Question]:
+        return [q for q in self.for_stakeholder(stakeholder_type) if q.category == category]
+
+    def layout(self, stakeholder_type: str) -> pivot.Layout:
+        return self._layouts.get(stakeholder_type) or pivot.Layout([], [])
+
+    def has_all(self, question_ids) -> bool:
+        return all(qid in self.by_id for qid in question_ids)
+
+
+# -----------------------------
+# PROCESS-WIDE CATALOG
+# -----------------------------
+_catalog: QuestionCatalog | None = None
+_lock = asyncio.Lock()
+_refresh_task: asyncio.Task | None = None
+
+
+async def load(db=None) -> QuestionCatalog:
+    # Read syllabus_question and swap the catalog in; dashboard entries built
+    # from the old questions are dropped when the content actually changed
+    global _catalog
+
+    async with _lock:
+        if db is None:
+            async with AsyncSessionLocal() as own_db:
+                rows = (await own_db.execute(_query())).tuples().all()
+        else:
+            rows = (await db.execute(_query())).tuples().all()
+
+        catalog = QuestionCatalog(rows)
+        if _catalog is None or catalog.version != _catalog.version:
+            if _catalog is not None:
+                logger.info("Question catalog changed: %s -> %s", _catalog.version, catalog.version)
+                cache.bump_data_version()
+            _catalog = catalog
+
+    return _catalog
+
+
+def _query():
+    return select(
+        models.SyllabusQuestion.id,
+        models.SyllabusQuestion.text,
+        models.SyllabusQuestion.stakeholder_type,
+        models.SyllabusQuestion.category
+    )
+
+
+async def current(db=None) -> QuestionCatalog:
+    # The loaded catalog, loaded on first use. Never reloaded on behalf of a
+    # request: new questions arrive through the refresh loop or
+    # POST /admin/questions/reload, so bogus ids can't force reloads.
+    catalog = _catalog
+    if catalog is None:
+        catalog = await load(db)
+    return catalog
+
+
+def clear():
+    # Call after the tables are reset (reset_db.py, tests)
+    global _catalog
+    _catalog = None
+
+
+async def _refresh_loop(seconds: float):
+    while True:
+        await asyncio.sleep(seconds)
+        try:
+            await load()
+        except Exception:
+            logger.exception("Question catalog refresh failed")
+
+
+async def start(refresh_seconds: float = REFRESH_SECONDS):
+    global _refresh_task
+    await load()
+    if refresh_seconds > 0:
+        _refresh_task = asyncio.create_task(_refresh_loop(refresh_seconds))
+
+
+async def stop():
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+import database
+import metrics
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# READ REPLICA SETTINGS (.env)
+# -----------------------------
+# DB_READ_URL                optional read-only copy of the database, written like
+#                            the primary (mysql+pymysql://reader:pw@host:3306/db or
+#                            sqlite:///replica.db); dashboard and export reads go there
+# DB_READ_MAX_LAG            seconds of staleness tolerated: reads use the primary
+#                            while the replica reports more replication lag than
+#                            this, and for this long after an admin edit made
+#                            through this worker (read-your-writes)
+# DB_READ_RETRY_SECONDS      after the replica fails, stay on the primary this long
+# DB_READ_CONNECT_TIMEOUT    seconds to wait for a replica connection (MySQL)
+# DB_READ_LAG_CHECK_SECONDS  how often to ask the replica for its lag
+READ_URL = os.getenv("DB_READ_URL", "").strip() or None
+MAX_LAG = float(os.getenv("DB_READ_MAX_LAG", "5"))
+RETRY_SECONDS = float(os.getenv("DB_READ_RETRY_SECONDS", "30"))
+CONNECT_TIMEOUT = float(os.getenv("DB_READ_CONNECT_TIMEOUT", "2"))
+LAG_CHECK_SECONDS = float(os.getenv("DB_READ_LAG_CHECK_SECONDS", "10"))
+
+ROUTED = metrics.register(metrics.Counter(
+    "db_read_sessions_total", "Read-only sessions by database used and why.",
+    ("target", "reason")
+))
+
+
+async def replication_lag(db) -> float | None:
+    # Seconds_Behind_Source of a MySQL replica. None when the database is not
+    # a replica (e.g. a second instance loaded from a dump) or we may not ask;
+    # inf when replication is stopped.
+    if db.get_bind().dialect.name != "mysql":
+        return None
+
+    for statement in ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS"):  # 8.0.22+ / older
+        try:
+            row = (await db.execute(text(statement))).mappings().first()
+        except DBAPIError:
+            continue
+        if row is None:
+            return None
+        value = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+        return float("inf") if value is None else float(value)
+    return None
+
+
+class ReadRouter:
+    # Hands out sessions for read-only work: the replica when it is reachable
+    # and fresh enough, otherwise the primary. Writes never come through here.
+
+    def __init__(self, url: str | None = READ_URL, primary=None, max_lag: float = MAX_LAG,
+                 retry_seconds: float = RETRY_SECONDS,
+                 lag_check_seconds: float = LAG_CHECK_SECONDS, clock=time.monotonic):
+        self.url = url
+        self.primary = primary
+        self.max_lag = max_lag
+        self.retry_seconds = retry_seconds
+        self.lag_check_seconds = lag_check_seconds
+        self.clock = clock
+
+        self.down_until = float("-inf")
+        self.written_at = float("-inf")   # clock() of this worker's last admin write
+        self.lag = None
+        self.lag_checked_at = float("-inf")
+        self.last_error = None
+
+        self.engine = None
+        self.sessionmaker = None
+        if url:
+            connect_args = {}
+            if make_url(url).get_backend_name() == "mysql":
+                connect_args["connect_timeout"] = CONNECT_TIMEOUT
+            self.engine = database.make_async_engine(url, "read", connect_args=connect_args)
+            self.sessionmaker = async_sessionmaker(
+                bind=self.engine, autoflush=False, expire_on_commit=False
+            )
+
+    def primary_reason(self) -> str | None:
+        # Why this read can't use the replica right now (None = it can)
+        if self.engine is None:
+            return "no_replica"
+        now = self.clock()
+        if now < self.down_until:
+            return "replica_down"
+        if now - self.written_at < self.max_lag:
+            return "recent_write"   # the admin sees their own edit
+        if self.lag is not None and self.lag > self.max_lag:
+            return "replica_lag"
+        return None
+
+    def mark_written(self):
+        # After an admin write commits. Public submissions don't call this:
+        # they arrive every few seconds and nobody reads them back at once,
+        # so they are only subject to the replica lag check.
+        self.written_at = self.clock()
+
+    def mark_down(self, error: Exception):
+        self.down_until = self.clock() + self.retry_seconds
+        self.last_error = repr(error)[:300]
+        logger.warning(
+            "Read replica unavailable, using the primary for %ss: %s",
+            self.retry_seconds, self.last_error
+        )
+
+    async def _replica_session(self):
+        # Check a connection out up front, so a dead replica falls back here
+        # instead of failing halfway through a request
+        db = self.sessionmaker()
+        try:
+            await db.connection()
+            if self.clock() - self.lag_checked_at >= self.lag_check_seconds:
+                self.lag_checked_at = self.clock()
+                self.lag = await replication_lag(db)
+        except (DBAPIError, OSError, asyncio.TimeoutError) as e:
+            await db.close()
+            self.mark_down(e)
+            return None, "replica_error"
+
+        reason = self.primary_reason()
+        if reason is not None:
+            await db.close()
+            return None, reason
+        return db, "ok"
+
+    @asynccontextmanager
+    async def session(self):
+        db, reason = None, self.primary_reason()
+        if reason is None:
+            db, reason = await self._replica_session()
+
+        if db is not None:
+            ROUTED.inc("replica", reason)
+            try:
+                yield db
+            finally:
+                await db.close()
+            return
+
+        ROUTED.inc("primary", reason)
+        async with (self.primary or database.AsyncSessionLocal)() as db:
+            yield db
+
+    def status(self) -> dict:
+        now = self.clock()
+        return {
+            "configured": self.engine is not None,
+            "url": make_url(self.url).render_as_string(hide_password=True) if self.url else None,
+            "max_lag_seconds": self.max_lag,
+            "lag_seconds": self.lag,
+            "down_for_seconds": round(self.down_until - now, 1) if now < self.down_until else 0,
+            "last_error": self.last_error,
+            "using": "primary" if self.primary_reason() else "replica"
+        }
+
+    async def dispose(self):
+        if self.engine is not None:
+            await self.engine.dispose()
+
+
+router = ReadRouter()
+
+
+def read_session():
+    # async with read_session() as db: ... (read-only work only)
+    return router.session()
+
+
+async def get_read_db():
+    async with router.session() as db:
+        yield db
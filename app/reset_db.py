@@ -2,6 +2,7 @@
 import os
 import pymysql
 from dotenv import load_dotenv
+import migrate
 
 load_dotenv()
 
@@ -12,6 +13,13 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_NAME = os.getenv("DB_NAME")
 
 SQL_SCRIPT = """
+DROP TABLE IF EXISTS change_counter;
+DROP TABLE IF EXISTS schema_version;
+DROP TABLE IF EXISTS session_snapshots;
+DROP TABLE IF EXISTS form_sessions;
+DROP TABLE IF EXISTS respondent_facets;
+DROP TABLE IF EXISTS respondent_counts;
+DROP TABLE IF EXISTS question_stats;
 DROP TABLE IF EXISTS feedback_answers;
 DROP TABLE IF EXISTS stakeholder_personal_info;
 DROP TABLE IF EXISTS syllabus_question;
@@ -27,7 +35,8 @@ CREATE TABLE stakeholders (
 CREATE TABLE feedback_session (
     session_id INT AUTO_INCREMENT PRIMARY KEY,
     session_name VARCHAR(100) NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    closed_at TIMESTAMP NULL DEFAULT NULL
 );
 
 CREATE TABLE stakeholder_personal_info (
@@ -36,13 +45,20 @@ CREATE TABLE stakeholder_personal_info (
     stakeholder_id INT NOT NULL,
     name VARCHAR(100) NOT NULL,
     association_name VARCHAR(100),
+    updated_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (stakeholder_id) REFERENCES stakeholders(stakeholder_id),
-    FOREIGN KEY (session_id) REFERENCES feedback_session(session_id)
+    FOREIGN KEY (session_id) REFERENCES feedback_session(session_id),
+    INDEX ix_stakeholder_personal_info_stakeholder_session (stakeholder_id, session_id),
+    INDEX ix_stakeholder_personal_info_session (session_id, person_id),
+    INDEX ix_stakeholder_personal_info_updated (updated_at)
 );
 
 CREATE TABLE syllabus_question (
     id INT AUTO_INCREMENT PRIMARY KEY,
-    text VARCHAR(255) NOT NULL
+    text TEXT NOT NULL,
+    stakeholder_type VARCHAR(50) NOT NULL,
+    category ENUM('DEMOGRAPHIC','SYLLABUS','SUGGESTION') NOT NULL,
+    INDEX ix_syllabus_question_type_category (stakeholder_type, category)
 );
 
 CREATE TABLE admin_user (
@@ -56,9 +72,83 @@ CREATE TABLE feedback_answers (
     person_id INT NOT NULL,
     question_id INT NOT NULL,
     answer_text VARCHAR(255) NOT NULL,
+    score SMALLINT NULL,
+    FOREIGN KEY (person_id) REFERENCES stakeholder_personal_info(person_id),
+    FOREIGN KEY (question_id) REFERENCES syllabus_question(id),
+    INDEX ix_feedback_answers_person_question (person_id, question_id),
+    INDEX ix_feedback_answers_question_person (question_id, person_id),
+    INDEX ix_feedback_answers_question_score (question_id, score)
+);
+
+CREATE TABLE question_stats (
+    stakeholder_id INT NOT NULL,
+    question_id INT NOT NULL,
+    session_id INT NOT NULL,
+    response_count INT NOT NULL DEFAULT 0,
+    score_sum BIGINT NOT NULL DEFAULT 0,
+    score_sq_sum BIGINT NOT NULL DEFAULT 0,
+    rating_1 INT NOT NULL DEFAULT 0,
+    rating_2 INT NOT NULL DEFAULT 0,
+    rating_3 INT NOT NULL DEFAULT 0,
+    rating_4 INT NOT NULL DEFAULT 0,
+    rating_5 INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (stakeholder_id, question_id, session_id),
+    FOREIGN KEY (stakeholder_id) REFERENCES stakeholders(stakeholder_id),
+    FOREIGN KEY (question_id) REFERENCES syllabus_question(id),
+    FOREIGN KEY (session_id) REFERENCES feedback_session(session_id)
+);
+
+CREATE TABLE respondent_counts (
+    stakeholder_id INT NOT NULL,
+    session_id INT NOT NULL,
+    respondents INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (stakeholder_id, session_id),
+    FOREIGN KEY (stakeholder_id) REFERENCES stakeholders(stakeholder_id),
+    FOREIGN KEY (session_id) REFERENCES feedback_session(session_id)
+);
+
+CREATE TABLE respondent_facets (
+    person_id INT PRIMARY KEY,
+    stakeholder_id INT NOT NULL,
+    stream VARCHAR(255) NULL,
+    class_name VARCHAR(255) NULL,
+    academic_year VARCHAR(255) NULL,
     FOREIGN KEY (person_id) REFERENCES stakeholder_personal_info(person_id),
+    FOREIGN KEY (stakeholder_id) REFERENCES stakeholders(stakeholder_id),
+
+    INDEX ix_respondent_facets_stakeholder_stream (stakeholder_id, stream, person_id)
+);
+
+CREATE TABLE form_sessions (
+    form_name VARCHAR(50) PRIMARY KEY,
+    session_id INT NOT NULL,
+    FOREIGN KEY (session_id) REFERENCES feedback_session(session_id)
+);
+
+CREATE TABLE session_snapshots (
+    session_id INT NOT NULL,
+    stakeholder_id INT NOT NULL,
+    question_id INT NOT NULL,
+    response_count INT NOT NULL,
+    mean_score DOUBLE NULL,
+    std_score DOUBLE NULL,
+    top2_box DOUBLE NULL,
+    PRIMARY KEY (session_id, stakeholder_id, question_id),
+    FOREIGN KEY (session_id) REFERENCES feedback_session(session_id),
+    FOREIGN KEY (stakeholder_id) REFERENCES stakeholders(stakeholder_id),
     FOREIGN KEY (question_id) REFERENCES syllabus_question(id)
 );
+
+CREATE TABLE change_counter (
+    counter_id INT PRIMARY KEY,
+    changes BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE schema_version (
+    version INT PRIMARY KEY,
+    description VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
 """
 
 def reset_database():
@@ -81,6 +171,12 @@ def reset_database():
                     print(f"Executing: {statement.strip()[:50]}...")
                     cursor.execute(statement)
         
+            # Created at the latest schema: record every migration as applied
+            cursor.executemany(
+                "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                [(version, module.DESCRIPTION) for version, module in migrate.load_migrations()]
+            )
+
         connection.commit()
         connection.close()
         print("Database reset successfully.")
@@ -0,0 +1,76 @@
+import os
+from dotenv import load_dotenv
+from sqlalchemy import select
+import models
+import exports
+import pivot
+
+load_dotenv()
+
+# -----------------------------
+# RESPONSES TABLE PAGING (.env)
+# -----------------------------
+# DASHBOARD_PAGE_SIZE      respondents per page of the dashboard table
+# DASHBOARD_MAX_PAGE_SIZE  upper bound for ?limit=
+PAGE_SIZE = int(os.getenv("DASHBOARD_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("DASHBOARD_MAX_PAGE_SIZE", "500"))
+
+SORTS = ("asc", "desc")  # by person_id
+
+
+def page_ids_query(stakeholder_id: int, stream: str | None, after: int | None,
+                   limit: int, sort: str = "asc", session_id: int | None = None):
+    # Keyset page: WHERE person_id > :after ORDER BY person_id LIMIT n+1
+    # (the extra row only tells us whether another page exists)
+    SPI = models.StakeholderPersonalInfo
+    query = select(SPI.person_id).where(SPI.stakeholder_id == stakeholder_id)
+    if session_id is not None:
+        query = query.where(SPI.session_id == session_id)
+
+    if stream:
+        query = query.join(
+            models.RespondentFacet,
+            models.RespondentFacet.person_id == SPI.person_id
+        ).where(
+            models.RespondentFacet.stakeholder_id == stakeholder_id,
+            models.RespondentFacet.stream == stream
+        )
+
+    if sort == "desc":
+        if after is not None:
+            query = query.where(SPI.person_id < after)
+        query = query.order_by(SPI.person_id.desc())
+    else:
+        if after is not None:
+            query = query.where(SPI.person_id > after)
+        query = query.order_by(SPI.person_id)
+
+    return query.limit(limit + 1)
+
+
+async def load_page(db, stakeholder_id: int, layout, stream: str | None = None,
+                    after: int | None = None, limit: int = PAGE_SIZE, sort: str = "asc",
+                    session_id: int | None = None):
+    # Two bounded queries: the page's person_ids, then only their answers
+    person_ids = (await db.execute(
+        page_ids_query(stakeholder_id, stream, after, limit, sort, session_id)
+    )).scalars().all()
+
+    has_more = len(person_ids) > limit
+    person_ids = person_ids[:limit]
+
+    records = []
+    if person_ids:
+        answers = (await db.execute(
+            exports.stakeholder_answers_query(stakeholder_id)
+            .where(models.StakeholderPersonalInfo.person_id.in_(person_ids))
+        )).all()
+        by_id = {r["person_id"]: r for r in pivot.build(answers, layout).records()}
+        records = [by_id[pid] for pid in person_ids if pid in by_id]
+
+    return {
+        "rows": records,
+        "next_after": person_ids[-1] if has_more else None,
+        "limit": limit,
+        "sort": sort
+    }
@@ -1,24 +1,38 @@
-from fastapi import APIRouter, Request, Depends, Form, status, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
+import os
+from datetime import datetime
+from typing import Literal
+from fastapi import APIRouter, Request, Depends, Form, Query, status, HTTPException
+from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse, StreamingResponse, Response
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, Integer
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 import models
-from database import SessionLocal
+import database
+from database import AsyncSessionLocal
 from jose import JWTError
 from auth import verify_password, create_access_token, decode_access_token
-import re, csv, io
+import analytics
+import cache
+import columnar
+import export_jobs
+import exports
+import feedback_sessions
+import form_pages
+import metrics
+import question_catalog
+import replica
+import responses
+import submissions
+import trends
 
 router = APIRouter(prefix="/admin") 
 templates = Jinja2Templates(directory="app/templates")
 
 # DB DEPENDENCY
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # JWT AUTH DEPENDENCY
 def admin_required(request: Request):
@@ -45,13 +59,17 @@ async def admin_login(
     request: Request,
     username: str = Form(...),
     password: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    admin = db.query(models.AdminUser).filter(
-        models.AdminUser.username == username
-    ).first()
+    result = await db.execute(
+        select(models.AdminUser).where(models.AdminUser.username == username)
+    )
+    admin = result.scalars().first()
 
-    if not admin or not verify_password(password, admin.password):
+    # argon2 is deliberately slow; keep it off the event loop
+    if not admin or not await run_in_threadpool(
+        verify_password, password, admin.password
+    ):
         return templates.TemplateResponse(
             "admin_login.html",
             {
@@ -91,64 +109,96 @@ async def admin_dashboard(
     request: Request,
     stakeholder_id: int | None = None,
     stream: str | None = None,
-    db: Session = Depends(get_db),
+    after: int | None = None,
+    limit: int = Query(responses.PAGE_SIZE, ge=1, le=responses.MAX_PAGE_SIZE),
+    sort: Literal["asc", "desc"] = "asc",
+    session_id: int | None = None,
     _: None = Depends(admin_required)
 ):
+    directory = await check_session(session_id)
+
+    # Served from the versioned cache until new feedback or edits arrive
+    key = ("dashboard", stakeholder_id, stream, session_id, after, limit, sort)
+    context = cache.dashboard_cache.get(key)
+
+    if context is cache.MISSING:
+        version = cache.dashboard_cache.version
+        # Read replica when configured (see replica.py)
+        async with replica.read_session() as db:
+            context = await dashboard_context(db, stakeholder_id, stream, after, limit, sort, session_id)
+        cache.dashboard_cache.set(key, context, version)
+
+    return templates.TemplateResponse(
+        "admin_dashboard.html",
+        {
+            "request": request,
+            **context,
+            "sessions": directory.sessions,
+            "selected_session": session_id
+        }
+    )
+
+
+async def check_session(session_id: int | None):
+    # Session filters must name a known session; returns the directory
+    directory = await feedback_sessions.current()
+    if session_id is not None and session_id not in directory.by_id:
+        directory = await feedback_sessions.load()   # created by another worker?
+        if session_id not in directory.by_id:
+            raise HTTPException(status_code=404, detail="Invalid session")
+    return directory
+
+
+async def dashboard_context(db, stakeholder_id, stream, after, limit, sort, session_id=None) -> dict:
     # -----------------------------
     # SIDEBAR STAKEHOLDERS
     # -----------------------------
-    stakeholders = db.query(models.Stakeholder).order_by(
-        models.Stakeholder.stakeholder_type
-    ).all()
+    result = await db.execute(
+        select(models.Stakeholder).order_by(models.Stakeholder.stakeholder_type)
+    )
+    stakeholders = result.scalars().all()
 
     # -----------------------------
     # TOTAL UNIQUE RESPONDENTS
     # -----------------------------
-    total_query = (
-        db.query(func.count(func.distinct(models.FeedbackAnswer.person_id)))
-        .join(
-            models.StakeholderPersonalInfo,
-            models.FeedbackAnswer.person_id == models.StakeholderPersonalInfo.person_id
-        )
-    )
+    # Read from the respondent_counts summary (one row per stakeholder/session)
+    total_query = select(func.sum(models.RespondentCount.respondents))
 
     if stakeholder_id:
-        total_query = total_query.filter(
-            models.StakeholderPersonalInfo.stakeholder_id == stakeholder_id
+        total_query = total_query.where(
+            models.RespondentCount.stakeholder_id == stakeholder_id
         )
+    if session_id is not None:
+        total_query = total_query.where(models.RespondentCount.session_id == session_id)
 
-    total_feedback = total_query.scalar() or 0
+    total_feedback = (await db.scalar(total_query)) or 0
 
     # =========================================================
     # CASE 1: ALL STAKEHOLDERS (CUMULATIVE BAR CHART)
     # =========================================================
 
     if stakeholder_id is None:
-        raw_results = (
-            db.query(
+        # question_stats summary: cost grows with questions, not answers
+        all_query = (
+            select(
                 models.Stakeholder.stakeholder_type.label("stakeholder"),
-                func.avg(
-                    cast(models.FeedbackAnswer.answer_text, Integer)
+                (
+                    func.sum(models.QuestionStats.score_sum)
+                    / func.sum(models.QuestionStats.response_count)
                 ).label("average_score")
             )
-            .select_from(models.Stakeholder)
-            .join(
-                models.StakeholderPersonalInfo,
-                models.Stakeholder.stakeholder_id == models.StakeholderPersonalInfo.stakeholder_id
-            )
-            .join(
-                models.FeedbackAnswer,
-                models.StakeholderPersonalInfo.person_id == models.FeedbackAnswer.person_id
-            )
+            .select_from(models.QuestionStats)
             .join(
-                models.SyllabusQuestion,
-                models.FeedbackAnswer.question_id == models.SyllabusQuestion.id
+                models.Stakeholder,
+                models.QuestionStats.stakeholder_id == models.Stakeholder.stakeholder_id
             )
-            .filter(models.SyllabusQuestion.category == "SYLLABUS")
-            .group_by(models.Stakeholder.stakeholder_id)
+            .group_by(models.Stakeholder.stakeholder_id, models.Stakeholder.stakeholder_type)
+            .having(func.sum(models.QuestionStats.response_count) > 0)
             .order_by(models.Stakeholder.stakeholder_type)
-            .all()
         )
+        if session_id is not None:
+            all_query = all_query.where(models.QuestionStats.session_id == session_id)
+        raw_results = (await db.execute(all_query)).all()
 
         results = [
             {
@@ -158,65 +208,53 @@ async def admin_dashboard(
             for r in raw_results
         ]
 
-        return templates.TemplateResponse(
-            "admin_dashboard.html",
-            {
-                "request": request,
-                "mode": "ALL",
-                "results": results,
-                "total_feedback": total_feedback,
-                "stakeholders": stakeholders,
-                "selected_stakeholder": None
-            }
-        )
+        return {
+            "mode": "ALL",
+            "results": results,
+            "total_feedback": total_feedback,
+            "stakeholders": stakeholders,
+            "selected_stakeholder": None
+        }
 
     # =========================================================
     # CASE 2: SINGLE STAKEHOLDER
     # =========================================================
 
-    stakeholder = db.query(models.Stakeholder).filter(
-        models.Stakeholder.stakeholder_id == stakeholder_id
-    ).first()
+    stakeholder = await db.get(models.Stakeholder, stakeholder_id)
+
+    if not stakeholder:
+        # Unknown id, or a replica that hasn't caught up with the first
+        # submission of this stakeholder type yet
+        raise HTTPException(status_code=404, detail="Invalid stakeholder")
 
     # -----------------------------
-    # SYLLABUS QUESTIONS (ORDERED)
+    # QUESTION LAYOUT (DEMOGRAPHIC + SYLLABUS COLUMNS, FROM THE CATALOG)
     # -----------------------------
-    syllabus_questions = (
-        db.query(models.SyllabusQuestion)
-        .filter(
-            models.SyllabusQuestion.category == "SYLLABUS",
-            models.SyllabusQuestion.stakeholder_type == stakeholder.stakeholder_type
-        )
-        .order_by(models.SyllabusQuestion.id)
-        .all()
-    )
+    catalog = await question_catalog.current(db)
+    layout = catalog.layout(stakeholder.stakeholder_type)
 
-    qid_to_qnum = {
-        q.id: f"q{i+1}"
-        for i, q in enumerate(syllabus_questions)
-    }
-
-    question_numbers = list(qid_to_qnum.values())
+    qid_to_qnum = {q.id: q.number for q in layout.syllabus_questions}
 
     # -----------------------------
     # BAR CHART DATA
     # -----------------------------
-    raw_results = (
-        db.query(
-            models.FeedbackAnswer.question_id,
-            func.count(models.FeedbackAnswer.answer_id).label("responses"),
-            func.avg(cast(models.FeedbackAnswer.answer_text, Integer)).label("average_score")
-        )
-        .join(models.StakeholderPersonalInfo)
-        .join(models.SyllabusQuestion)
-        .filter(
-            models.StakeholderPersonalInfo.stakeholder_id == stakeholder_id,
-            models.SyllabusQuestion.category == "SYLLABUS"
+    chart_query = (
+        select(
+            models.QuestionStats.question_id,
+            func.sum(models.QuestionStats.response_count).label("responses"),
+            (
+                func.sum(models.QuestionStats.score_sum)
+                / func.sum(models.QuestionStats.response_count)
+            ).label("average_score")
         )
-        .group_by(models.FeedbackAnswer.question_id)
-        .order_by(models.FeedbackAnswer.question_id)
-        .all()
+        .where(models.QuestionStats.stakeholder_id == stakeholder_id)
+        .group_by(models.QuestionStats.question_id)
+        .having(func.sum(models.QuestionStats.response_count) > 0)
+        .order_by(models.QuestionStats.question_id)
     )
+    if session_id is not None:
+        chart_query = chart_query.where(models.QuestionStats.session_id == session_id)
+    raw_results = (await db.execute(chart_query)).all()
 
     results = [
         {
@@ -229,361 +267,478 @@ async def admin_dashboard(
     ]
 
     # -----------------------------
-    # DEMOGRAPHIC QUESTIONS
+    # STREAM OPTIONS (COURSE)
     # -----------------------------
-    demographic_questions = (
-        db.query(models.SyllabusQuestion)
-        .filter(
-            models.SyllabusQuestion.category == "DEMOGRAPHIC",
-            models.SyllabusQuestion.stakeholder_type == stakeholder.stakeholder_type
+    # Distinct values of the respondent_facets index, not a scan of answers;
+    # the same options for every session
+    stream_options = (await db.execute(
+        select(models.RespondentFacet.stream)
+        .where(
+            models.RespondentFacet.stakeholder_id == stakeholder_id,
+            models.RespondentFacet.stream.is_not(None),
+            models.RespondentFacet.stream != ""
         )
-        .order_by(models.SyllabusQuestion.id)
-        .all()
-    )
+        .distinct()
+        .order_by(models.RespondentFacet.stream)
+    )).scalars().all()
 
-    demographic_headers = []
+    # -----------------------------
+    # RESPONSES TABLE (ONE KEYSET PAGE)
+    # -----------------------------
+    page = await responses.load_page(db, stakeholder_id, layout, stream, after, limit, sort, session_id)
+
+    return {
+        "mode": "SINGLE",
+        "results": results,
+        "questions": layout.syllabus_questions,
+        "question_numbers": layout.question_numbers,
+        "responses_table": page["rows"],
+        "next_after": page["next_after"],
+        "page_size": limit,
+        "sort": sort,
+        "stream_options": stream_options,
+        "selected_stream": stream,
+        "total_feedback": total_feedback,
+        "stakeholders": stakeholders,
+        "selected_stakeholder": stakeholder_id,
+        "demographic_headers": layout.demographic_headers,
+    }
 
-    demo_qid_to_key = {}
 
-    for q in demographic_questions:
-        # Remove tags like [STUDENT][DEMOGRAPHIC]
-        clean_label = re.sub(r"\[.*?\]", "", q.text).strip()
+# Further pages of the dashboard responses table
+@router.get("/responses")
+async def admin_responses_page(
+    stakeholder_id: int,
+    stream: str | None = None,
+    after: int | None = None,
+    limit: int = Query(responses.PAGE_SIZE, ge=1, le=responses.MAX_PAGE_SIZE),
+    sort: Literal["asc", "desc"] = "asc",
+    session_id: int | None = None,
+    _: None = Depends(admin_required)
+):
+    await check_session(session_id)
+    key = ("responses", stakeholder_id, stream, session_id, after, limit, sort)
+    cached = cache.dashboard_cache.get(key)
+    if cached is not cache.MISSING:
+        return cached
+
+    version = cache.dashboard_cache.version
+    async with replica.read_session() as db:
+        stakeholder = await db.get(models.Stakeholder, stakeholder_id)
+
+        if not stakeholder:
+            raise HTTPException(status_code=404, detail="Invalid stakeholder")
+
+        layout = (await question_catalog.current(db)).layout(stakeholder.stakeholder_type)
+        page = await responses.load_page(db, stakeholder_id, layout, stream, after, limit, sort, session_id)
+
+    result = {
+        **page,
+        "demographic_headers": layout.demographic_headers,
+        "question_numbers": layout.question_numbers
+    }
+    cache.dashboard_cache.set(key, result, version)
+    return result
 
-        # Normalize key (safe dict key)
-        key = (
-            clean_label
-            .lower()
-            .replace(" ", "_")
-            .replace("/", "_")
+
+# Rating statistics for a selection: per-question distribution, spread and
+# confidence intervals, plus an optional cross-tab by a demographic facet
+@router.get("/analytics")
+async def admin_analytics(
+    stakeholder_id: int | None = None,
+    session_id: int | None = None,
+    stream: str | None = None,
+    class_name: str | None = None,
+    by: Literal["stream", "class_name", "academic_year"] | None = None,
+    _: None = Depends(admin_required)
+):
+    await check_session(session_id)
+    key = ("analytics", stakeholder_id, session_id, stream, class_name, by)
+    cached = cache.dashboard_cache.get(key)
+    if cached is not cache.MISSING:
+        return cached
+
+    version = cache.dashboard_cache.version
+    async with replica.read_session() as db:
+        if stakeholder_id is not None and not await db.get(models.Stakeholder, stakeholder_id):
+            raise HTTPException(status_code=404, detail="Invalid stakeholder")
+        catalog = await question_catalog.current(db)
+        result = await analytics.analyze(
+            db, catalog, stakeholder_id, session_id, stream, class_name, by
         )
+    cache.dashboard_cache.set(key, result, version)
+    return result
 
-        demographic_headers.append({
-            "label": clean_label,
-            "key": key,
-            "question_id": q.id
-        })
 
-        demo_qid_to_key[q.id] = key
+# -----------------------------
+# FEEDBACK SESSIONS
+# One session per collection round (e.g. academic year); each form submits
+# into its active session, and closing a session freezes its results for
+# the trend view
+# -----------------------------
+MAX_SESSION_NAME = models.FeedbackSession.session_name.type.length
 
-    # -----------------------------
-    # STREAM OPTIONS (COURSE)
-    # -----------------------------
-    stream_options = (
-        db.query(models.FeedbackAnswer.answer_text)
-        .join(models.SyllabusQuestion)
-        .join(models.StakeholderPersonalInfo)
-        .filter(
-            models.SyllabusQuestion.category == "DEMOGRAPHIC",
-            models.SyllabusQuestion.text.ilike("%course%"),
-            models.StakeholderPersonalInfo.stakeholder_id == stakeholder_id
-        )
-        .distinct()
-        .all()
-    )
-    stream_options = [s[0] for s in stream_options]
 
-    # -----------------------------
-    # FETCH ALL ANSWERS
-    # -----------------------------
-    answers_query = (
-        db.query(
-            models.StakeholderPersonalInfo.person_id,
-            models.StakeholderPersonalInfo.name,
-            models.FeedbackAnswer.question_id,
-            models.FeedbackAnswer.answer_text
-        )
-        .join(models.FeedbackAnswer)
-        .filter(models.StakeholderPersonalInfo.stakeholder_id == stakeholder_id)
-        .order_by(
-            models.StakeholderPersonalInfo.person_id,
-            models.FeedbackAnswer.question_id
-        )
-    )
+@router.get("/sessions")
+async def list_sessions(
+    db: AsyncSession = Depends(get_db),
+    _: None = Depends(admin_required)
+):
+    return await feedback_sessions.overview(db)
 
-    answers = answers_query.all()
 
-    # -----------------------------
-    # PIVOT TABLE
-    # -----------------------------
-    row_map = {}
+@router.post("/sessions", status_code=status.HTTP_201_CREATED)
+async def create_session(
+    name: str,
+    activate: bool = False,
+    db: AsyncSession = Depends(get_db),
+    _: None = Depends(admin_required)
+):
+    name = name.strip()
+    if not name or len(name) > MAX_SESSION_NAME:
+        raise HTTPException(status_code=400, detail=f"Session name must be 1-{MAX_SESSION_NAME} characters")
 
-    for r in answers:
-        row = row_map.setdefault(r.person_id, {
-            "person_id": r.person_id,
-            "name": r.name
-        })
+    try:
+        session_id = await feedback_sessions.create(db, name)
+    except feedback_sessions.SessionExistsError:
+        raise HTTPException(status_code=409, detail="A session with this name already exists")
+    if activate:
+        await feedback_sessions.activate(db, session_id)
 
-        # DEMOGRAPHIC
-        if r.question_id in demo_qid_to_key:
-            row[demo_qid_to_key[r.question_id]] = r.answer_text
+    return {"session_id": session_id, "name": name, "activated": activate}
 
-        # SYLLABUS
-        if r.question_id in qid_to_qnum:
-            row[qid_to_qnum[r.question_id]] = r.answer_text
 
-    responses_table = list(row_map.values())
+@router.post("/sessions/{session_id}/activate")
+async def activate_session(
+    session_id: int,
+    form_name: list[str] | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+    _: None = Depends(admin_required)
+):
+    # ?form_name= may repeat; without it every form switches to this session
+    unknown = [f for f in form_name or () if f not in form_pages.FORM_STAKEHOLDERS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown form: {', '.join(unknown)}")
 
-    # -----------------------------
-    # APPLY STREAM FILTER (FIXED)
-    # -----------------------------
-    if stream:
-        def matches_stream(row):
-            for k, v in row.items():
-                if "course" in k or "program" in k or "stream" in k:
-                    return v == stream
-            return False
-
-        responses_table = [
-            r for r in responses_table
-            if matches_stream(r)
-        ]
+    try:
+        await feedback_sessions.activate(db, session_id, form_name)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Invalid session")
+    except feedback_sessions.SessionClosedError:
+        raise HTTPException(status_code=409, detail="Session is closed")
 
-    return templates.TemplateResponse(
-        "admin_dashboard.html",
-        {
-            "request": request,
-            "mode": "SINGLE",
-            "results": results,
-            "questions": syllabus_questions,
-            "question_numbers": question_numbers,
-            "responses_table": responses_table,
-            "stream_options": stream_options,
-            "selected_stream": stream,
-            "total_feedback": total_feedback,
-            "stakeholders": stakeholders,
-            "selected_stakeholder": stakeholder_id,
-            "demographic_headers": demographic_headers,
-        }
-    )
+    return {"status": "ok", "session_id": session_id, "forms": sorted(form_name or form_pages.FORM_STAKEHOLDERS)}
 
 
-@router.post("/update-responses")
-async def update_demographic_responses(
-    updates: list[dict],
-    db: Session = Depends(get_db),
+@router.post("/sessions/{session_id}/close")
+async def close_session(
+    session_id: int,
+    db: AsyncSession = Depends(get_db),
     _: None = Depends(admin_required)
 ):
-    for item in updates:
-        person_id = item["person_id"]
-        question_id = item["question_id"]
-        value = item["value"]
+    try:
+        await feedback_sessions.close(db, session_id)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Invalid session")
+    return {"status": "ok", "session_id": session_id, "open": False}
 
-        # Ensure question is DEMOGRAPHIC
-        question = db.query(models.SyllabusQuestion).filter(
-            models.SyllabusQuestion.id == question_id,
-            models.SyllabusQuestion.category == "DEMOGRAPHIC"
-        ).first()
 
-        if not question:
-            continue  # ❌ silently ignore non-demographic edits
+@router.post("/sessions/{session_id}/reopen")
+async def reopen_session(
+    session_id: int,
+    db: AsyncSession = Depends(get_db),
+    _: None = Depends(admin_required)
+):
+    try:
+        await feedback_sessions.reopen(db, session_id)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Invalid session")
+    return {"status": "ok", "session_id": session_id, "open": True}
 
-        answer = db.query(models.FeedbackAnswer).filter(
-            models.FeedbackAnswer.person_id == person_id,
-            models.FeedbackAnswer.question_id == question_id
-        ).first()
 
-        if answer:
-            answer.answer_text = value
+# Per-question averages of one stakeholder across sessions (oldest first),
+# with the change between the last two and whether it is significant
+@router.get("/trends")
+async def admin_trends(
+    stakeholder_id: int,
+    session_id: list[int] | None = Query(None),
+    _: None = Depends(admin_required)
+):
+    directory = await feedback_sessions.current()
+    for sid in session_id or ():
+        directory = await check_session(sid)
+
+    selected = tuple(sorted(set(session_id))) if session_id else None
+    key = ("trends", stakeholder_id, selected)
+    cached = cache.dashboard_cache.get(key)
+    if cached is not cache.MISSING:
+        return cached
+
+    version = cache.dashboard_cache.version
+    async with replica.read_session() as db:
+        if not await db.get(models.Stakeholder, stakeholder_id):
+            raise HTTPException(status_code=404, detail="Invalid stakeholder")
+        catalog = await question_catalog.current(db)
+        result = await trends.compare(db, directory, catalog, stakeholder_id, selected)
+    cache.dashboard_cache.set(key, result, version)
+    return result
+
+
+# Re-read syllabus_question after editing the questions
+@router.post("/questions/reload")
+async def admin_reload_questions(
+    db: AsyncSession = Depends(get_db),
+    _: None = Depends(admin_required)
+):
+    catalog = await question_catalog.load(db)
+    return {"status": "ok", "version": catalog.version, "questions": len(catalog.questions)}
 
-    db.commit()
-    return {"status": "ok"}
 
+# Dashboard cache hit/miss counters
+@router.get("/cache-stats")
+async def admin_cache_stats(_: None = Depends(admin_required)):
+    return cache.dashboard_cache.stats()
 
 
-@router.get("/export/stakeholder")
-def export_stakeholder_csv(
-    stakeholder_id: int,
-    stream: str | None = None,
-    db: Session = Depends(get_db),
+@router.get("/metrics")
+async def admin_metrics(_: None = Depends(admin_required)):
+    # Prometheus text format; this worker process only
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@router.get("/pool-stats")
+async def admin_pool_stats(_: None = Depends(admin_required)):
+    return {**database.pool_report(), "read_replica": replica.router.status()}
+
+
+@router.post("/update-responses")
+async def update_demographic_responses(
+    updates: list[dict],
+    db: AsyncSession = Depends(get_db),
     _: None = Depends(admin_required)
 ):
-    stakeholder = db.query(models.Stakeholder).filter(
-        models.Stakeholder.stakeholder_id == stakeholder_id
-    ).first()
+    catalog = await question_catalog.current(db)
+    results = await submissions.apply_demographic_edits(db, catalog, updates)
 
-    if not stakeholder:
-        return {"error": "Invalid stakeholder"}
+    counts = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
 
-    # -----------------------------
-    # DEMOGRAPHIC QUESTIONS
-    # -----------------------------
-    demographic_questions = (
-        db.query(models.SyllabusQuestion)
-        .filter(
-            models.SyllabusQuestion.category == "DEMOGRAPHIC",
-            models.SyllabusQuestion.stakeholder_type == stakeholder.stakeholder_type
-        )
-        .order_by(models.SyllabusQuestion.id)
-        .all()
-    )
+    if counts.get("updated") or counts.get("inserted"):
+        await db.commit()
+        cache.bump_data_version()
+        replica.router.mark_written()
 
-    demo_qid_to_key = {}
-    demo_headers = []
+    return {"status": "ok", "counts": counts, "results": results}
 
-    for q in demographic_questions:
-        label = re.sub(r"\[.*?\]", "", q.text).strip()
-        key = label.lower().replace(" ", "_").replace("/", "_")
-        demo_qid_to_key[q.id] = key
-        demo_headers.append(label)
 
-    # -----------------------------
-    # SYLLABUS QUESTIONS
-    # -----------------------------
-    syllabus_questions = (
-        db.query(models.SyllabusQuestion)
-        .filter(
-            models.SyllabusQuestion.category == "SYLLABUS",
-            models.SyllabusQuestion.stakeholder_type == stakeholder.stakeholder_type
-        )
-        .order_by(models.SyllabusQuestion.id)
-        .all()
-    )
 
-    qid_to_qnum = {q.id: f"q{i+1}" for i, q in enumerate(syllabus_questions)}
-    syllabus_headers = list(qid_to_qnum.values())
+def export_headers(filename: str, watermark) -> dict:
+    headers = {"Content-Disposition": f"attachment; filename={filename}"}
+    if watermark is not None:
+        # Pass back as ?since= to get only what changed after this export
+        headers["X-Export-Watermark"] = watermark.isoformat()
+    return headers
 
-    # -----------------------------
-    # FETCH ANSWERS
-    # -----------------------------
-    answers = (
-        db.query(
-            models.StakeholderPersonalInfo.person_id,
-            models.StakeholderPersonalInfo.name,
-            models.FeedbackAnswer.question_id,
-            models.FeedbackAnswer.answer_text
-        )
-        .join(models.FeedbackAnswer)
-        .filter(models.StakeholderPersonalInfo.stakeholder_id == stakeholder_id)
-        .order_by(
-            models.StakeholderPersonalInfo.person_id,
-            models.FeedbackAnswer.question_id
-        )
-        .all()
-    )
 
-    rows = {}
+def session_filename(session, filename: str) -> str:
+    return f"{export_jobs.safe_name(session.name)}_{filename}" if session else filename
 
-    for a in answers:
-        row = rows.setdefault(a.person_id, {
-            "person_id": a.person_id,
-            "name": a.name
-        })
 
-        if a.question_id in demo_qid_to_key:
-            row[demo_qid_to_key[a.question_id]] = a.answer_text
+def check_since(since: datetime | None):
+    # Watermarks are database-local times, exactly as X-Export-Watermark gave them
+    if since is not None and since.tzinfo is not None:
+        raise HTTPException(status_code=400, detail="since must be a watermark without a timezone")
 
-        if a.question_id in qid_to_qnum:
-            row[qid_to_qnum[a.question_id]] = a.answer_text
 
-    data = list(rows.values())
+@router.get("/export/stakeholder")
+async def export_stakeholder_csv(
+    stakeholder_id: int,
+    stream: str | None = None,
+    since: datetime | None = None,
+    session_id: int | None = None,
+    db: AsyncSession = Depends(replica.get_read_db),
+    _: None = Depends(admin_required)
+):
+    check_since(since)
+    session = (await check_session(session_id)).by_id.get(session_id)
+    stakeholder = await db.get(models.Stakeholder, stakeholder_id)
 
-    # -----------------------------
-    # STREAM FILTER
-    # -----------------------------
-    if stream:
-        def match_stream(row):
-            for k, v in row.items():
-                if "course" in k or "program" in k or "stream" in k:
-                    return v == stream
-            return False
+    if not stakeholder:
+        return {"error": "Invalid stakeholder"}
 
-        data = [r for r in data if match_stream(r)]
+    layout = (await question_catalog.current(db)).layout(stakeholder.stakeholder_type)
 
     # -----------------------------
-    # CSV BUILD
+    # STREAMED ROWS
+    # One row per person, pivoted a chunk of respondents at a time;
+    # with since, only the people changed after that watermark
     # -----------------------------
-    output = io.StringIO()
-    writer = csv.writer(output)
+    changes = exports.stream_changes(
+        lambda after, until: exports.stakeholder_answers_query(
+            stakeholder_id, stream, after, until, session_id
+        ),
+        since
+    )
+    watermark = await anext(changes)
+    rows = exports.pivot_rows(changes, layout)
 
-    header = ["Person ID", "Name"] + demo_headers + syllabus_headers
-    writer.writerow(header)
+    filename = session_filename(session, f"{stakeholder.stakeholder_type}_responses.csv")
 
-    for r in data:
-        row = [
-            r.get("person_id"),
-            r.get("name")
-        ]
-        for q in demo_qid_to_key.values():
-            row.append(r.get(q, ""))
-        for q in syllabus_headers:
-            row.append(r.get(q, ""))
-        writer.writerow(row)
+    return StreamingResponse(
+        exports.csv_stream(layout.csv_header, rows),
+        media_type="text/csv",
+        headers=export_headers(filename, watermark)
+    )
 
-    output.seek(0)
 
-    filename = f"{stakeholder.stakeholder_type}_responses.csv"
+@router.get("/export/all")
+async def export_all_csv(
+    since: datetime | None = None,
+    session_id: int | None = None,
+    _: None = Depends(admin_required)
+):
+    check_since(since)
+    session = (await check_session(session_id)).by_id.get(session_id)
+    catalog = await question_catalog.current()
+    changes = exports.stream_changes(
+        lambda after, until: exports.all_answers_query(after, until, session_id),
+        since
+    )
+    watermark = await anext(changes)
+    rows = exports.all_answers_rows(changes, catalog)
 
     return StreamingResponse(
-        output,
+        exports.csv_stream(exports.ALL_HEADER, rows),
         media_type="text/csv",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
+        headers=export_headers(session_filename(session, "all_stakeholders_responses.csv"), watermark)
     )
 
 
-@router.get("/export/all")
-def export_all_csv(db: Session = Depends(get_db),
-                   _: None = Depends(admin_required)):
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    # CSV header
-    writer.writerow([
-        "Stakeholder",
-        "Person ID",
-        "Name",
-        "Question",
-        "Answer"
-    ])
-
-    rows = (
-        db.query(
-            models.Stakeholder.stakeholder_type.label("stakeholder"),
-            models.StakeholderPersonalInfo.person_id,
-            models.StakeholderPersonalInfo.name,
-            models.SyllabusQuestion.text,
-            models.FeedbackAnswer.answer_text
-        )
-        .select_from(models.Stakeholder)   # ✅ EXPLICIT ROOT
-        .join(
-            models.StakeholderPersonalInfo,
-            models.Stakeholder.stakeholder_id == models.StakeholderPersonalInfo.stakeholder_id
+# Same data as the CSV exports as Parquet or an Arrow IPC stream: long
+# (export/all) or wide (export/stakeholder, needs stakeholder_id)
+@router.get("/export/columnar")
+async def export_columnar(
+    shape: Literal["long", "wide"] = "long",
+    fmt: Literal["parquet", "arrow"] = Query("parquet", alias="format"),
+    stakeholder_id: int | None = None,
+    stream: str | None = None,
+    since: datetime | None = None,
+    session_id: int | None = None,
+    db: AsyncSession = Depends(replica.get_read_db),
+    _: None = Depends(admin_required)
+):
+    if not columnar.available():
+        raise HTTPException(status_code=501, detail="Columnar exports need pyarrow (uv sync --extra columnar)")
+    check_since(since)
+    session = (await check_session(session_id)).by_id.get(session_id)
+    catalog = await question_catalog.current(db)
+
+    if shape == "long":
+        changes = exports.stream_changes(
+            lambda after, until: exports.all_answers_query(after, until, session_id),
+            since
         )
-        .join(
-            models.FeedbackAnswer,
-            models.StakeholderPersonalInfo.person_id == models.FeedbackAnswer.person_id
+        watermark = await anext(changes)
+        schema, batches = columnar.long_batches(changes, catalog)
+        name = "all_stakeholders_responses"
+    else:
+        if stakeholder_id is None:
+            raise HTTPException(status_code=400, detail="stakeholder_id is required for shape=wide")
+        stakeholder = await db.get(models.Stakeholder, stakeholder_id)
+        if not stakeholder:
+            raise HTTPException(status_code=404, detail="Invalid stakeholder")
+
+        changes = exports.stream_changes(
+            lambda after, until: exports.stakeholder_answers_query(
+                stakeholder_id, stream, after, until, session_id
+            ),
+            since
         )
-        .join(
-            models.SyllabusQuestion,
-            models.FeedbackAnswer.question_id == models.SyllabusQuestion.id
+        watermark = await anext(changes)
+        schema, batches = columnar.wide_batches(changes, catalog.layout(stakeholder.stakeholder_type))
+        name = f"{stakeholder.stakeholder_type}_responses"
+
+    media_type, extension = columnar.FORMATS[fmt]
+    return StreamingResponse(
+        columnar.write_stream(schema, batches, fmt),
+        media_type=media_type,
+        headers=export_headers(session_filename(session, name + extension), watermark)
+    )
+
+
+# -----------------------------
+# BACKGROUND EXPORT JOBS
+# Large exports run in a worker process and are downloaded when done,
+# instead of holding a request open for the whole export
+# -----------------------------
+@router.post("/exports", status_code=status.HTTP_202_ACCEPTED)
+async def submit_export_job(
+    response: Response,
+    kind: Literal["all", "stakeholder"] = "all",
+    stakeholder_id: int | None = None,
+    stream: str | None = None,
+    compress: bool | None = None,
+    session_id: int | None = None,
+    db: AsyncSession = Depends(replica.get_read_db),
+    _: None = Depends(admin_required)
+):
+    session = (await check_session(session_id)).by_id.get(session_id)
+    stakeholder = None
+    if kind == "stakeholder":
+        if stakeholder_id is None:
+            raise HTTPException(status_code=400, detail="stakeholder_id is required")
+        stakeholder = await db.get(models.Stakeholder, stakeholder_id)
+        if not stakeholder:
+            raise HTTPException(status_code=404, detail="Invalid stakeholder")
+    elif stream:
+        raise HTTPException(status_code=400, detail="stream needs kind=stakeholder")
+
+    catalog = await question_catalog.current(db)
+    try:
+        job, created = await export_jobs.jobs.submit(
+            db, catalog, kind, stakeholder, stream,
+            export_jobs.GZIP if compress is None else compress, session
         )
-        .order_by(
-            models.Stakeholder.stakeholder_type,
-            models.StakeholderPersonalInfo.person_id,
-            models.SyllabusQuestion.id
+    except export_jobs.ExportBusyError:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many exports running, please try again later",
+            headers={"Retry-After": "30"}
         )
-        .all()
-    )
 
-    for r in rows:
-        clean_question = re.sub(r"\[.*?\]", "", r.text).strip()
-        writer.writerow([
-            r.stakeholder,
-            r.person_id,
-            r.name,
-            clean_question,
-            r.answer_text
-        ])
+    if not created:
+        response.status_code = status.HTTP_200_OK   # same data, existing job
+    return {**export_jobs.view(job), "reused": not created}
 
-    output.seek(0)
 
-    return StreamingResponse(
-        output,
-        media_type="text/csv",
-        headers={
-            "Content-Disposition": "attachment; filename=all_stakeholders_responses.csv"
-        }
-    )
+@router.get("/exports")
+async def list_export_jobs(_: None = Depends(admin_required)):
+    return [export_jobs.view(job) for job in export_jobs.jobs.all()]
 
 
+@router.get("/exports/{job_id}")
+async def export_job_status(job_id: str, _: None = Depends(admin_required)):
+    job = export_jobs.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired export")
+    return export_jobs.view(job)
+
+
+@router.get("/exports/{job_id}/download")
+async def download_export_job(job_id: str, _: None = Depends(admin_required)):
+    job = export_jobs.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired export")
+    if job["status"] != export_jobs.DONE:
+        raise HTTPException(status_code=409, detail=f"Export is {job['status']}")
+
+    path = export_jobs.jobs.artifact(job)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Unknown or expired export")
+
+    return FileResponse(
+        path,
+        media_type="application/gzip" if job["compress"] else "text/csv",
+        filename=job["filename"]
+    )
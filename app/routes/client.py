@@ -1,19 +1,21 @@
 from fastapi import APIRouter, Request, HTTPException, Depends, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-import models
-from database import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+import submissions
+import question_catalog
+import form_pages
+import ingest
+import cache
+import feedback_sessions
+from database import AsyncSessionLocal
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 @router.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
@@ -28,115 +30,75 @@ async def select_category(request: Request):
 async def get_form(
     request: Request,
     form_name: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    # Map form names to stakeholder_type values
-    stakeholder_map = {
-        "studentfeedback": "STUDENT",
-        "parentfeedback": "PARENT",
-        "alumnifeedback": "ALUMNI",
-        "internalfaculty": "TEACHER",
-        "externalfaculty": "OUTSIDE_TEACHER",
-        "industryrep": "EMPLOYER"
-    }
-
-    stakeholder = stakeholder_map.get(form_name)
-
-    if stakeholder is None:
+    if form_name not in form_pages.FORM_STAKEHOLDERS:
         raise HTTPException(status_code=404, detail="Invalid feedback form")
 
-    # Fetch questions directly using normalized columns
-    questions = (
-        db.query(models.SyllabusQuestion)
-        .filter(models.SyllabusQuestion.stakeholder_type == stakeholder)
-        .order_by(models.SyllabusQuestion.id)
-        .all()
-    )
-
-    return templates.TemplateResponse(
-        f"feedbackForms/{form_name}.html",
-        {
-            "request": request,
-            "questions": questions,
-            "form_name": form_name
-        }
-    )
+    if not (await feedback_sessions.current(db)).accepting(form_name):
+        raise HTTPException(status_code=409, detail="This feedback form is closed")
+
+    # Rendered once per question-catalog version; 304 when the browser's
+    # copy is still current
+    catalog = await question_catalog.current(db)
+    page = form_pages.get_page(templates, form_name, catalog)
+
+    return form_pages.page_response(request, page)
 
 @router.post("/submit-feedback")
 async def submit_feedback(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     form = await request.form()
 
-    # 1️⃣ Get or create feedback session
-    feedback_session = (
-        db.query(models.FeedbackSession)
-        .filter(models.FeedbackSession.session_name == "Default Session")
-        .first()
-    )
-
-    if not feedback_session:
-        feedback_session = models.FeedbackSession(session_name="Default Session")
-        db.add(feedback_session)
-        db.commit()
-        db.refresh(feedback_session)
-
-    # 2️⃣ Resolve stakeholder_type from form_name
+    # 1️⃣ Resolve stakeholder_type from form_name
     form_name = form.get("form_name")
 
-    stakeholder_map = {
-        "studentfeedback": "STUDENT",
-        "parentfeedback": "PARENT",
-        "alumnifeedback": "ALUMNI",
-        "internalfaculty": "TEACHER",
-        "externalfaculty": "OUTSIDE_TEACHER",
-        "industryrep": "EMPLOYER"
-    }
-
-    stakeholder_type = stakeholder_map.get(form_name)
+    stakeholder_type = form_pages.FORM_STAKEHOLDERS.get(form_name)
     if not stakeholder_type:
         raise HTTPException(status_code=400, detail="Invalid form")
 
-    stakeholder = (
-        db.query(models.Stakeholder)
-        .filter(models.Stakeholder.stakeholder_type == stakeholder_type)
-        .first()
-    )
-
-    if not stakeholder:
-        stakeholder = models.Stakeholder(stakeholder_type=stakeholder_type)
-        db.add(stakeholder)
-        db.commit()
-        db.refresh(stakeholder)
-
-    # 3️⃣ Create person entry (no hard-coded name fields)
-    person = models.StakeholderPersonalInfo(
-        session_id=feedback_session.session_id,
-        stakeholder_id=stakeholder.stakeholder_id,
-        name="N/A",               # optional placeholder
-        association_name=None     # optional placeholder
-    )
-    db.add(person)
-    db.flush()  # IMPORTANT: get person_id without committing
-
-    # 4️⃣ Save ALL answers dynamically
-    for key, value in form.items():
-        if key.startswith("q_"):
-            try:
-                question_id = int(key.split("_")[1])
-            except ValueError:
-                continue
-
-            db.add(
-                models.FeedbackAnswer(
-                    person_id=person.person_id,
-                    question_id=question_id,
-                    answer_text=str(value)
-                )
+    answers = submissions.parse_answers(form)
+
+    # Only questions the loaded catalog knows (checked in memory)
+    catalog = await question_catalog.current(db)
+    if not catalog.has_all(question_id for question_id, _ in answers):
+        raise HTTPException(status_code=400, detail="Unknown question")
+
+    # 2️⃣ Session this form currently submits into (see feedback_sessions.py)
+    try:
+        session_id = await feedback_sessions.session_for_form(db, form_name)
+    except feedback_sessions.SessionClosedError:
+        raise HTTPException(status_code=409, detail="This feedback form is closed")
+
+    # Write-behind mode: hand off to the batching queue
+    if ingest.ingest_queue is not None:
+        try:
+            await ingest.ingest_queue.submit(stakeholder_type, answers, session_id)
+        except feedback_sessions.SessionClosedError:
+            # Closed while queued (flush durability; enqueue mode drops it)
+            raise HTTPException(status_code=409, detail="This feedback form is closed")
+        except ingest.QueueFullError:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many submissions right now, please try again",
+                headers={"Retry-After": "5"}
             )
+        return RedirectResponse(url="/submitted-feedback", status_code=303)
 
-    db.commit()
+    # 3️⃣ Stakeholder ID (cached in-process after first lookup)
+    stakeholder_id = await submissions.get_stakeholder_id(db, stakeholder_type)
+
+    # 4️⃣ Person row + ALL answers in one transaction
+    try:
+        await submissions.add_submission(db, session_id, stakeholder_id, answers)
+    except feedback_sessions.SessionClosedError:
+        # Closed through another worker since our directory was refreshed
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="This feedback form is closed")
+    await db.commit()
+    cache.bump_data_version()  # dashboard views computed before this are stale
 
     return RedirectResponse(url="/submitted-feedback", status_code=303)
 
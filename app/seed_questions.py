@@ -1,42 +1,59 @@
-
 import sys
 import os
-# Add 'app' directory to sys.path so 'from database import ...' works inside models.py
-sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+import re
+# Make 'from database import ...' work when run as a script from the repo root
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 
-from database import SessionLocal, engine
+from sqlalchemy import func, insert, select
+from database import engine
 from models import SyllabusQuestion
-from sqlalchemy.orm import Session
-
-
-def seed_questions():
-    db = SessionLocal()
-    questions = [
-        "The faculty explains concepts clearly.",
-        "The course material is helpful and clear.",
-        "The faculty encourages questions and interaction.",
-        "Assignments and assessments are clear and fair.",
-        "Overall satisfaction with the course."
-    ]
-    
-    print("Seeding questions...")
-    try:
-        # Check if questions exist
-        existing = db.query(SyllabusQuestion).count()
-        if existing > 0:
-            print(f"Questions already exist ({existing}). Skipping seed.")
-        else:
-            for q_text in questions:
-                q = SyllabusQuestion(text=q_text)
-                db.add(q)
-            db.commit()
-            print("Questions seeded successfully.")
-    except Exception as e:
-        print(f"Error seeding questions: {e}")
-    finally:
-        db.close()
+import migrate
+
+SETUP_SQL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "setup_database.sql")
+
+# ('text', 'STAKEHOLDER_TYPE', 'CATEGORY') tuples of the syllabus_question INSERTs
+QUESTION_ROW = re.compile(r"\(\s*'((?:[^']|'')*)'\s*,\s*'(\w+)'\s*,\s*'(\w+)'\s*\)")
+
+
+def load_question_set(path: str = SETUP_SQL) -> list[dict]:
+    # The real question set, in file order (= id order after a fresh setup)
+    with open(path, encoding="utf-8") as f:
+        sql = f.read()
+
+    questions = []
+    for statement in sql.split(";"):
+        if "INSERT INTO syllabus_question" not in statement:
+            continue
+        for text, stakeholder_type, category in QUESTION_ROW.findall(statement):
+            questions.append({
+                "text": text.replace("''", "'"),
+                "stakeholder_type": stakeholder_type,
+                "category": category
+            })
+    return questions
+
+
+def seed_questions(conn=None) -> int:
+    # Load the questions from setup_database.sql into an empty table with
+    # one multi-row INSERT; returns how many were inserted (0: already seeded)
+    if conn is None:
+        with engine.begin() as own_conn:
+            return seed_questions(own_conn)
+
+    if conn.scalar(select(func.count()).select_from(SyllabusQuestion)):
+        return 0
+
+    questions = load_question_set()
+    conn.execute(insert(SyllabusQuestion), questions)
+    return len(questions)
 
 
 if __name__ == "__main__":
-    seed_questions()
+    # A fresh database (e.g. DB_BACKEND=sqlite) has no tables yet
+    migrate.setup(engine)
+    count = seed_questions()
+    if count:
+        print(f"Seeded {count} questions.")
+    else:
+        print("Questions already exist. Skipping seed.")
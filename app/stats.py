@@ -0,0 +1,128 @@
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.dialects import mysql, sqlite
+from database import engine
+import models
+
+RATINGS = (1, 2, 3, 4, 5)
+
+QUESTION_KEYS = ("stakeholder_id", "question_id", "session_id")
+QUESTION_COUNTERS = (
+    "response_count", "score_sum", "score_sq_sum",
+    *(f"rating_{r}" for r in RATINGS)
+)
+RESPONDENT_KEYS = ("stakeholder_id", "session_id")
+RESPONDENT_COUNTERS = ("respondents",)
+
+
+# -----------------------------
+# INCREMENTAL UPDATES
+# Called inside the submitting transaction, so the summary commits or rolls
+# back together with the answers it describes
+# -----------------------------
+def upsert_add(dialect_name, model, keys, counters):
+    # INSERT ... or add to the existing counters when the key already exists
+    table = model.__table__
+
+    if dialect_name == "mysql":
+        stmt = mysql.insert(table)
+        return stmt.on_duplicate_key_update(
+            {c: table.c[c] + stmt.inserted[c] for c in counters}
+        )
+
+    if dialect_name == "sqlite":
+        stmt = sqlite.insert(table)
+        return stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={c: table.c[c] + stmt.excluded[c] for c in counters}
+        )
+
+    raise NotImplementedError(f"No upsert for dialect {dialect_name}")
+
+
+def question_deltas(scored_answers):
+    # scored_answers: iterable of (stakeholder_id, question_id, session_id, score)
+    deltas = {}
+
+    for stakeholder_id, question_id, session_id, score in scored_answers:
+        row = deltas.setdefault((stakeholder_id, question_id, session_id), {
+            "stakeholder_id": stakeholder_id,
+            "question_id": question_id,
+            "session_id": session_id,
+            **{c: 0 for c in QUESTION_COUNTERS}
+        })
+        row["response_count"] += 1
+        row["score_sum"] += score
+        row["score_sq_sum"] += score * score
+        if score in RATINGS:
+            row[f"rating_{score}"] += 1
+
+    # Fixed key order keeps concurrent transactions from deadlocking
+    return [deltas[k] for k in sorted(deltas)]
+
+
+async def record_submissions(db, people, scored_answers):
+    # people: iterable of (stakeholder_id, session_id), one per new respondent
+    dialect_name = db.get_bind().dialect.name
+
+    respondents = {}
+    for key in people:
+        respondents[key] = respondents.get(key, 0) + 1
+
+    if respondents:
+        await db.execute(
+            upsert_add(dialect_name, models.RespondentCount, RESPONDENT_KEYS, RESPONDENT_COUNTERS),
+            [
+                {"stakeholder_id": s, "session_id": t, "respondents": n}
+                for (s, t), n in sorted(respondents.items())
+            ]
+        )
+
+    rows = question_deltas(scored_answers)
+    if rows:
+        await db.execute(
+            upsert_add(dialect_name, models.QuestionStats, QUESTION_KEYS, QUESTION_COUNTERS),
+            rows
+        )
+
+
+# -----------------------------
+# FULL REBUILD (consistency repair)
+# -----------------------------
+def rebuild(conn):
+    FA, SPI = models.FeedbackAnswer, models.StakeholderPersonalInfo
+
+    conn.execute(delete(models.QuestionStats))
+    conn.execute(delete(models.RespondentCount))
+
+    conn.execute(
+        insert(models.QuestionStats).from_select(
+            list(QUESTION_KEYS) + list(QUESTION_COUNTERS),
+            select(
+                SPI.stakeholder_id,
+                FA.question_id,
+                SPI.session_id,
+                func.count(FA.score),
+                func.sum(FA.score),
+                func.sum(FA.score * FA.score),
+                *(func.sum(case((FA.score == r, 1), else_=0)) for r in RATINGS)
+            )
+            .join(SPI, FA.person_id == SPI.person_id)
+            .where(FA.score.is_not(None))
+            .group_by(SPI.stakeholder_id, FA.question_id, SPI.session_id)
+        )
+    )
+
+    conn.execute(
+        insert(models.RespondentCount).from_select(
+            list(RESPONDENT_KEYS) + list(RESPONDENT_COUNTERS),
+            select(SPI.stakeholder_id, SPI.session_id, func.count())
+            .group_by(SPI.stakeholder_id, SPI.session_id)
+        )
+    )
+
+
+if __name__ == "__main__":
+    with engine.begin() as conn:
+        rebuild(conn)
+        rows = conn.scalar(select(func.count()).select_from(models.QuestionStats))
+    print(f"Rebuilt question_stats ({rows} rows) and respondent_counts.")
@@ -0,0 +1,301 @@
+from sqlalchemy import func, select, insert, update
+import models
+import stats
+import facets
+import question_catalog
+
+DEFAULT_SESSION_NAME = "Default Session"
+
+# -----------------------------
+# LOOKUP ID CACHE
+# Session and stakeholder rows are created once and never change, so each
+# process resolves them on first use instead of on every POST (question
+# categories come from the in-memory question catalog)
+# -----------------------------
+_session_ids: dict[str, int] = {}
+_stakeholder_ids: dict[str, int] = {}
+
+RATING_VALUES = {"1", "2", "3", "4", "5"}
+
+
+class SessionClosedError(Exception):
+    pass
+
+
+def clear_cache():
+    # Call after the tables are reset (reset_db.py, tests)
+    _session_ids.clear()
+    _stakeholder_ids.clear()
+    question_catalog.clear()
+
+
+async def get_session_id(db, session_name: str = DEFAULT_SESSION_NAME) -> int:
+    session_id = _session_ids.get(session_name)
+    if session_id is not None:
+        return session_id
+
+    session_id = await db.scalar(
+        select(models.FeedbackSession.session_id)
+        .where(models.FeedbackSession.session_name == session_name)
+        .limit(1)
+    )
+
+    if session_id is None:
+        result = await db.execute(
+            insert(models.FeedbackSession).values(session_name=session_name)
+        )
+        session_id = result.inserted_primary_key[0]
+        await db.commit()
+
+    _session_ids[session_name] = session_id
+    return session_id
+
+
+async def get_stakeholder_id(db, stakeholder_type: str) -> int:
+    stakeholder_id = _stakeholder_ids.get(stakeholder_type)
+    if stakeholder_id is not None:
+        return stakeholder_id
+
+    stakeholder_id = await db.scalar(
+        select(models.Stakeholder.stakeholder_id)
+        .where(models.Stakeholder.stakeholder_type == stakeholder_type)
+        .limit(1)
+    )
+
+    if stakeholder_id is None:
+        result = await db.execute(
+            insert(models.Stakeholder).values(stakeholder_type=stakeholder_type)
+        )
+        stakeholder_id = result.inserted_primary_key[0]
+        await db.commit()
+
+    _stakeholder_ids[stakeholder_type] = stakeholder_id
+    return stakeholder_id
+
+
+def score_for(question_id: int, answer_text: str, categories) -> int | None:
+    # Typed rating stored next to the raw text so averages never parse strings
+    if categories.get(question_id) == "SYLLABUS" and answer_text in RATING_VALUES:
+        return int(answer_text)
+    return None
+
+
+def parse_answers(form) -> list[tuple[int, str]]:
+    # Collect every q_<question_id> field as (question_id, answer_text)
+    answers = []
+
+    for key, value in form.items():
+        if key.startswith("q_"):
+            try:
+                question_id = int(key.split("_")[1])
+            except ValueError:
+                continue
+
+            answers.append((question_id, str(value)))
+
+    return answers
+
+
+async def add_submission(db, session_id: int, stakeholder_id: int, answers) -> int:
+    person_ids = await add_submissions(db, [(session_id, stakeholder_id, answers)])
+    return person_ids[0]
+
+
+async def add_submissions(db, batch) -> list[int]:
+    # batch: list of (session_id, stakeholder_id, answers)
+    # One INSERT per person row (its ID is needed for the answers), then
+    # every answer of the whole batch in one multi-row INSERT, then the
+    # dashboard summary and facet rows in the same transaction. The caller commits.
+    person_ids = []
+    answer_rows = []
+    scored_answers = []
+    people = []
+    catalog = await question_catalog.current(db)
+    await _check_open(db, {session_id for session_id, _, _ in batch})
+
+    for session_id, stakeholder_id, answers in batch:
+        result = await db.execute(
+            insert(models.StakeholderPersonalInfo).values(
+                session_id=session_id,
+                stakeholder_id=stakeholder_id,
+                name="N/A",               # optional placeholder
+                association_name=None     # optional placeholder
+            )
+        )
+        person_id = result.inserted_primary_key[0]
+        person_ids.append(person_id)
+        people.append((person_id, stakeholder_id, answers))
+
+        for question_id, answer_text in answers:
+            score = score_for(question_id, answer_text, catalog.categories)
+            answer_rows.append({
+                "person_id": person_id,
+                "question_id": question_id,
+                "answer_text": answer_text,
+                "score": score
+            })
+            if score is not None:
+                scored_answers.append((stakeholder_id, question_id, session_id, score))
+
+    if answer_rows:
+        await db.execute(insert(models.FeedbackAnswer.__table__), answer_rows)
+
+    await stats.record_submissions(
+        db,
+        [(stakeholder_id, session_id) for session_id, stakeholder_id, _ in batch],
+        scored_answers
+    )
+    await facets.record_submissions(db, people, catalog.facets)
+
+    return person_ids
+
+
+async def _check_open(db, session_ids):
+    # The close is enforced here, not only by each worker's session directory
+    # (up to FEEDBACK_SESSION_REFRESH_SECONDS old) or by whatever sat in the
+    # write-behind queue. The shared row lock serializes this transaction with
+    # feedback_sessions.close(): a close committed first is seen here, and a
+    # close started later waits for this insert, so its snapshot includes it.
+    FS = models.FeedbackSession
+    rows = (await db.execute(
+        select(FS.session_id, FS.closed_at)
+        .where(FS.session_id.in_(sorted(session_ids)))
+        .with_for_update(read=True)
+    )).tuples().all()
+    closed = sorted(session_id for session_id, closed_at in rows if closed_at is not None)
+    if closed:
+        raise SessionClosedError(closed)
+
+
+# -----------------------------
+# DEMOGRAPHIC EDITS (ADMIN DASHBOARD)
+# -----------------------------
+MAX_ANSWER_LENGTH = models.FeedbackAnswer.answer_text.type.length
+
+
+def _edit_result(index, person_id, question_id, status, error=None):
+    result = {"index": index, "person_id": person_id, "question_id": question_id, "status": status}
+    if error:
+        result["error"] = error
+    return result
+
+
+async def apply_demographic_edits(db, catalog, updates) -> list[dict]:
+    # Set-based: validate every item in memory against the question catalog,
+    # read the people and their existing answers in one query each, then
+    # write all changes as one executemany UPDATE plus one INSERT for cells
+    # that had no answer row. Returns one result per item, in order.
+    # The caller commits.
+    results = [None] * len(updates)
+    edits = {}  # (person_id, question_id) -> (index, value); last edit of a cell wins
+
+    for index, item in enumerate(updates):
+        try:
+            # IDs arrive as strings from the dashboard's data-* attributes
+            person_id = int(item["person_id"])
+            question_id = int(item["question_id"])
+            value = item["value"]
+        except (KeyError, TypeError, ValueError):
+            results[index] = _edit_result(index, None, None, "rejected", "malformed item")
+            continue
+
+        question = catalog.by_id.get(question_id)
+        if question is None or question.category != "DEMOGRAPHIC":
+            # These carry no score, so question_stats never needs adjusting
+            results[index] = _edit_result(index, person_id, question_id, "rejected", "not a demographic question")
+            continue
+        if value is None:
+            value = ""
+        value = str(value)
+        if len(value) > MAX_ANSWER_LENGTH:
+            results[index] = _edit_result(index, person_id, question_id, "rejected", "value too long")
+            continue
+
+        previous = edits.get((person_id, question_id))
+        if previous is not None:
+            results[previous[0]] = _edit_result(previous[0], person_id, question_id, "superseded")
+        edits[(person_id, question_id)] = (index, value)
+
+    if not edits:
+        return results
+
+    person_ids = sorted({pid for pid, _ in edits})
+    question_ids = sorted({qid for _, qid in edits})
+
+    # Who the people are (an edit may only touch its own stakeholder's questions)
+    person_types = dict((await db.execute(
+        select(models.StakeholderPersonalInfo.person_id, models.Stakeholder.stakeholder_type)
+        .join(models.Stakeholder)
+        .where(models.StakeholderPersonalInfo.person_id.in_(person_ids))
+    )).tuples().all())
+
+    # Current answers for the edited cells
+    existing = {}
+    for answer_id, pid, qid, text in (await db.execute(
+        select(
+            models.FeedbackAnswer.answer_id,
+            models.FeedbackAnswer.person_id,
+            models.FeedbackAnswer.question_id,
+            models.FeedbackAnswer.answer_text
+        )
+        .where(
+            models.FeedbackAnswer.person_id.in_(person_ids),
+            models.FeedbackAnswer.question_id.in_(question_ids)
+        )
+        .order_by(models.FeedbackAnswer.answer_id)
+    )).tuples():
+        existing.setdefault((pid, qid), (answer_id, text))
+
+    to_update, to_insert = [], []
+    for (pid, qid), (index, value) in edits.items():
+        if person_types.get(pid) != catalog.by_id[qid].stakeholder_type:
+            error = "unknown person" if pid not in person_types else "question belongs to another form"
+            results[index] = _edit_result(index, pid, qid, "rejected", error)
+            continue
+
+        current = existing.get((pid, qid))
+        if current is None:
+            to_insert.append({"person_id": pid, "question_id": qid, "answer_text": value, "score": None})
+            results[index] = _edit_result(index, pid, qid, "inserted")
+        elif current[1] == value:
+            results[index] = _edit_result(index, pid, qid, "unchanged")
+        else:
+            to_update.append({"answer_id": current[0], "answer_text": value})
+            results[index] = _edit_result(index, pid, qid, "updated")
+
+    if to_update:
+        # ORM bulk UPDATE by primary key: one executemany statement
+        await db.execute(update(models.FeedbackAnswer), to_update)
+    if to_insert:
+        await db.execute(insert(models.FeedbackAnswer.__table__), to_insert)
+
+    # Keep respondent_facets in step with edited course/class/year answers
+    changed = {
+        (r["person_id"], r["question_id"]) for r in results
+        if r and r["status"] in ("updated", "inserted")
+    }
+    facet_people = {pid for pid, qid in changed if catalog.by_id[qid].facet}
+    if facet_people:
+        await facets.refresh(db, facet_people, catalog.facets)
+
+    # Edited respondents show up in the next delta export
+    if changed:
+        await db.execute(
+            update(models.StakeholderPersonalInfo)
+            .where(models.StakeholderPersonalInfo.person_id.in_({pid for pid, _ in changed}))
+            .values(updated_at=func.now())
+        )
+        await count_change(db)
+
+    return results
+
+
+async def count_change(db):
+    # One more edit of stored answers. updated_at only has one-second
+    # resolution, so export jobs fingerprint the data with this counter too
+    CC = models.ChangeCounter
+    result = await db.execute(
+        update(CC).where(CC.counter_id == 1).values(changes=CC.changes + 1)
+    )
+    if result.rowcount == 0:
+        await db.execute(insert(CC).values(counter_id=1, changes=1))
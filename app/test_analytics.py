@@ -0,0 +1,80 @@
+import random
+import statistics
+
+import numpy as np
+from sqlalchemy import insert
+
+import analytics
+import models
+import stats
+from analytics import Ratings
+
+
+def test_summary_matches_per_question_python_statistics():
+    rng = random.Random(7)
+    ratings = {qid: [rng.randint(1, 5) for _ in range(rng.randint(2, 60))] for qid in (3, 9, 12)}
+    ratings[20] = [4]   # a single rating has no spread
+    question_ids = [qid for qid, values in ratings.items() for _ in values]
+    scores = [v for values in ratings.values() for v in values]
+    order = list(range(len(scores)))
+    rng.shuffle(order)
+
+    summary = analytics.summarize(Ratings(
+        [question_ids[i] for i in order], [scores[i] for i in order]
+    ))
+
+    assert [s["question_id"] for s in summary] == [3, 9, 12, 20]
+    for s in summary:
+        values = ratings[s["question_id"]]
+        assert s["n"] == len(values)
+        assert s["mean"] == round(statistics.mean(values), 3)
+        assert s["median"] == statistics.median(values)
+        assert s["histogram"] == [values.count(r) for r in range(1, 6)]
+        assert s["top2_box"] == round(sum(v >= 4 for v in values) / len(values), 3)
+        if len(values) > 1:
+            assert s["std"] == round(statistics.stdev(values), 3)
+            low, high = s["mean_ci"]
+            assert low < s["mean"] < high
+            assert 0 <= s["top2_box_ci"][0] <= s["top2_box"] <= s["top2_box_ci"][1] <= 1
+        else:
+            assert s["std"] is None and s["mean_ci"] == [None, None]
+
+
+def test_load_and_crosstab_by_facet(empty_database):
+    streams = {1: "BMS", 2: "BMS", 3: "BSc IT", 4: None}
+    with empty_database.engine.begin() as conn:
+        conn.execute(insert(models.Stakeholder), [{"stakeholder_id": 1, "stakeholder_type": "STUDENT"}])
+        conn.execute(insert(models.FeedbackSession), [{"session_id": 1, "session_name": "2026"}])
+        conn.execute(insert(models.SyllabusQuestion), [
+            {"id": qid, "text": f"Q{qid}", "stakeholder_type": "STUDENT", "category": "SYLLABUS"} for qid in (1, 2)
+        ])
+        conn.execute(insert(models.StakeholderPersonalInfo), [
+            {"person_id": pid, "session_id": 1, "stakeholder_id": 1, "name": "N/A"} for pid in streams
+        ])
+        conn.execute(insert(models.RespondentFacet), [
+            {"person_id": pid, "stakeholder_id": 1, "stream": stream} for pid, stream in streams.items() if stream
+        ])
+        conn.execute(insert(models.FeedbackAnswer), [
+            {"person_id": pid, "question_id": qid, "answer_text": str(pid + qid), "score": pid + qid}
+            for pid in streams for qid in (1, 2) if pid + qid <= 5
+        ])
+        stats.rebuild(conn)
+
+    async def scenario(Session):
+        async with Session() as db:
+            everyone = await analytics.load(db, stakeholder_id=1, by="stream", fetch_rows=2)
+            bms = await analytics.load(db, stakeholder_id=1, stream="BMS")
+            # Unfiltered reports come from question_stats, not the rows
+            report = await analytics.analyze(db, None, stakeholder_id=1)
+            return everyone, bms, report
+
+    everyone, bms, report = empty_database.run(scenario)
+
+    assert len(everyone) == 7 and len(bms) == 4
+    assert everyone.group_names == ["BMS", "BSc IT", None]   # no facet row: blank, last
+    table = analytics.crosstab(everyone)
+    q1 = table["questions"][0]
+    assert q1["question_id"] == 1
+    assert [(c["group"], c["n"], c["mean"]) for c in q1["cells"]] == [("BMS", 2, 2.5), ("BSc IT", 1, 4.0), (None, 1, 5.0)]
+    assert np.array_equal(np.sort(bms.scores), [2, 3, 3, 4])
+    assert report == {"ratings": 7, "questions": analytics.summarize(everyone)}
@@ -0,0 +1,43 @@
+from cache import MISSING, VersionedCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hit_until_data_version_bumps():
+    c = VersionedCache(max_entries=4, ttl_seconds=60, clock=FakeClock())
+    c.set(("dashboard", 1), "page")
+
+    assert c.get(("dashboard", 1)) == "page"
+    c.bump()
+    assert c.get(("dashboard", 1)) is MISSING
+    assert (c.hits, c.misses) == (1, 1)
+
+
+def test_entry_computed_before_a_write_is_already_stale():
+    c = VersionedCache(clock=FakeClock())
+    version = c.version   # read before querying ...
+    c.bump()              # ... a submission commits meanwhile
+    c.set("k", "old data", version)
+
+    assert c.get("k") is MISSING
+
+
+def test_ttl_expiry_and_lru_eviction():
+    clock = FakeClock()
+    c = VersionedCache(max_entries=2, ttl_seconds=10, clock=clock)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")            # a is now most recently used
+    c.set("c", 3)         # evicts b
+
+    assert c.get("b") is MISSING
+    assert c.get("a") == 1
+    clock.now = 11
+    assert c.get("c") is MISSING
+    assert c.stats()["evictions"] == 1
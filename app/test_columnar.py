@@ -0,0 +1,74 @@
+import asyncio
+import io
+import resource
+from collections import namedtuple
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq
+
+import columnar
+import pivot
+from question_catalog import QuestionCatalog
+
+Row = namedtuple("Row", "stakeholder person_id name question_id answer_text score")
+Question = namedtuple("Question", "id category text", defaults=("",))
+
+CATALOG = QuestionCatalog([
+    (qid, f"[STUDENT][SYLLABUS] Question {qid}", "STUDENT", "SYLLABUS") for qid in range(1, 11)
+])
+
+ROWS = 1_000_000
+RSS_CEILING_MB = 80
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def fake_cursor(count, questions=10):
+    for i in range(count):
+        qid = i % questions + 1
+        yield Row("STUDENT", i // questions + 1, "N/A", qid, str(qid % 5 + 1), qid % 5 + 1)
+
+
+async def collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+def test_long_parquet_is_written_in_row_groups():
+    before = max_rss_mb()
+    schema, batches = columnar.long_batches(fake_cursor(ROWS), CATALOG)
+    data = asyncio.run(collect(columnar.write_stream(schema, batches, "parquet")))
+    assert max_rss_mb() - before < RSS_CEILING_MB
+
+    f = pq.ParquetFile(io.BytesIO(data))
+    assert f.metadata.num_rows == ROWS
+    assert f.metadata.num_row_groups == ROWS // columnar.ROW_GROUP_ROWS
+
+    first = f.read_row_group(0).slice(0, 2).to_pylist()
+    assert first[1] == {
+        "stakeholder": "STUDENT", "person_id": 1, "name": "N/A", "question_id": 2,
+        "question": "Question 2", "category": "SYLLABUS", "answer": "3", "score": 3
+    }
+    assert f.schema_arrow.field("question").type == pa.dictionary(pa.int32(), pa.string())
+
+
+def test_wide_arrow_stream_has_typed_scores():
+    layout = pivot.Layout([], [Question(qid, "SYLLABUS") for qid in range(1, 4)])
+
+    async def answers():
+        for person_id in range(1, 26):
+            for qid in range(1, 4):
+                yield person_id, "N/A", qid, "x" if qid == 3 else str(qid)
+
+    schema, batches = columnar.wide_batches(answers(), layout, group_respondents=10)
+    data = asyncio.run(collect(columnar.write_stream(schema, batches, "arrow")))
+
+    reader = pa.ipc.open_stream(data)
+    sizes = [len(batch) for batch in reader]
+    assert sizes == [10, 10, 5]
+    table = pa.ipc.open_stream(data).read_all()
+    assert table.schema.field("q1").type == pa.int8()
+    assert table.slice(0, 1).to_pylist() == [{"person_id": 1, "name": "N/A", "q1": 1, "q2": 2, "q3": None}]
@@ -0,0 +1,136 @@
+import asyncio
+import concurrent.futures
+import csv
+import functools
+import gzip
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import export_jobs
+import submissions
+from export_jobs import ExportJobs, data_fingerprint, read_record, run_job, write_record
+
+
+def add_students(database, respondents=30):
+    student = database.catalog.for_stakeholder("STUDENT")
+    answers = [(q.id, "BMS" if q.facet == "stream" else "4") for q in student]
+
+    async def scenario(Session):
+        async with Session() as db:
+            session_id = await submissions.get_session_id(db)
+            stakeholder_id = await submissions.get_stakeholder_id(db, "STUDENT")
+            for _ in range(respondents):
+                await submissions.add_submission(db, session_id, stakeholder_id, answers)
+            await db.commit()
+            return stakeholder_id
+
+    return database.run(scenario), len(answers)
+
+
+def job_record(job_id, **fields):
+    job = {
+        "id": job_id, "key": "k", "kind": "all", "stakeholder_id": None,
+        "stakeholder_type": None, "stream": None, "compress": False,
+        "status": export_jobs.QUEUED, "respondents": 0, "total": 0,
+        "file": job_id + ".csv", "filename": "all.csv", "size": None, "error": None,
+        "created_at": time.time(), "started_at": None, "finished_at": None,
+        "host": socket.gethostname(), "owner_pid": os.getpid()
+    }
+    job.update(fields)
+    return job
+
+
+def test_run_job_writes_long_and_pivoted_files(tmp_path, database, monkeypatch):
+    monkeypatch.setattr(export_jobs, "PROGRESS_EVERY", 10)
+    stakeholder_id, per_person = add_students(database)
+    catalog, url = database.catalog, database.url
+    missing = f"sqlite:///{tmp_path / 'gone' / 'replica.db'}"
+
+    write_record(str(tmp_path), job_record("a" * 32))
+    run_job(str(tmp_path), "a" * 32, [missing, url], catalog)   # falls back to the primary
+    job = read_record(str(tmp_path), "a" * 32)
+    assert job["status"] == export_jobs.DONE and job["respondents"] == 30
+    with open(tmp_path / job["file"], newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["Stakeholder", "Person ID", "Name", "Question", "Answer"]
+    assert len(rows) == 1 + 30 * per_person
+
+    write_record(str(tmp_path), job_record(
+        "b" * 32, kind="stakeholder", stakeholder_id=stakeholder_id,
+        stakeholder_type="STUDENT", stream="BMS", compress=True, file="b" * 32 + ".csv.gz"
+    ))
+    run_job(str(tmp_path), "b" * 32, [url], catalog)
+    job = read_record(str(tmp_path), "b" * 32)
+    assert job["status"] == export_jobs.DONE
+    with gzip.open(tmp_path / job["file"], "rt", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == catalog.layout("STUDENT").csv_header
+    assert len(rows) == 31
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_reuse_interrupted_jobs_and_retention(tmp_path):
+    jobs = ExportJobs(str(tmp_path), retention_hours=1)
+
+    finished = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                              capture_output=True, text=True)
+    dead_pid = int(finished.stdout)
+
+    write_record(str(tmp_path), job_record("c" * 32, key="same", status=export_jobs.DONE))
+    (tmp_path / ("c" * 32 + ".csv")).write_text("x\n")
+    write_record(str(tmp_path), job_record("d" * 32, key="other", owner_pid=dead_pid))
+
+    assert jobs.find("same")["id"] == "c" * 32
+    assert jobs.get("d" * 32)["status"] == export_jobs.FAILED   # its worker is gone
+    assert jobs.find("other") is None
+    assert jobs.get("../" + "c" * 29) is None
+
+    old = time.time() - 2 * 3600
+    for name in os.listdir(tmp_path):
+        if name.startswith("c"):
+            os.utime(tmp_path / name, (old, old))
+    assert jobs.purge() == 2
+    assert jobs.find("same") is None
+    assert [j["id"] for j in jobs.all()] == ["d" * 32]
+
+
+def test_fingerprint_changes_with_every_edit(database):
+    stakeholder_id, _ = add_students(database, respondents=1)
+    name = next(q for q in database.catalog.for_stakeholder("STUDENT") if q.category == "DEMOGRAPHIC")
+
+    async def scenario(Session):
+        async with Session() as db:
+            fingerprints = [await data_fingerprint(db)]
+            # Two edits within the same second of updated_at
+            for value in ("Alice", "Bob"):
+                await submissions.apply_demographic_edits(
+                    db, database.catalog, [{"person_id": 1, "question_id": name.id, "value": value}]
+                )
+                await db.commit()
+                fingerprints.append(await data_fingerprint(db))
+            return fingerprints
+
+    fingerprints = database.run(scenario)
+    assert len(set(fingerprints)) == 3
+
+
+def test_finished_jobs_are_recorded_on_the_event_loop(tmp_path):
+    jobs = ExportJobs(str(tmp_path))
+    threads = []
+    jobs._finished = lambda job_id, future: threads.append(threading.get_ident())
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        with concurrent.futures.ThreadPoolExecutor(1) as pool:
+            future = pool.submit(time.sleep, 0.05)
+            future.add_done_callback(functools.partial(jobs._done, loop, "e" * 32))
+            await asyncio.wrap_future(future)
+        await asyncio.sleep(0)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+    assert threads == [loop_thread]
@@ -0,0 +1,127 @@
+import asyncio
+import tracemalloc
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import insert
+import exports
+import feedback_sessions
+import models
+import pivot
+import question_catalog
+import replica
+from question_catalog import QuestionCatalog
+from routes import admin
+
+Row = namedtuple("Row", "stakeholder person_id name question_id answer_text")
+
+CATALOG = QuestionCatalog([
+    (qid, f"[STUDENT][SYLLABUS] Question {qid}", "STUDENT", "SYLLABUS") for qid in range(1, 11)
+])
+
+RESPONDENTS = 8_000
+PEAK_CEILING_MB = 4
+
+
+async def fake_cursor(count, questions=10):
+    # Stand-in for exports.stream_changes: rows ordered by person, then question
+    for i in range(count):
+        qid = i % questions + 1
+        yield Row("STUDENT", i // questions + 1, "N/A", qid, str(qid % 5 + 1))
+
+
+async def fake_answers(count, questions=10):
+    # Stand-in for the per-stakeholder cursor: (person_id, name, question_id, answer_text)
+    async for r in fake_cursor(count, questions):
+        yield r.person_id, r.name, r.question_id, r.answer_text
+
+
+async def drain(chunks):
+    size = lines = 0
+    async for chunk in chunks:
+        assert len(chunk) <= exports.CHUNK_BYTES * 2
+        size += len(chunk)
+        lines += chunk.count(b"\n")
+    return size, lines
+
+
+def seed_answers(database, respondents):
+    # Straight into the tables; the submit path is not what is measured
+    student = database.catalog.for_stakeholder("STUDENT")
+    with database.engine.begin() as conn:
+        conn.execute(insert(models.Stakeholder), [{"stakeholder_id": 1, "stakeholder_type": "STUDENT"}])
+        conn.execute(insert(models.FeedbackSession), [{"session_id": 1, "session_name": "2026"}])
+        conn.execute(insert(models.StakeholderPersonalInfo), [
+            {"person_id": pid, "session_id": 1, "stakeholder_id": 1, "name": "N/A"}
+            for pid in range(1, respondents + 1)
+        ])
+        conn.execute(insert(models.FeedbackAnswer), [
+            {"person_id": pid, "question_id": q.id, "answer_text": "4"}
+            for pid in range(1, respondents + 1) for q in student
+        ])
+    return len(student)
+
+
+def test_export_all_keeps_memory_flat(database, monkeypatch):
+    # The real /admin/export/all path (replica session, yield_per cursor,
+    # CSV chunks) drained without buffering; tracemalloc's peak covers only
+    # this export, unlike the process-wide ru_maxrss high-water mark
+    per_person = seed_answers(database, RESPONDENTS)
+
+    async def export(Session):
+        monkeypatch.setattr(replica, "router", replica.ReadRouter(None, primary=Session))
+        async with Session() as db:
+            await question_catalog.load(db)
+            await feedback_sessions.load(db)
+
+        tracemalloc.start()
+        try:
+            response = await admin.export_all_csv(since=None, session_id=None, _=None)
+            size, lines = await drain(response.body_iterator)
+            return size, lines, tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        finally:
+            tracemalloc.stop()
+
+    size, lines, peak_mb = database.run(export)
+
+    assert lines == 1 + RESPONDENTS * per_person
+    assert size > PEAK_CEILING_MB * 1024 * 1024   # the file itself is bigger than the ceiling
+    assert peak_mb < PEAK_CEILING_MB
+
+
+def test_pivot_rows_streams_wide_rows_in_chunks():
+    layout = CATALOG.layout("STUDENT")
+
+    async def collect():
+        return [row async for row in exports.pivot_rows(fake_answers(25_000), layout)]
+
+    rows = asyncio.run(collect())
+    assert len(rows) == 2_500
+    assert rows[0] == [1, "N/A"] + [str(qid % 5 + 1) for qid in range(1, 11)]
+    assert rows[-1][0] == 2_500
+
+
+def test_delta_export_returns_respondents_changed_after_watermark(empty_database, monkeypatch):
+    changed = [datetime(2026, 1, 1, 10, 0, second) for second in (0, 10, 20)]
+    with empty_database.engine.begin() as conn:
+        conn.execute(insert(models.Stakeholder), [{"stakeholder_id": 1, "stakeholder_type": "STUDENT"}])
+        conn.execute(insert(models.FeedbackSession), [{"session_id": 1, "session_name": "2026"}])
+        conn.execute(insert(models.SyllabusQuestion), [
+            {"id": 1, "text": "[STUDENT][SYLLABUS] Question 1", "stakeholder_type": "STUDENT", "category": "SYLLABUS"}
+        ])
+        conn.execute(insert(models.StakeholderPersonalInfo), [
+            {"person_id": i + 1, "session_id": 1, "stakeholder_id": 1, "name": "N/A", "updated_at": at}
+            for i, at in enumerate(changed)
+        ])
+        conn.execute(insert(models.FeedbackAnswer), [
+            {"person_id": i + 1, "question_id": 1, "answer_text": "4"} for i in range(3)
+        ])
+
+    async def export(Session, since):
+        monkeypatch.setattr(replica, "router", replica.ReadRouter(None, primary=Session))
+        changes = exports.stream_changes(exports.all_answers_query, since)
+        watermark = await anext(changes)
+        return watermark, [r.person_id async for r in changes]
+
+    assert empty_database.run(export, None) == (changed[2], [1, 2, 3])
+    assert empty_database.run(export, changed[0]) == (changed[2], [2, 3])
+    assert empty_database.run(export, changed[2]) == (changed[2], [])
@@ -0,0 +1,26 @@
+import facets
+
+QUESTIONS = [
+    (1, "DEMOGRAPHIC", "Student Name"),
+    (2, "DEMOGRAPHIC", "Program / Course"),
+    (3, "DEMOGRAPHIC", "Class"),
+    (4, "DEMOGRAPHIC", "Academic Year"),
+    (5, "DEMOGRAPHIC", "Wards Stream"),
+    (6, "SYLLABUS", "The course outcomes are clear"),
+]
+
+
+def test_question_facets_maps_demographic_labels_only():
+    assert facets.question_facets(QUESTIONS) == {
+        2: "stream", 3: "class_name", 4: "academic_year", 5: "stream"
+    }
+
+
+def test_facet_values_take_lowest_answered_question():
+    by_qid = facets.question_facets(QUESTIONS)
+
+    assert facets.facet_values([(5, "BMS"), (2, "BSc IT"), (3, "FY")], by_qid) == {
+        "stream": "BSc IT", "class_name": "FY"
+    }
+    assert facets.facet_values([(5, "BMS"), (6, "4")], by_qid) == {"stream": "BMS"}
+    assert facets.facet_values([(1, "Asha")], by_qid) == {}
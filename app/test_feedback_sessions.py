@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+import exports
+import feedback_sessions
+import models
+import responses
+import submissions
+import trends
+from feedback_sessions import SessionDirectory
+
+
+def test_directory_routes_forms_to_open_sessions():
+    directory = SessionDirectory(
+        [
+            (1, "2024-25", datetime(2024, 6, 1), datetime(2025, 5, 1)),
+            (2, "2025-26", datetime(2025, 6, 1), None),
+            (3, "Alumni 2025", datetime(2025, 7, 1), None),
+        ],
+        [("alumnifeedback", 3), ("parentfeedback", 1)]
+    )
+    assert directory.for_form("alumnifeedback").id == 3
+    assert directory.for_form("studentfeedback").id == 3      # newest open session
+    assert directory.for_form("parentfeedback").id == 3       # its choice is closed
+
+    closed = SessionDirectory([(1, "2024-25", datetime(2024, 6, 1), datetime(2025, 5, 1))], [])
+    assert closed.for_form("studentfeedback") is None and not closed.accepting("studentfeedback")
+    assert SessionDirectory([], []).accepting("studentfeedback")   # default session on first submit
+
+
+def test_sessions_scope_queries_and_feed_trends(database):
+    catalog = database.catalog
+    student = catalog.for_stakeholder("STUDENT")
+    first = catalog.by_category("STUDENT", "SYLLABUS")[0]
+
+    def answers(rating):
+        return [(q.id, "BMS" if q.facet == "stream" else str(rating)) for q in student]
+
+    async def scenario(Session):
+        async with Session() as db:
+            stakeholder_id = await submissions.get_stakeholder_id(db, "STUDENT")
+
+            # Fresh database: the default session is created on first use
+            old = await feedback_sessions.session_for_form(db, "studentfeedback")
+            for rating in (2, 3, 4):
+                await submissions.add_submission(db, old, stakeholder_id, answers(rating))
+            await db.commit()
+            await feedback_sessions.close(db, old)
+            with pytest.raises(feedback_sessions.SessionClosedError):
+                await feedback_sessions.session_for_form(db, "studentfeedback")
+            # A worker whose directory still shows it open is refused at write time
+            with pytest.raises(feedback_sessions.SessionClosedError):
+                await submissions.add_submission(db, old, stakeholder_id, answers(1))
+            await db.rollback()
+
+            new = await feedback_sessions.create(db, "2026-27")
+            with pytest.raises(feedback_sessions.SessionExistsError):
+                await feedback_sessions.create(db, "2026-27")
+            await feedback_sessions.activate(db, new, ["studentfeedback"])
+            assert await feedback_sessions.session_for_form(db, "studentfeedback") == new
+            for _ in range(5):
+                await submissions.add_submission(db, new, stakeholder_id, answers(5))
+            await db.commit()
+
+            new_people = (await db.execute(
+                exports.all_answers_query(session_id=new)
+            )).all()
+            page = await responses.load_page(
+                db, stakeholder_id, catalog.layout("STUDENT"), session_id=old
+            )
+            report = await trends.compare(
+                db, await feedback_sessions.current(), catalog, stakeholder_id
+            )
+            snapshots = (await db.execute(select(models.SessionSnapshot))).scalars().all()
+            return old, new, new_people, page, report, snapshots
+
+    old, new, new_people, page, report, snapshots = database.run(scenario)
+
+    assert len({r.person_id for r in new_people}) == 5
+    assert len(page["rows"]) == 3
+
+    # Only the closed session is frozen; the open one is read live
+    assert {s.session_id for s in snapshots} == {old}
+    assert [(s["session_id"], s["open"], s["respondents"]) for s in report["sessions"]] == [
+        (old, False, 3), (new, True, 5)
+    ]
+    q1 = next(q for q in report["questions"] if q["question_id"] == first.id)
+    assert [(p["n"], p["mean"]) for p in q1["sessions"]] == [(3, 3.0), (5, 5.0)]
+    assert q1["change"] == {
+        "from_session": old, "to_session": new, "difference": 2.0, "significant": True
+    }
+
+
+def test_close_waits_for_submissions_in_flight(database):
+    answers = [(q.id, "BMS" if q.facet == "stream" else "4") for q in database.catalog.for_stakeholder("STUDENT")]
+
+    async def scenario(Session):
+        async with Session() as submit, Session() as admin:
+            stakeholder_id = await submissions.get_stakeholder_id(submit, "STUDENT")
+            session_id = await feedback_sessions.session_for_form(submit, "studentfeedback")
+            await submissions.add_submission(submit, session_id, stakeholder_id, answers)
+
+            # The close blocks on the open insert and snapshots it once committed
+            closing = asyncio.create_task(feedback_sessions.close(admin, session_id))
+            await asyncio.sleep(0.3)
+            blocked = not closing.done()
+            await submit.commit()
+            await closing
+            counts = (await admin.execute(select(models.SessionSnapshot.response_count))).scalars().all()
+            return blocked, counts
+
+    blocked, counts = database.run(scenario, pragmas=True)
+
+    assert blocked
+    assert counts and set(counts) == {1}
@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+from fastapi.templating import Jinja2Templates
+import form_pages
+from question_catalog import QuestionCatalog
+
+templates = Jinja2Templates(directory="app/templates")
+
+
+def catalog(text="Outcomes are clear"):
+    return QuestionCatalog([
+        (1, "Student Name", "STUDENT", "DEMOGRAPHIC"),
+        (2, text, "STUDENT", "SYLLABUS"),
+    ])
+
+
+def request(if_none_match=None):
+    headers = {"if-none-match": if_none_match} if if_none_match else {}
+    return SimpleNamespace(headers=headers)
+
+
+def test_rendered_once_per_catalog_version():
+    form_pages.clear()
+    first = form_pages.get_page(templates, "studentfeedback", catalog())
+
+    assert form_pages.get_page(templates, "studentfeedback", catalog()) is first
+    assert b"Outcomes are clear" in first.body
+
+    changed = form_pages.get_page(templates, "studentfeedback", catalog("Content is current"))
+    assert changed.etag != first.etag
+    assert b"Content is current" in changed.body
+
+
+def test_revalidation_returns_304_with_validators():
+    form_pages.clear()
+    page = form_pages.get_page(templates, "studentfeedback", catalog())
+
+    full = form_pages.page_response(request(), page)
+    assert full.status_code == 200
+    assert full.headers["etag"] == page.etag
+    assert full.headers["cache-control"] == "no-cache"   # closed forms must not be reused
+
+    for header in (page.etag, f'"stale", W/{page.etag}', "*"):
+        not_modified = form_pages.page_response(request(header), page)
+        assert not_modified.status_code == 304
+        assert not_modified.body == b""
+        assert not_modified.headers["etag"] == page.etag
+
+    assert form_pages.page_response(request('"stale"'), page).status_code == 200
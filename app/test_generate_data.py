@@ -0,0 +1,38 @@
+import random
+
+from sqlalchemy import create_engine, func, select
+
+import models
+from generate_data import COURSES, CLASSES, demographic_value, parse_ratings
+from seed_questions import load_question_set, seed_questions
+
+
+def test_question_set_matches_setup_sql(tmp_path):
+    questions = load_question_set()
+    assert len(questions) == 69
+    assert {q["stakeholder_type"] for q in questions} == {
+        "STUDENT", "PARENT", "ALUMNI", "TEACHER", "OUTSIDE_TEACHER", "EMPLOYER"
+    }
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'q.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        assert seed_questions(conn) == 69
+        assert seed_questions(conn) == 0
+        assert conn.scalar(select(func.count()).select_from(models.SyllabusQuestion)) == 69
+
+
+def test_demographic_values_use_form_options():
+    rng = random.Random(0)
+    person = {"id": 7, "first": "Riya", "last": "Shah"}
+
+    assert demographic_value("Program / Course", rng, person) in COURSES
+    assert demographic_value("Wards Stream", rng, person) in COURSES
+    assert demographic_value("Class", rng, person) in CLASSES
+    assert demographic_value("Student Name", rng, person) == "Riya Shah"
+
+
+def test_rating_distributions():
+    ratings = parse_ratings(["uniform", "PARENT=1,1,2,4,6"])
+    assert ratings[None] == (1, 1, 1, 1, 1)
+    assert ratings["PARENT"] == (1.0, 1.0, 2.0, 4.0, 6.0)
@@ -0,0 +1,100 @@
+import asyncio
+import pytest
+from ingest import IngestQueue, QueueFullError
+
+
+class RecordingWriter:
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.fail_on = fail_on
+        self.gate = None
+
+    async def __call__(self, items):
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail_on and any(t == self.fail_on for t, _, _ in items):
+            raise RuntimeError("bad submission")
+        self.batches.append(list(items))
+
+
+def test_flushes_every_n_submissions():
+    async def scenario():
+        writer = RecordingWriter()
+        queue = IngestQueue(writer, batch_size=3, flush_ms=10_000, durability="enqueue")
+        queue.start()
+        for i in range(7):
+            await queue.submit("STUDENT", [(1, str(i))])
+        await queue.stop()
+        return writer.batches
+
+    batches = asyncio.run(scenario())
+    assert [len(b) for b in batches] == [3, 3, 1]
+
+
+def test_flushes_after_interval_and_acks_after_commit():
+    async def scenario():
+        writer = RecordingWriter()
+        queue = IngestQueue(writer, batch_size=100, flush_ms=20, durability="flush")
+        queue.start()
+        await asyncio.wait_for(queue.submit("PARENT", [(2, "5")], 7), timeout=2)
+        written = list(writer.batches)
+        await queue.stop()
+        return written
+
+    assert asyncio.run(scenario()) == [[("PARENT", [(2, "5")], 7)]]
+
+
+def test_backpressure_when_queue_is_full():
+    async def scenario():
+        writer = RecordingWriter()
+        writer.gate = asyncio.Event()
+        queue = IngestQueue(
+            writer, batch_size=1, flush_ms=1, queue_size=1,
+            durability="enqueue", enqueue_timeout_ms=50
+        )
+        queue.start()
+        await queue.submit("STUDENT", [])       # picked up, writer blocked
+        await asyncio.sleep(0.01)
+        await queue.submit("STUDENT", [])       # fills the queue
+        with pytest.raises(QueueFullError):
+            await queue.submit("STUDENT", [])
+        writer.gate.set()
+        await queue.stop()
+        return writer.batches
+
+    assert len(asyncio.run(scenario())) == 2
+
+
+def test_bad_submission_does_not_sink_batch():
+    async def scenario():
+        writer = RecordingWriter(fail_on="BAD")
+        queue = IngestQueue(writer, batch_size=10, flush_ms=20, durability="flush")
+        queue.start()
+        results = await asyncio.gather(
+            queue.submit("STUDENT", []),
+            queue.submit("BAD", []),
+            queue.submit("ALUMNI", []),
+            return_exceptions=True
+        )
+        await queue.stop()
+        return results, writer.batches
+
+    results, batches = asyncio.run(scenario())
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], RuntimeError)
+    assert sorted(b[0][0] for b in batches) == ["ALUMNI", "STUDENT"]
+
+
+def test_stop_drains_queue_and_rejects_new_submissions():
+    async def scenario():
+        writer = RecordingWriter()
+        queue = IngestQueue(writer, batch_size=2, flush_ms=10_000, durability="enqueue")
+        queue.start()
+        for _ in range(5):
+            await queue.submit("TEACHER", [])
+        await queue.stop()
+        with pytest.raises(QueueFullError):
+            await queue.submit("TEACHER", [])
+        return writer.batches
+
+    assert sum(len(b) for b in asyncio.run(scenario())) == 5
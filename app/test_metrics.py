@@ -0,0 +1,60 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+import metrics
+from database import TimedQueuePool, instrument
+
+
+def test_histogram_buckets_are_cumulative():
+    h = metrics.Histogram("t_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    h.observe(0.05, "/a")
+    h.observe(0.5, "/a")
+    h.observe(5.0, "/a")
+
+    lines = list(h.samples())
+    assert lines[:3] == [
+        't_seconds_bucket{route="/a",le="0.1"} 1',
+        't_seconds_bucket{route="/a",le="1.0"} 2',
+        't_seconds_bucket{route="/a",le="+Inf"} 3',
+    ]
+    assert lines[4] == 't_seconds_count{route="/a"} 3'
+
+
+def test_middleware_counts_queries_per_route(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'm.db'}", poolclass=TimedQueuePool)
+    instrument(engine, "test")
+
+    app = FastAPI()
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {"id": item_id}
+
+    client = TestClient(app)
+    waits = metrics.POOL_WAIT_SECONDS.count("test")
+    client.get("/items/1")
+    client.get("/items/2")
+
+    # Labelled by route template, not by URL
+    assert metrics.REQUESTS.value("GET", "/items/{item_id}", "200") == 2
+    assert metrics.REQUEST_QUERIES.count("GET", "/items/{item_id}") == 2
+    assert metrics.QUERIES.value("test") == 4
+    assert metrics.POOL_WAIT_SECONDS.count("test") == waits + 2
+    assert 'db_pool_connections{engine="test",state="in_use"} 0' in metrics.render()
+
+
+def test_quantile_reports_bucket_upper_bound():
+    h = metrics.Histogram("w_seconds", "Test.", ("engine",), buckets=(0.001, 0.01, 0.1))
+    for _ in range(95):
+        h.observe(0.0005, "e")
+    for _ in range(5):
+        h.observe(0.05, "e")
+
+    assert h.quantile(0.5, "e") == 0.001
+    assert h.quantile(0.99, "e") == 0.1
+    assert h.max("e") == 0.05
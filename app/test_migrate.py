@@ -0,0 +1,53 @@
+import threading
+
+from sqlalchemy import create_engine, delete, select
+
+import migrate
+import models
+from database import sqlite_pragmas
+
+
+def sqlite_engine(path):
+    engine = create_engine(f"sqlite:///{path}")
+    sqlite_pragmas(engine)
+    return engine
+
+
+def applied_versions(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(models.SchemaVersion.version)).scalars().all()
+
+
+def test_fresh_database_is_stamped_at_head(tmp_path):
+    engine = sqlite_engine(tmp_path / "app.db")
+
+    assert migrate.setup(engine) == []        # nothing re-run on first start
+    assert applied_versions(engine) == [v for v, _ in migrate.load_migrations()]
+    engine.dispose()
+
+
+def test_workers_starting_together_migrate_once(tmp_path):
+    engine = sqlite_engine(tmp_path / "app.db")
+    migrate.setup(engine)
+    with engine.begin() as conn:              # an existing, unversioned database
+        conn.execute(delete(models.SchemaVersion))
+
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(migrate.setup(engine))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    head = [v for v, _ in migrate.load_migrations()]
+    assert errors == []
+    assert sorted(results, key=len) == [[], [], [], head]
+    assert applied_versions(engine) == head
+    engine.dispose()
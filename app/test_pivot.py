@@ -0,0 +1,41 @@
+from collections import namedtuple
+import pivot
+
+Question = namedtuple("Question", "id category text")
+
+DEMOGRAPHIC = [
+    Question(1, "DEMOGRAPHIC", "[STUDENT][DEMOGRAPHIC] Student Name"),
+    Question(2, "DEMOGRAPHIC", "[STUDENT][DEMOGRAPHIC] Program / Course"),
+    Question(3, "DEMOGRAPHIC", "[STUDENT][DEMOGRAPHIC] Stream"),
+]
+SYLLABUS = [
+    Question(10, "SYLLABUS", "[STUDENT][SYLLABUS] Outcomes are clear"),
+    Question(11, "SYLLABUS", "[STUDENT][SYLLABUS] Content is current"),
+]
+
+
+def layout():
+    return pivot.Layout(DEMOGRAPHIC, SYLLABUS)
+
+
+def test_layout_labels_keys_and_numbers():
+    lay = layout()
+    assert lay.csv_header == ["Person ID", "Name", "Student Name", "Program / Course", "Stream", "q1", "q2"]
+    assert lay.keys == ["student_name", "program___course", "stream", "q1", "q2"]
+
+
+def test_build_is_column_oriented_and_skips_unknown_questions():
+    answers = [
+        (1, "A", 1, "Asha"), (1, "A", 2, "BMS"), (1, "A", 10, "4"), (1, "A", 99, "ignored"),
+        (2, "B", 11, "5"),
+    ]
+    table = pivot.build(answers, layout())
+
+    assert table.person_ids == [1, 2]
+    assert table.columns[0] == ["Asha", None]
+    assert table.columns[4] == [None, "5"]
+    assert table.records() == [
+        {"person_id": 1, "name": "A", "student_name": "Asha", "program___course": "BMS", "q1": "4"},
+        {"person_id": 2, "name": "B", "q2": "5"},
+    ]
+    assert list(table.rows()) == [[1, "A", "Asha", "BMS", "", "4", ""], [2, "B", "", "", "", "", "5"]]
@@ -0,0 +1,39 @@
+from sqlalchemy import create_engine, text
+
+from database import TimedQueuePool, ping_when_idle
+
+
+def test_idle_connections_are_pinged_and_replaced_when_dead(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'p.db'}", poolclass=TimedQueuePool, pool_size=1)
+    ping_when_idle(engine, idle_seconds=0)
+
+    pings = []
+
+    def dead(dbapi_connection):
+        pings.append(dbapi_connection)
+        raise OSError("server has gone away")
+
+    with engine.connect() as conn:     # fresh connection: no ping
+        first = conn.connection.dbapi_connection
+    assert pings == []
+
+    monkeypatch.setattr(engine.dialect, "do_ping", dead)
+    with engine.connect() as conn:     # idle one fails its ping, a new one is opened
+        conn.execute(text("SELECT 1"))
+        second = conn.connection.dbapi_connection
+
+    assert pings == [first]
+    assert second is not first
+
+
+def test_recently_returned_connections_skip_the_ping(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'p.db'}", poolclass=TimedQueuePool, pool_size=1)
+    ping_when_idle(engine, idle_seconds=60)
+
+    pings = []
+    monkeypatch.setattr(engine.dialect, "do_ping", pings.append)
+    for _ in range(3):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    assert pings == []
@@ -0,0 +1,57 @@
+import asyncio
+
+import question_catalog
+from question_catalog import QuestionCatalog
+
+ROWS = [
+    (12, "Program / Course", "STUDENT", "DEMOGRAPHIC"),
+    (11, "[STUDENT][DEMOGRAPHIC] Student Name", "STUDENT", "DEMOGRAPHIC"),
+    (20, "Outcomes are clear", "STUDENT", "SYLLABUS"),
+    (21, "Content is current", "STUDENT", "SYLLABUS"),
+    (22, "Any suggestions?", "STUDENT", "SUGGESTION"),
+    (30, "Course", "ALUMNI", "DEMOGRAPHIC"),
+    (31, "Placement support", "ALUMNI", "SYLLABUS"),
+]
+
+
+def test_groups_and_precomputes_per_stakeholder():
+    catalog = QuestionCatalog(ROWS)
+
+    assert [q.id for q in catalog.for_stakeholder("STUDENT")] == [11, 12, 20, 21, 22]
+    assert [q.number for q in catalog.by_category("STUDENT", "SYLLABUS")] == ["q1", "q2"]
+    assert catalog.by_id[31].number == "q1"          # numbering restarts per stakeholder
+    assert catalog.by_id[11].label == "Student Name"
+    assert catalog.by_id[12].key == "program___course"
+    assert catalog.facets == {12: "stream", 30: "stream"}
+    assert catalog.for_stakeholder("PARENT") == []
+
+
+def test_layout_matches_pivot_columns():
+    layout = QuestionCatalog(ROWS).layout("STUDENT")
+
+    assert layout.csv_header == ["Person ID", "Name", "Student Name", "Program / Course", "q1", "q2"]
+    assert layout.question_ids == [11, 12, 20, 21]
+
+
+def test_version_tracks_content_not_row_order():
+    a = QuestionCatalog(ROWS)
+    b = QuestionCatalog(list(reversed(ROWS)))
+    c = QuestionCatalog(ROWS[:-1] + [(31, "Placement support (edited)", "ALUMNI", "SYLLABUS")])
+
+    assert a.version == b.version
+    assert a.version != c.version
+    assert not a.has_all([11, 99])
+
+
+def test_current_never_reloads_once_loaded(monkeypatch):
+    # Unknown ids from a submission must not force a reload; the route
+    # rejects them against the loaded catalog instead
+    async def load(db=None):
+        raise AssertionError("reloaded")
+
+    loaded = QuestionCatalog(ROWS)
+    monkeypatch.setattr(question_catalog, "_catalog", loaded)
+    monkeypatch.setattr(question_catalog, "load", load)
+
+    catalog = asyncio.run(question_catalog.current())
+    assert catalog is loaded and not catalog.has_all([99])
@@ -0,0 +1,58 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from replica import ReadRouter
+
+
+def database_of(db) -> str:
+    return db.get_bind().url.database
+
+
+def test_routes_reads_to_replica_until_it_fails(tmp_path):
+    primary_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    primary = async_sessionmaker(bind=primary_engine)
+
+    async def scenario():
+        used = []
+        router = ReadRouter(f"sqlite:///{tmp_path / 'replica.db'}", primary=primary, max_lag=5)
+        async with router.session() as db:
+            used.append(database_of(db))
+
+        # Replica goes away: fall back, then stay on the primary for a while
+        # without trying it on every request
+        missing = ReadRouter(f"sqlite:///{tmp_path / 'gone' / 'replica.db'}", primary=primary)
+        for _ in range(2):
+            async with missing.session() as db:
+                used.append(database_of(db))
+
+        await router.dispose()
+        await missing.dispose()
+        await primary_engine.dispose()
+        return used, missing
+
+    used, missing = asyncio.run(scenario())
+
+    assert used[0].endswith("replica.db") and "gone" not in used[0]
+    assert all(u.endswith("primary.db") for u in used[1:])
+    assert missing.primary_reason() == "replica_down"
+    assert missing.last_error is not None
+
+
+def test_recent_write_reads_from_primary():
+    router = ReadRouter(None, max_lag=5)
+    assert router.primary_reason() == "no_replica"
+
+    router.engine = object()   # configured, reachable replica
+    assert router.primary_reason() is None
+
+    router.mark_written()
+    assert router.primary_reason() == "recent_write"
+
+    router.max_lag = 0
+    assert router.primary_reason() is None
+
+    router.lag = 12.0
+    router.max_lag = 10
+    router.written_at = float("-inf")
+    assert router.primary_reason() == "replica_lag"
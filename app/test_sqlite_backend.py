@@ -0,0 +1,37 @@
+from sqlalchemy import create_engine, func, select, text
+
+import models
+import submissions
+from database import TimedAsyncQueuePool, TimedQueuePool, sqlite_pragmas
+
+
+def test_pragmas_applied_to_every_connection(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'f.db'}", poolclass=TimedQueuePool)
+    sqlite_pragmas(engine)
+
+    with engine.connect() as conn:
+        assert conn.scalar(text("PRAGMA journal_mode")) == "wal"
+        assert conn.scalar(text("PRAGMA foreign_keys")) == 1
+        assert conn.scalar(text("PRAGMA synchronous")) == 1   # NORMAL
+
+
+def test_submission_write_path_with_foreign_keys_on(database):
+    answers = [
+        (q.id, "BMS" if q.facet == "stream" else "4") for q in database.catalog.for_stakeholder("STUDENT")
+    ]
+
+    async def scenario(Session):
+        async with Session() as db:
+            session_id = await submissions.get_session_id(db)
+            stakeholder_id = await submissions.get_stakeholder_id(db, "STUDENT")
+            await submissions.add_submission(db, session_id, stakeholder_id, answers)
+            await submissions.add_submission(db, session_id, stakeholder_id, answers)
+            await db.commit()
+
+    database.run(scenario, pragmas=True, poolclass=TimedAsyncQueuePool)
+
+    with database.engine.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(models.FeedbackAnswer)) == 2 * len(answers)
+        assert conn.scalar(select(func.sum(models.RespondentCount.respondents))) == 2
+        assert conn.scalar(select(func.max(models.QuestionStats.response_count))) == 2
+        assert conn.execute(select(models.RespondentFacet.stream)).scalars().all() == ["BMS", "BMS"]
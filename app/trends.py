@@ -0,0 +1,171 @@
+import math
+import numpy as np
+from sqlalchemy import delete, insert, select
+from database import engine
+import models
+import analytics
+from stats import RATINGS
+
+QS, SNAP = models.QuestionStats, models.SessionSnapshot
+
+HISTOGRAM = [getattr(QS, f"rating_{r}") for r in RATINGS]
+
+
+# -----------------------------
+# SNAPSHOTS
+# A closed session's per-question results are computed once from its
+# question_stats counters and kept in session_snapshots, so comparing years
+# reads a handful of rows per session instead of aggregating anything
+# -----------------------------
+def counters_query(session_ids, stakeholder_id: int | None = None):
+    query = select(QS.session_id, QS.stakeholder_id, QS.question_id, *HISTOGRAM).where(
+        QS.session_id.in_(session_ids)
+    )
+    if stakeholder_id is not None:
+        query = query.where(QS.stakeholder_id == stakeholder_id)
+    return query
+
+
+def snapshot_rows(counters) -> list[dict]:
+    # counters: counters_query() rows -> session_snapshots rows
+    counters = list(counters)
+    if not counters:
+        return []
+
+    stats = analytics.describe(np.array([r[3:] for r in counters], dtype=np.int64))
+
+    def value(array, i):
+        v = float(array[i])
+        return None if math.isnan(v) else v
+
+    return [
+        {
+            "session_id": r[0],
+            "stakeholder_id": r[1],
+            "question_id": r[2],
+            "response_count": int(stats["n"][i]),
+            "mean_score": value(stats["mean"], i),
+            "std_score": value(stats["std"], i),
+            "top2_box": value(stats["top2_box"], i)
+        }
+        for i, r in enumerate(counters)
+        if stats["n"][i]
+    ]
+
+
+def take_snapshot(conn, session_id: int):
+    # Replaces the session's snapshot; runs inside the caller's transaction
+    conn.execute(delete(SNAP).where(SNAP.session_id == session_id))
+    rows = snapshot_rows(conn.execute(counters_query([session_id])).all())
+    if rows:
+        conn.execute(insert(SNAP.__table__), rows)
+
+
+def rebuild(conn):
+    # Re-take every closed session's snapshot (after repairing or importing
+    # data; writes into closed sessions are refused, see submissions.py)
+    closed = conn.execute(
+        select(models.FeedbackSession.session_id)
+        .where(models.FeedbackSession.closed_at.is_not(None))
+    ).scalars().all()
+    for session_id in closed:
+        take_snapshot(conn, session_id)
+    return len(closed)
+
+
+# -----------------------------
+# TREND COMPARISON
+# -----------------------------
+def change(a: dict, b: dict) -> dict:
+    # Difference of two sessions' means with a two-sided 95% test on it
+    # (normal approximation with each session's own variance)
+    difference = b["mean"] - a["mean"]
+    significant = None
+    if a["std"] is not None and b["std"] is not None:
+        spread = math.sqrt(a["std"] ** 2 / a["n"] + b["std"] ** 2 / b["n"])
+        significant = abs(difference) > analytics.Z_95 * spread if spread else difference != 0
+    return {
+        "from_session": a["session_id"],
+        "to_session": b["session_id"],
+        "difference": round(difference, 3),
+        "significant": significant
+    }
+
+
+async def compare(db, directory, catalog, stakeholder_id: int, session_ids=None) -> dict:
+    # Per-question averages of one stakeholder across sessions, oldest first.
+    # Closed sessions come from their snapshots, open ones from the live
+    # question_stats counters through the same computation.
+    sessions = [
+        s for s in directory.sessions
+        if session_ids is None or s.id in session_ids
+    ]
+    closed = [s.id for s in sessions if not s.is_open]
+    still_open = [s.id for s in sessions if s.is_open]
+
+    rows = []
+    if closed:
+        rows += [
+            dict(r._mapping) for r in await db.execute(
+                select(
+                    SNAP.session_id, SNAP.question_id, SNAP.response_count,
+                    SNAP.mean_score, SNAP.std_score, SNAP.top2_box
+                )
+                .where(SNAP.session_id.in_(closed), SNAP.stakeholder_id == stakeholder_id)
+            )
+        ]
+    if still_open:
+        rows += snapshot_rows((await db.execute(counters_query(still_open, stakeholder_id))).all())
+
+    respondents = dict((await db.execute(
+        select(models.RespondentCount.session_id, models.RespondentCount.respondents)
+        .where(
+            models.RespondentCount.stakeholder_id == stakeholder_id,
+            models.RespondentCount.session_id.in_([s.id for s in sessions])
+        )
+    )).tuples().all())
+
+    def number(value):
+        return None if value is None else analytics.number(value)
+
+    points = {}
+    for r in rows:
+        points.setdefault(r["question_id"], {})[r["session_id"]] = {
+            "session_id": r["session_id"],
+            "n": r["response_count"],
+            "mean": number(r["mean_score"]),
+            "std": number(r["std_score"]),
+            "top2_box": number(r["top2_box"])
+        }
+
+    questions = []
+    for qid in sorted(points):
+        question = catalog.by_id.get(qid)
+        series = [points[qid][s.id] for s in sessions if s.id in points[qid]]
+        questions.append({
+            "question_id": qid,
+            "question": question.number if question else None,
+            "label": question.label if question else None,
+            "sessions": series,
+            "change": change(series[-2], series[-1]) if len(series) > 1 else None
+        })
+
+    return {
+        "stakeholder_id": stakeholder_id,
+        "sessions": [
+            {
+                "session_id": s.id,
+                "name": s.name,
+                "open": s.is_open,
+                "respondents": int(respondents.get(s.id) or 0)
+            }
+            for s in sessions
+        ],
+        "questions": questions
+    }
+
+
+if __name__ == "__main__":
+    with engine.begin() as conn:
+        count = rebuild(conn)
+    print(f"Rebuilt session_snapshots for {count} closed session(s).")
@@ -0,0 +1,154 @@
+"""
+Rating analytics: per-question Python statistics vs app/analytics.py.
+
+Generates --ratings synthetic SYLLABUS ratings in memory (no database
+needed) spread over --questions questions and --groups facet values, then
+times the per-question summary (count, mean, std, median, histogram,
+top-2-box, confidence intervals) and the question x facet cross-tab, first
+grouping the rows in Python and using the statistics module, then with the
+vectorized NumPy implementation.
+
+With --db the configured database (.env) is also measured end to end:
+loading every rating into arrays with analytics.load, then analyzing them.
+
+Usage:
+
+    uv run python benchmarks/bench_analytics.py --ratings 1000000 --json analytics.json
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import argparse
+import asyncio
+import json
+import math
+import statistics
+import time
+
+import numpy as np
+
+import analytics
+from analytics import Ratings
+
+
+def make_ratings(count, questions, groups, seed):
+    rng = np.random.default_rng(seed)
+    weights = np.array([0.05, 0.1, 0.25, 0.35, 0.25])
+    return Ratings(
+        rng.integers(1, questions + 1, count, dtype=np.int32),
+        rng.choice(np.arange(1, 6, dtype=np.int8), count, p=weights),
+        rng.integers(0, groups, count, dtype=np.int32),
+        [f"Stream {g}" for g in range(groups)]
+    )
+
+
+# -----------------------------
+# PURE PYTHON BASELINE
+# -----------------------------
+def python_describe(values):
+    n = len(values)
+    mean = statistics.fmean(values)
+    std = statistics.stdev(values) if n > 1 else float("nan")
+    half = analytics.Z_95 * std / math.sqrt(n)
+    top2 = sum(1 for v in values if v >= 4) / n
+    return {
+        "n": n, "mean": mean, "std": std, "median": statistics.median(values),
+        "mean_ci": (mean - half, mean + half),
+        "histogram": [values.count(r) for r in range(1, 6)], "top2_box": top2
+    }
+
+
+def python_summary(question_ids, scores):
+    by_question = {}
+    for qid, score in zip(question_ids, scores):
+        by_question.setdefault(qid, []).append(score)
+    return {qid: python_describe(values) for qid, values in sorted(by_question.items())}
+
+
+def python_crosstab(question_ids, scores, groups):
+    cells = {}
+    for qid, score, group in zip(question_ids, scores, groups):
+        cells.setdefault((qid, group), []).append(score)
+    return {
+        key: (len(v), statistics.fmean(v), sum(1 for x in v if x >= 4) / len(v))
+        for key, v in sorted(cells.items())
+    }
+
+
+def best_of(fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return round(min(runs) * 1000, 1)
+
+
+async def measure_database(repeat):
+    from database import AsyncSessionLocal, async_engine
+    import question_catalog
+
+    load_runs, analyze_runs = [], []
+    try:
+        for _ in range(repeat):
+            async with AsyncSessionLocal() as db:
+                catalog = await question_catalog.current(db)
+                start = time.perf_counter()
+                ratings = await analytics.load(db, by="stream")
+                loaded = time.perf_counter()
+                analytics.summarize(ratings, catalog)
+                analytics.crosstab(ratings)
+                load_runs.append(loaded - start)
+                analyze_runs.append(time.perf_counter() - loaded)
+    finally:
+        await async_engine.dispose()
+    return len(ratings), round(min(load_runs) * 1000, 1), round(min(analyze_runs) * 1000, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rating analytics benchmark")
+    parser.add_argument("--ratings", type=int, default=1_000_000)
+    parser.add_argument("--questions", type=int, default=35)
+    parser.add_argument("--groups", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", action="store_true", help="also load from the configured database")
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    ratings = make_ratings(args.ratings, args.questions, args.groups, args.seed)
+    # The Python baseline gets plain lists, as rows from a cursor would be
+    question_ids = ratings.question_ids.tolist()
+    scores = ratings.scores.tolist()
+    groups = ratings.groups.tolist()
+
+    results = {
+        "summary": {
+            "python_ms": best_of(lambda: python_summary(question_ids, scores), args.repeat),
+            "numpy_ms": best_of(lambda: analytics.summarize(ratings), args.repeat)
+        },
+        "crosstab": {
+            "python_ms": best_of(lambda: python_crosstab(question_ids, scores, groups), args.repeat),
+            "numpy_ms": best_of(lambda: analytics.crosstab(ratings), args.repeat)
+        }
+    }
+
+    print(f"{args.ratings} ratings, {args.questions} questions, {args.groups} groups")
+    for name, r in results.items():
+        speedup = r["python_ms"] / r["numpy_ms"] if r["numpy_ms"] else float("inf")
+        print(f"{name:<10} python {r['python_ms']:>9} ms   numpy {r['numpy_ms']:>8} ms   x{speedup:.0f}")
+
+    if args.db:
+        count, load_ms, analyze_ms = asyncio.run(measure_database(args.repeat))
+        results["database"] = {"ratings": count, "load_ms": load_ms, "analyze_ms": analyze_ms}
+        print(f"database   {count} ratings: load {load_ms} ms, summary + crosstab {analyze_ms} ms")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"ratings": args.ratings, "questions": args.questions,
+                       "groups": args.groups, "repeat": args.repeat, **results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
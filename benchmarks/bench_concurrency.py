@@ -0,0 +1,161 @@
+"""
+Concurrent-request throughput benchmark.
+
+Fires student form requests at a running server while admin dashboard
+requests run alongside them, then reports requests/sec and latency
+percentiles for each. A blocking database call inside an ``async def``
+handler stalls every other request on the worker, so the form latency
+under dashboard load is the number to compare between commits.
+
+Usage (server started with ``uv run fastapi run app/main.py``):
+
+    uv run python benchmarks/bench_concurrency.py --url http://127.0.0.1:8000 \
+        --requests 2000 --concurrency 50 --dashboard-concurrency 5 \
+        --json before.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+FORMS = [
+    "studentfeedback",
+    "parentfeedback",
+    "alumnifeedback",
+    "internalfaculty",
+    "externalfaculty",
+    "industryrep",
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(name, latencies, errors, elapsed):
+    return {
+        "name": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def login(client, username, password):
+    response = await client.post(
+        "/admin/login",
+        data={"username": username, "password": password},
+        follow_redirects=False,
+    )
+    if response.status_code != 302:
+        raise SystemExit(f"Admin login failed ({response.status_code})")
+
+
+async def form_worker(client, queue, latencies, errors):
+    while True:
+        try:
+            i = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start = time.perf_counter()
+        response = await client.get(f"/feedback/{FORMS[i % len(FORMS)]}")
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+
+async def dashboard_worker(client, stop, latencies, errors, stakeholder_id):
+    params = {"stakeholder_id": stakeholder_id} if stakeholder_id else {}
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/admin/dashboard", params=params)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+
+async def run(args):
+    limits = httpx.Limits(max_connections=args.concurrency + args.dashboard_concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=120) as forms, \
+            httpx.AsyncClient(base_url=args.url, limits=limits, timeout=120) as admin:
+
+        if args.dashboard_concurrency:
+            await login(admin, args.username, args.password)
+
+        queue = asyncio.Queue()
+        for i in range(args.requests):
+            queue.put_nowait(i)
+
+        form_latencies, form_errors = [], []
+        dash_latencies, dash_errors = [], []
+        stop = asyncio.Event()
+
+        dashboards = [
+            asyncio.create_task(
+                dashboard_worker(admin, stop, dash_latencies, dash_errors, args.stakeholder_id)
+            )
+            for _ in range(args.dashboard_concurrency)
+        ]
+
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            form_worker(forms, queue, form_latencies, form_errors)
+            for _ in range(args.concurrency)
+        ])
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        await asyncio.gather(*dashboards)
+
+    return {
+        "url": args.url,
+        "concurrency": args.concurrency,
+        "dashboard_concurrency": args.dashboard_concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "results": [
+            summarize("get_form", form_latencies, len(form_errors), elapsed),
+            summarize("admin_dashboard", dash_latencies, len(dash_errors), elapsed),
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--dashboard-concurrency", type=int, default=5)
+    parser.add_argument("--stakeholder-id", type=int, default=None)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="Admin123")
+    parser.add_argument("--json", dest="json_path", default=None,
+                        help="Write the results to this file as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    for r in report["results"]:
+        print(
+            f"{r['name']:<16} {r['requests']:>7} req  {r['rps']:>9} req/s  "
+            f"p50 {r['p50_ms']:>8} ms  p95 {r['p95_ms']:>8} ms  "
+            f"p99 {r['p99_ms']:>8} ms  errors {r['errors']}"
+        )
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Saving dashboard demographic edits: per-item lookups vs set-based apply.
+
+Tops up the configured database (.env) with synthetic respondents (same
+seeding as bench_indexes.py), picks --edits random demographic cells and
+times the previous per-item implementation (two SELECTs per cell, then an
+ORM update) against submissions.apply_demographic_edits. Each run is
+rolled back, so both see the same data. Reports wall time and the number
+of SQL statements issued.
+
+Usage:
+
+    uv run python benchmarks/bench_demographic_edits.py --edits 1000 --json edits.json
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from sqlalchemy import event, select
+
+import migrate
+import models
+import question_catalog
+import submissions
+from database import engine, async_engine, AsyncSessionLocal
+from bench_indexes import seed
+
+
+# -----------------------------
+# PREVIOUS IMPLEMENTATION (admin.py before the set-based rewrite)
+# -----------------------------
+async def legacy_apply(db, updates):
+    for item in updates:
+        person_id = item["person_id"]
+        question_id = item["question_id"]
+        value = item["value"]
+
+        question = (await db.execute(
+            select(models.SyllabusQuestion).where(
+                models.SyllabusQuestion.id == question_id,
+                models.SyllabusQuestion.category == "DEMOGRAPHIC"
+            )
+        )).scalars().first()
+
+        if not question:
+            continue
+
+        answer = (await db.execute(
+            select(models.FeedbackAnswer).where(
+                models.FeedbackAnswer.person_id == person_id,
+                models.FeedbackAnswer.question_id == question_id
+            )
+        )).scalars().first()
+
+        if answer:
+            answer.answer_text = value
+
+    await db.flush()
+
+
+async def new_apply(db, updates):
+    catalog = await question_catalog.current(db)
+    await submissions.apply_demographic_edits(db, catalog, updates)
+
+
+def pick_edits(count, rng):
+    with engine.connect() as conn:
+        cells = conn.execute(
+            select(models.FeedbackAnswer.person_id, models.FeedbackAnswer.question_id)
+            .join(models.SyllabusQuestion, models.FeedbackAnswer.question_id == models.SyllabusQuestion.id)
+            .where(models.SyllabusQuestion.category == "DEMOGRAPHIC")
+            .order_by(models.FeedbackAnswer.answer_id.desc())
+            .limit(count * 20)
+        ).all()
+    chosen = rng.sample([tuple(c) for c in cells], min(count, len(cells)))
+    return [
+        {"person_id": str(pid), "question_id": str(qid), "value": f"edited {i}"}
+        for i, (pid, qid) in enumerate(chosen)
+    ]
+
+
+async def timed(fn, updates, repeat, statements):
+    runs, counts = [], []
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as db:
+            await question_catalog.current(db)  # loaded once per process in the app
+            statements[0] = 0
+            start = time.perf_counter()
+            await fn(db, updates)
+            runs.append(time.perf_counter() - start)
+            counts.append(statements[0])
+            await db.rollback()
+    return round(statistics.median(runs) * 1000, 1), max(counts)
+
+
+async def run(updates, repeat):
+    statements = [0]
+
+    def count(*_):
+        statements[0] += 1
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count)
+    try:
+        legacy = await timed(legacy_apply, updates, repeat, statements)
+        new = await timed(new_apply, updates, repeat, statements)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count)
+        await async_engine.dispose()
+    return legacy, new
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Demographic edit save benchmark")
+    parser.add_argument("--edits", type=int, default=1000)
+    parser.add_argument("--answers", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    migrate.setup(engine)
+    with engine.begin() as conn:
+        seed(conn, args.answers, rng)
+
+    updates = pick_edits(args.edits, rng)
+    (legacy_ms, legacy_sql), (new_ms, new_sql) = asyncio.run(run(updates, args.repeat))
+
+    print(f"{len(updates)} edits")
+    print(f"{'per-item (previous)':<22} {legacy_ms:>10} ms {legacy_sql:>7} statements")
+    print(f"{'set-based':<22} {new_ms:>10} ms {new_sql:>7} statements")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({
+                "dialect": engine.dialect.name,
+                "edits": len(updates),
+                "repeat": args.repeat,
+                "per_item": {"ms": legacy_ms, "statements": legacy_sql},
+                "set_based": {"ms": new_ms, "statements": new_sql}
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Feedback form throughput: per-request rendering vs pre-rendered pages.
+
+By default drives the app in-process (httpx ASGITransport, database from
+.env) and reports requests/sec for ``GET /feedback/{form}`` three ways:
+
+    render       FORM_PRERENDER=0: Jinja render on every request
+    prerendered  pages served from memory with ETag/Cache-Control
+    revalidate   conditional requests (If-None-Match) answered with 304
+
+With --url the same requests go to a running server instead; start it once
+with FORM_PRERENDER=0 and once with the default to compare before/after.
+
+Usage:
+
+    uv run python benchmarks/bench_forms.py --requests 5000 --concurrency 50 --json forms.json
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from bench_concurrency import FORMS, summarize
+
+
+async def worker(client, queue, latencies, errors, etags):
+    while True:
+        try:
+            i = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        form = FORMS[i % len(FORMS)]
+        headers = {"If-None-Match": etags[form]} if etags else {}
+        start = time.perf_counter()
+        response = await client.get(f"/feedback/{form}", headers=headers)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != (304 if etags else 200):
+            errors.append(response.status_code)
+
+
+async def measure(client, name, requests, concurrency, revalidate=False):
+    etags = {}
+    if revalidate:
+        for form in FORMS:
+            etags[form] = (await client.get(f"/feedback/{form}")).headers["etag"]
+
+    # Warm-up: first render / catalog load is not part of the steady state
+    for form in FORMS:
+        await client.get(f"/feedback/{form}")
+
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        worker(client, queue, latencies, errors, etags) for _ in range(concurrency)
+    ])
+    return summarize(name, latencies, len(errors), time.perf_counter() - start)
+
+
+async def run(args):
+    limits = httpx.Limits(max_connections=args.concurrency)
+    results = []
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=120) as client:
+            results.append(await measure(client, "get_form", args.requests, args.concurrency))
+            results.append(await measure(client, "revalidate", args.requests, args.concurrency, True))
+        return results
+
+    import database
+    import form_pages
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits) as client:
+        form_pages.PRERENDER = False
+        results.append(await measure(client, "render", args.requests, args.concurrency))
+
+        form_pages.PRERENDER = True
+        form_pages.clear()
+        results.append(await measure(client, "prerendered", args.requests, args.concurrency))
+        results.append(await measure(client, "revalidate", args.requests, args.concurrency, True))
+
+    # No lifespan in-process, so close the pool here
+    await database.async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feedback form requests/sec")
+    parser.add_argument("--url", default=None, help="Benchmark a running server instead")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    for r in results:
+        print(
+            f"{r['name']:<12} {r['requests']:>7} req  {r['rps']:>9} req/s  "
+            f"p50 {r['p50_ms']:>8} ms  p95 {r['p95_ms']:>8} ms  errors {r['errors']}"
+        )
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({
+                "url": args.url,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "results": results
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Query latency with and without the dashboard indexes.
+
+Tops up the configured database (.env) with synthetic respondents until it
+holds --answers answer rows, times the queries admin.py issues with every
+secondary index declared on the models, drops those indexes, times them
+again, and recreates them. Use a scratch database: the seeded rows are not
+removed.
+
+Usage:
+
+    uv run python benchmarks/bench_indexes.py --answers 1000000 --json indexes.json
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+from sqlalchemy import func, insert, select
+
+import facets
+import migrate
+import models
+from database import engine
+
+COURSES = ["BSc IT", "BSc CS", "BMS", "BAMMC", "BCom", "MCom"]
+
+
+def get_or_create(conn, model, column, value, pk):
+    found = conn.scalar(select(pk).where(column == value).limit(1))
+    if found is not None:
+        return found
+    return conn.execute(insert(model).values({column.key: value})).inserted_primary_key[0]
+
+
+def seed(conn, target_answers, rng, chunk=20_000):
+    existing = conn.scalar(select(func.count()).select_from(models.FeedbackAnswer)) or 0
+    if existing >= target_answers:
+        return existing
+
+    questions = conn.execute(
+        select(
+            models.SyllabusQuestion.id,
+            models.SyllabusQuestion.stakeholder_type,
+            models.SyllabusQuestion.category,
+            models.SyllabusQuestion.text
+        ).order_by(models.SyllabusQuestion.id)
+    ).all()
+    if not questions:
+        raise SystemExit("No questions found: load setup_database.sql first")
+
+    by_type = {}
+    for q in questions:
+        by_type.setdefault(q.stakeholder_type, []).append(q)
+
+    session_id = get_or_create(
+        conn, models.FeedbackSession, models.FeedbackSession.session_name,
+        "Default Session", models.FeedbackSession.session_id
+    )
+    stakeholder_ids = {
+        t: get_or_create(
+            conn, models.Stakeholder, models.Stakeholder.stakeholder_type,
+            t, models.Stakeholder.stakeholder_id
+        )
+        for t in by_type
+    }
+
+    next_person = (conn.scalar(select(func.max(models.StakeholderPersonalInfo.person_id))) or 0) + 1
+    types = list(by_type)
+    people, answers = [], []
+    total = existing
+
+    def flush():
+        if people:
+            conn.execute(insert(models.StakeholderPersonalInfo.__table__), people)
+        if answers:
+            conn.execute(insert(models.FeedbackAnswer.__table__), answers)
+        people.clear()
+        answers.clear()
+
+    while total < target_answers:
+        stakeholder_type = types[next_person % len(types)]
+        people.append({
+            "person_id": next_person,
+            "session_id": session_id,
+            "stakeholder_id": stakeholder_ids[stakeholder_type],
+            "name": "N/A",
+            "association_name": None
+        })
+        for q in by_type[stakeholder_type]:
+            text = q.text.lower()
+            score = None
+            if q.category == "SYLLABUS":
+                score = rng.randint(1, 5)
+                value = str(score)
+            elif any(k in text for k in ("course", "program", "stream")):
+                value = rng.choice(COURSES)
+            else:
+                value = "x"
+            answers.append({
+                "person_id": next_person,
+                "question_id": q.id,
+                "answer_text": value,
+                "score": score
+            })
+        total += len(by_type[stakeholder_type])
+        next_person += 1
+
+        if len(answers) >= chunk:
+            flush()
+    flush()
+    facets.rebuild(conn)
+    return total
+
+
+def dashboard_queries(stakeholder_id, stakeholder_type, person_ids):
+    SPI, FA, SQ, RF = (
+        models.StakeholderPersonalInfo, models.FeedbackAnswer, models.SyllabusQuestion,
+        models.RespondentFacet
+    )
+    return {
+        "total_respondents": [
+            select(func.count(func.distinct(FA.person_id)))
+            .join(SPI, FA.person_id == SPI.person_id)
+            .where(SPI.stakeholder_id == stakeholder_id)
+        ],
+        "chart_all_stakeholders": [
+            select(SQ.stakeholder_type, func.avg(FA.score))
+            .select_from(FA)
+            .join(SQ, FA.question_id == SQ.id)
+            .where(SQ.category == "SYLLABUS", FA.score.is_not(None))
+            .group_by(SQ.stakeholder_type)
+        ],
+        "chart_single_stakeholder": [
+            select(FA.question_id, func.count(FA.score), func.avg(FA.score))
+            .where(
+                FA.question_id.in_(
+                    select(SQ.id).where(
+                        SQ.category == "SYLLABUS",
+                        SQ.stakeholder_type == stakeholder_type
+                    )
+                ),
+                FA.score.is_not(None)
+            )
+            .group_by(FA.question_id)
+        ],
+        "question_list": [
+            select(SQ)
+            .where(SQ.category == "DEMOGRAPHIC", SQ.stakeholder_type == stakeholder_type)
+            .order_by(SQ.id)
+        ],
+        "stream_options": [
+            select(RF.stream)
+            .where(RF.stakeholder_id == stakeholder_id, RF.stream.is_not(None))
+            .distinct()
+        ],
+        "answers_single_stream": [
+            select(SPI.person_id, SPI.name, FA.question_id, FA.answer_text)
+            .join(FA)
+            .join(RF, RF.person_id == SPI.person_id)
+            .where(
+                SPI.stakeholder_id == stakeholder_id,
+                RF.stakeholder_id == stakeholder_id,
+                RF.stream == COURSES[0]
+            )
+            .order_by(SPI.person_id, FA.question_id)
+        ],
+        "answers_single_stakeholder": [
+            select(SPI.person_id, SPI.name, FA.question_id, FA.answer_text)
+            .join(FA)
+            .where(SPI.stakeholder_id == stakeholder_id)
+            .order_by(SPI.person_id, FA.question_id)
+        ],
+        "demographic_edit_lookup_x100": [
+            select(FA.answer_id).where(FA.person_id == pid, FA.question_id == qid)
+            for pid, qid in person_ids
+        ],
+    }
+
+
+def model_indexes():
+    # (name, table, columns) for every secondary index declared on the models
+    return [
+        (index.name, table.name, [c.name for c in index.columns])
+        for table in models.Base.metadata.sorted_tables
+        for index in sorted(table.indexes, key=lambda ix: ix.name)
+    ]
+
+
+def drop_indexes(indexes):
+    with engine.begin() as conn:
+        for name, table, _ in reversed(indexes):
+            migrate.drop_index(conn, name, table)
+
+
+def create_indexes(indexes):
+    with engine.begin() as conn:
+        for name, table, columns in indexes:
+            migrate.create_index(conn, name, table, *columns)
+
+
+def time_queries(queries, repeat):
+    timings = {}
+    with engine.connect() as conn:
+        for name, statements in queries.items():
+            runs = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                for statement in statements:
+                    conn.execute(statement).all()
+                runs.append(time.perf_counter() - start)
+            timings[name] = round(statistics.median(runs) * 1000, 2)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard query latency with/without indexes")
+    parser.add_argument("--answers", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--stakeholder", default="STUDENT")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    migrate.setup(engine)
+
+    with engine.begin() as conn:
+        total = seed(conn, args.answers, rng)
+    print(f"feedback_answers rows: {total}")
+
+    with engine.connect() as conn:
+        stakeholder_id = conn.scalar(
+            select(models.Stakeholder.stakeholder_id)
+            .where(models.Stakeholder.stakeholder_type == args.stakeholder)
+        )
+        sample = conn.execute(
+            select(models.FeedbackAnswer.person_id, models.FeedbackAnswer.question_id)
+            .order_by(models.FeedbackAnswer.answer_id.desc())
+            .limit(5000)
+        ).all()
+    lookups = rng.sample([tuple(r) for r in sample], min(100, len(sample)))
+    queries = dashboard_queries(stakeholder_id, args.stakeholder, lookups)
+
+    indexes = model_indexes()
+    with_indexes = time_queries(queries, args.repeat)
+
+    drop_indexes(indexes)
+    try:
+        without_indexes = time_queries(queries, args.repeat)
+    finally:
+        create_indexes(indexes)
+
+    print(f"{'query':<30} {'indexed ms':>12} {'unindexed ms':>14} {'speedup':>9}")
+    for name in queries:
+        a, b = with_indexes[name], without_indexes[name]
+        print(f"{name:<30} {a:>12} {b:>14} {(b / a if a else 0):>8.1f}x")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({
+                "dialect": engine.dialect.name,
+                "answers": total,
+                "repeat": args.repeat,
+                "with_indexes_ms": with_indexes,
+                "without_indexes_ms": without_indexes
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
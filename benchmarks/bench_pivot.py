@@ -0,0 +1,184 @@
+"""
+Person x question pivot: previous row-dict implementation vs app/pivot.py.
+
+Generates synthetic answer rows in memory (no database needed), ordered by
+person_id like the dashboard/export queries, and times building the wide
+table, applying the stream filter and producing template records/CSV rows.
+The stream filter of the new path mirrors the respondent_facets join: each
+person's stream is worked out once (as it is at submit time) and only the
+matching people's answers reach the pivot.
+
+Usage:
+
+    uv run python benchmarks/bench_pivot.py --respondents 100000 --questions 20 --json pivot.json
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import statistics
+import time
+from collections import namedtuple
+
+import facets
+import pivot
+
+Question = namedtuple("Question", "id category text")
+COURSES = ["BSc IT", "BSc CS", "BMS", "BAMMC", "BCom", "MCom"]
+
+
+def make_questions(count):
+    demographic = [
+        Question(1, "DEMOGRAPHIC", "[STUDENT][DEMOGRAPHIC] Student Name"),
+        Question(2, "DEMOGRAPHIC", "[STUDENT][DEMOGRAPHIC] Program / Course"),
+        Question(3, "DEMOGRAPHIC", "[STUDENT][DEMOGRAPHIC] Class"),
+        Question(4, "DEMOGRAPHIC", "[STUDENT][DEMOGRAPHIC] Academic Year"),
+    ]
+    syllabus = [
+        Question(i, "SYLLABUS", f"[STUDENT][SYLLABUS] Syllabus question {i}")
+        for i in range(len(demographic) + 1, count + 1)
+    ]
+    return demographic, syllabus
+
+
+def make_answers(respondents, demographic, syllabus, rng):
+    answers = []
+    for person_id in range(1, respondents + 1):
+        course = rng.choice(COURSES)
+        for q in demographic:
+            value = course if q.id == 2 else "x"
+            answers.append((person_id, "N/A", q.id, value))
+        for q in syllabus:
+            answers.append((person_id, "N/A", q.id, str(rng.randint(1, 5))))
+    return answers
+
+
+# -----------------------------
+# PREVIOUS IMPLEMENTATION (admin.py before the pivot module)
+# -----------------------------
+def legacy_pivot(answers, demographic, syllabus, stream=None):
+    demo_qid_to_key = {}
+    for q in demographic:
+        label = re.sub(r"\[.*?\]", "", q.text).strip()
+        demo_qid_to_key[q.id] = label.lower().replace(" ", "_").replace("/", "_")
+    qid_to_qnum = {q.id: f"q{i+1}" for i, q in enumerate(syllabus)}
+
+    row_map = {}
+    for r in answers:
+        row = row_map.setdefault(r[0], {"person_id": r[0], "name": r[1]})
+        if r[2] in demo_qid_to_key:
+            row[demo_qid_to_key[r[2]]] = r[3]
+        if r[2] in qid_to_qnum:
+            row[qid_to_qnum[r[2]]] = r[3]
+    rows = list(row_map.values())
+
+    if stream:
+        def match_stream(row):
+            for k, v in row.items():
+                if "course" in k or "program" in k or "stream" in k:
+                    return v == stream
+            return False
+        rows = [r for r in rows if match_stream(r)]
+
+    return rows
+
+
+def person_streams(answers, demographic):
+    # person_id -> stream, as written to respondent_facets with each submission
+    facets_by_qid = facets.question_facets(demographic)
+    people = {}
+    for r in answers:
+        people.setdefault(r[0], []).append((r[2], r[3]))
+    return {
+        person_id: facets.facet_values(person_answers, facets_by_qid).get("stream")
+        for person_id, person_answers in people.items()
+    }
+
+
+def new_pivot(answers, demographic, syllabus, stream=None, streams=None):
+    if stream:
+        # WHERE respondent_facets.stream = ? before the pivot
+        answers = [r for r in answers if streams[r[0]] == stream]
+    return pivot.build(answers, pivot.Layout(demographic, syllabus))
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+async def _chunked(answers, layout):
+    count = 0
+    async for table in pivot.build_chunks(_aiter(answers), layout):
+        for _ in table.rows():
+            count += 1
+    return count
+
+
+def timed(fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return round(statistics.median(runs) * 1000, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pivot micro-benchmark")
+    parser.add_argument("--respondents", type=int, default=100_000)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    demographic, syllabus = make_questions(args.questions)
+    answers = make_answers(args.respondents, demographic, syllabus, rng)
+    layout = pivot.Layout(demographic, syllabus)
+    streams = person_streams(answers, demographic)
+    print(f"{args.respondents} respondents x {args.questions} questions = {len(answers)} answer rows")
+
+    # Sanity check: both produce the same table
+    assert legacy_pivot(answers[:2000], demographic, syllabus, "BMS") == \
+        new_pivot(answers[:2000], demographic, syllabus, "BMS", streams).records()
+
+    timings = {
+        "legacy_pivot": timed(lambda: legacy_pivot(answers, demographic, syllabus), args.repeat),
+        "pivot_build": timed(lambda: new_pivot(answers, demographic, syllabus), args.repeat),
+        "legacy_pivot_stream_filter": timed(
+            lambda: legacy_pivot(answers, demographic, syllabus, "BMS"), args.repeat
+        ),
+        "pivot_build_stream_filter": timed(
+            lambda: new_pivot(answers, demographic, syllabus, "BMS", streams), args.repeat
+        ),
+        "pivot_build_records": timed(
+            lambda: new_pivot(answers, demographic, syllabus).records(), args.repeat
+        ),
+        "pivot_chunks_csv_rows": timed(
+            lambda: asyncio.run(_chunked(answers, layout)), args.repeat
+        ),
+    }
+
+    for name, ms in timings.items():
+        print(f"{name:<30} {ms:>10} ms")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({
+                "respondents": args.respondents,
+                "questions": args.questions,
+                "answers": len(answers),
+                "repeat": args.repeat,
+                "timings_ms": timings
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+End-to-end load and latency suite for the main routes.
+
+Seeds the configured database (.env; use a scratch or local stand-in
+database, seeded rows are not removed) with --respondents synthetic
+respondents spread over the six stakeholder types, then drives each
+scenario with --concurrency clients and reports requests/sec and
+p50/p95/p99 latency:
+
+    get_form              GET  /feedback/{form}            (all six forms)
+    submit_feedback       POST /submit-feedback            (student form)
+    dashboard_all         GET  /admin/dashboard
+    dashboard_single      GET  /admin/dashboard?stakeholder_id=
+    dashboard_stream      GET  /admin/dashboard?stakeholder_id=&stream=
+    export_stakeholder    GET  /admin/export/stakeholder   (full CSV)
+    export_all            GET  /admin/export/all           (full CSV)
+    update_demographics   POST /admin/update-responses     (--edits per request)
+
+By default the app runs in-process (httpx ASGITransport); --url targets a
+running server instead. --json writes the results with the current git
+commit; pass an earlier file as --baseline to print the change.
+
+Usage:
+
+    uv run python benchmarks/bench_suite.py --respondents 10000 --json suite.json
+    uv run python benchmarks/bench_suite.py --respondents 10000 --baseline suite.json
+"""
+import sys
+import os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "app"))
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+
+import httpx
+from sqlalchemy import func, select
+
+import migrate
+import models
+from auth import pwd_context
+from database import engine
+from seed_questions import seed_questions
+from bench_concurrency import FORMS, summarize
+from bench_indexes import COURSES, seed
+
+SCENARIOS = [
+    "get_form",
+    "submit_feedback",
+    "dashboard_all",
+    "dashboard_single",
+    "dashboard_stream",
+    "export_stakeholder",
+    "export_all",
+    "update_demographics",
+]
+# Full exports are long-running; a handful of them is enough
+SLOW_SCENARIOS = {"export_stakeholder", "export_all"}
+
+
+# -----------------------------
+# DATA
+# -----------------------------
+def prepare_database(respondents, username, password, rng):
+    migrate.setup(engine)
+
+    with engine.begin() as conn:
+        seed_questions(conn)  # fresh database (e.g. DB_BACKEND=sqlite)
+        per_type = conn.execute(
+            select(models.SyllabusQuestion.stakeholder_type, func.count())
+            .group_by(models.SyllabusQuestion.stakeholder_type)
+        ).all()
+        # seed() cycles through the types, so this many answers ~ respondents
+        answers_per_person = sum(n for _, n in per_type) / len(per_type)
+        seed(conn, int(respondents * answers_per_person), rng)
+
+        if conn.scalar(select(models.AdminUser.admin_id).where(models.AdminUser.username == username)) is None:
+            conn.execute(models.AdminUser.__table__.insert().values(
+                username=username, password=pwd_context.hash(password)
+            ))
+
+    with engine.connect() as conn:
+        stakeholders = dict(conn.execute(
+            select(models.Stakeholder.stakeholder_type, models.Stakeholder.stakeholder_id)
+        ).all())
+        questions = conn.execute(
+            select(
+                models.SyllabusQuestion.id,
+                models.SyllabusQuestion.stakeholder_type,
+                models.SyllabusQuestion.category,
+                models.SyllabusQuestion.text
+            ).order_by(models.SyllabusQuestion.id)
+        ).all()
+        cells = conn.execute(
+            select(models.FeedbackAnswer.person_id, models.FeedbackAnswer.question_id)
+            .join(models.SyllabusQuestion, models.FeedbackAnswer.question_id == models.SyllabusQuestion.id)
+            .where(models.SyllabusQuestion.category == "DEMOGRAPHIC")
+            .order_by(models.FeedbackAnswer.answer_id.desc())
+            .limit(20_000)
+        ).all()
+        totals = {
+            "respondents": conn.scalar(select(func.count()).select_from(models.StakeholderPersonalInfo)),
+            "answers": conn.scalar(select(func.count()).select_from(models.FeedbackAnswer))
+        }
+
+    return stakeholders, questions, [tuple(c) for c in cells], totals
+
+
+def student_submission(questions, rng):
+    data = {"form_name": "studentfeedback"}
+    for q in questions:
+        if q.stakeholder_type != "STUDENT":
+            continue
+        if q.category == "SYLLABUS":
+            data[f"q_{q.id}"] = str(rng.randint(1, 5))
+        elif q.category == "DEMOGRAPHIC":
+            text = q.text.lower()
+            data[f"q_{q.id}"] = rng.choice(COURSES) if "course" in text else "bench"
+        else:
+            data[f"q_{q.id}"] = "bench suggestion"
+    return data
+
+
+# -----------------------------
+# SCENARIOS
+# -----------------------------
+def build_requests(name, stakeholders, questions, cells, args, rng):
+    # Returns make(i) -> (method, url, request kwargs)
+    student = stakeholders.get("STUDENT")
+
+    if name == "get_form":
+        return lambda i: ("GET", f"/feedback/{FORMS[i % len(FORMS)]}", {})
+    if name == "submit_feedback":
+        return lambda i: ("POST", "/submit-feedback", {"data": student_submission(questions, rng)})
+    if name == "dashboard_all":
+        return lambda i: ("GET", "/admin/dashboard", {})
+    if name == "dashboard_single":
+        return lambda i: ("GET", "/admin/dashboard", {"params": {"stakeholder_id": student}})
+    if name == "dashboard_stream":
+        return lambda i: ("GET", "/admin/dashboard", {
+            "params": {"stakeholder_id": student, "stream": COURSES[i % len(COURSES)]}
+        })
+    if name == "export_stakeholder":
+        return lambda i: ("GET", "/admin/export/stakeholder", {"params": {"stakeholder_id": student}})
+    if name == "export_all":
+        return lambda i: ("GET", "/admin/export/all", {})
+    if name == "update_demographics":
+        def make(i):
+            edits = [
+                {"person_id": pid, "question_id": qid, "value": f"bench {i}"}
+                for pid, qid in rng.sample(cells, min(args.edits, len(cells)))
+            ]
+            return "POST", "/admin/update-responses", {"json": edits}
+        return make
+    raise ValueError(name)
+
+
+async def worker(client, queue, make, latencies, errors):
+    while True:
+        try:
+            i = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        method, url, kwargs = make(i)
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            errors.append(response.status_code)
+
+
+async def measure(client, name, make, requests, concurrency):
+    # One untimed request first: catalog load, first render, pool connect
+    method, url, kwargs = make(0)
+    await client.request(method, url, **kwargs)
+
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        worker(client, queue, make, latencies, errors)
+        for _ in range(min(concurrency, requests))
+    ])
+    return summarize(name, latencies, len(errors), time.perf_counter() - start)
+
+
+async def run(args, stakeholders, questions, cells, rng):
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=600)
+    else:
+        import cache
+        from main import app
+        if args.no_cache:
+            cache.dashboard_cache.max_entries = 0
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench",
+            limits=limits, timeout=600
+        )
+
+    results = []
+    async with client:
+        response = await client.post(
+            "/admin/login", data={"username": args.username, "password": args.password}
+        )
+        if response.status_code >= 400:
+            raise SystemExit(f"Admin login failed ({response.status_code})")
+
+        for name in args.scenarios:
+            requests = args.export_requests if name in SLOW_SCENARIOS else args.requests
+            concurrency = min(args.concurrency, 4) if name in SLOW_SCENARIOS else args.concurrency
+            make = build_requests(name, stakeholders, questions, cells, args, rng)
+            result = await measure(client, name, make, requests, concurrency)
+            result["concurrency"] = concurrency
+            results.append(result)
+            print_result(result)
+
+    if not args.url:
+        # No lifespan in-process, so close the pool here
+        import database
+        await database.async_engine.dispose()
+    return results
+
+
+# -----------------------------
+# REPORTING
+# -----------------------------
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_result(r):
+    print(
+        f"{r['name']:<20} {r['requests']:>6} req  {r['rps']:>9} req/s  "
+        f"p50 {r['p50_ms']:>9} ms  p95 {r['p95_ms']:>9} ms  "
+        f"p99 {r['p99_ms']:>9} ms  errors {r['errors']}"
+    )
+
+
+def print_comparison(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {r["name"]: r for r in baseline["results"]}
+
+    print(f"\nvs {baseline_path} (commit {baseline.get('commit')})")
+    print(f"{'scenario':<20} {'req/s':>18} {'p95 ms':>22}")
+    for r in results:
+        b = before.get(r["name"])
+        if not b:
+            continue
+        rps = r["rps"] / b["rps"] if b["rps"] else 0
+        p95 = r["p95_ms"] / b["p95_ms"] if b["p95_ms"] else 0
+        print(
+            f"{r['name']:<20} {b['rps']:>8} -> {r['rps']:<8} "
+            f"{b['p95_ms']:>9} -> {r['p95_ms']:<9} ({rps:.2f}x req/s, {p95:.2f}x p95)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end route load/latency suite")
+    parser.add_argument("--url", default=None, help="Benchmark a running server instead")
+    parser.add_argument("--respondents", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--export-requests", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--edits", type=int, default=50, help="Cells per update-responses request")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--no-cache", action="store_true",
+                        help="In-process only: compute every dashboard view")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="Admin123")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", default=None)
+    parser.add_argument("--baseline", default=None, help="Earlier --json output to compare with")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    stakeholders, questions, cells, totals = prepare_database(
+        args.respondents, args.username, args.password, rng
+    )
+    print(f"{totals['respondents']} respondents, {totals['answers']} answers ({engine.dialect.name})")
+
+    results = asyncio.run(run(args, stakeholders, questions, cells, rng))
+
+    if args.baseline:
+        print_comparison(results, args.baseline)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({
+                "commit": git_commit(),
+                "dialect": engine.dialect.name,
+                "url": args.url,
+                "respondents": totals["respondents"],
+                "answers": totals["answers"],
+                "concurrency": args.concurrency,
+                "dashboard_cache": not args.no_cache,
+                "results": results
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()